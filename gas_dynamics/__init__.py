@@ -0,0 +1,50 @@
+"""
+Gas Dynamics Calculator
+
+The core solvers and unit tables are imported with the package and need
+neither tkinter nor NumPy. Everything heavier is a submodule loaded on first
+attribute access, for example gas_dynamics.batch imports NumPy and
+gas_dynamics.gui imports tkinter only when they are first used.
+"""
+import importlib
+
+from .equations import equation_table, ideal_compression_p_vs_t, shaft_work, static_pressure, static_temperature
+from .units import default_cp, default_n, unit_registry
+
+__version__ = "1.0"
+
+# SUBMODULES LOADED ON FIRST ACCESS
+lazy_modules = (
+    "batch",
+    "benchmark",
+    "boundary_layer",
+    "cache",
+    "cli",
+    "compressor_map",
+    "derivatives",
+    "ducts",
+    "gui",
+    "history",
+    "instrumentation",
+    "isentropic_tables",
+    "result_log",
+    "server",
+    "session",
+    "shocks",
+    "sweep",
+    "trains",
+    "uncertainty",
+    "workers",
+)
+
+
+def __getattr__(name):
+    if name in lazy_modules:
+        module = importlib.import_module("." + name, __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(lazy_modules))
@@ -0,0 +1,8 @@
+"""
+python -m gas_dynamics runs the headless command line mode
+"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Vectorized versions of the solvers in equations.py
+
+Every function takes NumPy arrays (or anything np.asarray accepts) and solves
+the whole batch in a few array passes. The solvers are the relations of
+equations.py (see relations.py) evaluated on arrays: rows are grouped by their
+unknown and each group only runs the solution for that unknown. Instead of the
+`== 0` sentinel used by the scalar functions, the unknowns of each row can be
+marked explicitly with boolean masks, so a real zero can be told apart from a
+blank. A row is solved only when exactly one of its variables is unknown,
+exactly like the scalar functions, and different rows may have different
+unknowns.
+
+Both paths evaluate the same expressions in the same order, but NumPy's
+vectorized np.power, np.exp and np.log round differently from the C library
+behind math.pow, math.exp and math.log (up to a few units in the last place).
+Results therefore agree with the scalar functions to a relative 1e-13, not
+bit for bit (see tests/test_batch.py); only where a relation itself cancels,
+e.g. the efficiency at a pressure ratio close to 1, are the rounding
+differences amplified further.
+"""
+import numpy as np
+
+from . import equations
+
+
+def unknown_masks(values, unknown=None):
+    """
+    Return one boolean mask per variable, True where the value must be solved.
+    Falls back to the `== 0` convention of equations.py when no masks are given
+    """
+    if unknown is None:
+        return [value == 0 for value in values]
+    if len(unknown) != len(values):
+        raise ValueError("Expected %d unknown masks, got %d" % (len(values), len(unknown)))
+    return [np.broadcast_to(np.asarray(mask, dtype=bool), value.shape) for mask, value in zip(unknown, values)]
+
+
+def _only_unknown(masks, position):
+    """
+    Rows where the variable at position is the single unknown
+    """
+    solve = masks[position].copy()
+    for i, mask in enumerate(masks):
+        if i != position:
+            solve &= ~mask
+    return solve
+
+
+def ideal_compression_p_vs_t(p1, p2, t1, t2, g, unknown=None):
+    """
+    Solve Ideal Compression Law for Pressure on arrays
+    """
+    return equations.ideal_compression_relation.solve_arrays((p1, p2, t1, t2), g, unknown)
+
+
+def static_temperature(tt, ts, m, g, unknown=None):
+    """
+    Solve Static Temperature Equation on arrays
+    """
+    return equations.static_temperature_relation.solve_arrays((tt, ts, m), g, unknown)
+
+
+def static_pressure(pt, ps, m, g, unknown=None):
+    """
+    Solve Static Pressure Equation on arrays
+    """
+    return equations.static_pressure_relation.solve_arrays((pt, ps, m), g, unknown)
+
+
+def shaft_work(w, t1, t2, cp, unknown=None):
+    """
+    Solve shaft work on arrays
+    """
+    return equations.shaft_work_relation.solve_arrays((w, t1, t2), cp, unknown)
+
+
+def compressor_efficiency(pr, t1, t2, eta, g, unknown=None):
+    """
+    Solve compressor efficiency on arrays
+    """
+    return equations.compressor_efficiency_relation.solve_arrays((pr, t1, t2, eta), g, unknown)
+
+
+def oblique_shock(m1, theta, beta, m2, p_ratio, t_ratio, pt_ratio, g, unknown=None):
+    """
+    Solve Oblique Shock on arrays, see shocks.oblique_shock
+    """
+    from .shocks import oblique_shock as solve
+    return solve(m1, theta, beta, m2, p_ratio, t_ratio, pt_ratio, g, unknown)
+
+
+def fanno_flow(m, fld, p_ratio, t_ratio, pt_ratio, g, unknown=None):
+    """
+    Solve Fanno Flow on arrays, see ducts.fanno_flow
+    """
+    from .ducts import fanno_flow as solve
+    return solve(m, fld, p_ratio, t_ratio, pt_ratio, g, unknown)
+
+
+def rayleigh_flow(m, p_ratio, t_ratio, tt_ratio, pt_ratio, g, unknown=None):
+    """
+    Solve Rayleigh Flow on arrays, see ducts.rayleigh_flow
+    """
+    from .ducts import rayleigh_flow as solve
+    return solve(m, p_ratio, t_ratio, tt_ratio, pt_ratio, g, unknown)
+
+
+def flat_plate(mach, t_edge, p_edge, length, t_wall, re, cf, st, q_wall, g, unknown=None):
+    """
+    Solve Flat Plate on arrays, see boundary_layer.flat_plate_solve
+    """
+    from .boundary_layer import flat_plate_solve as solve
+    return solve(mach, t_edge, p_edge, length, t_wall, re, cf, st, q_wall, g, unknown)
+
+
+def fluid_interp(fluid, name):
+    """
+    Interpolating function over the cached tables of a fluid, NaN outside the table.
+    name is "enthalpy", "entropy", "temperature_from_enthalpy", "temperature_from_entropy",
+    "viscosity" or "conductivity"
+    """
+    if name in ("viscosity", "conductivity"):
+        temperature, viscosity, conductivity = fluid.transport_arrays()
+        column = viscosity if name == "viscosity" else conductivity
+        return lambda t: np.interp(t, temperature, column, left=np.nan, right=np.nan)
+    temperature, enthalpy, entropy = fluid.arrays()
+    table = {"enthalpy": enthalpy, "entropy": entropy}
+    if name in table:
+        return lambda t: np.interp(t, temperature, table[name], left=np.nan, right=np.nan)
+    table = table[name.replace("temperature_from_", "")]
+    return lambda value: np.interp(value, table, temperature, left=np.nan, right=np.nan)
+
+
+def ideal_compression_real(p1, p2, t1, t2, fluid, unknown=None):
+    """
+    Solve Ideal Compression Law with temperature dependent Cp on arrays,
+    fluid is a fluids.Fluid or its name
+    """
+    return equations.ideal_compression_real_relation.solve_arrays((p1, p2, t1, t2), fluid, unknown)
+
+
+def shaft_work_real(w, t1, t2, fluid, unknown=None):
+    """
+    Solve shaft work with temperature dependent Cp on arrays,
+    fluid is a fluids.Fluid or its name
+    """
+    return equations.shaft_work_real_relation.solve_arrays((w, t1, t2), fluid, unknown)
@@ -0,0 +1,603 @@
+# !/usr/bin/env python3
+# coding: utf-8
+"""
+Benchmark suite of the Gas Dynamics Calculator.
+
+Times the scalar and batched solvers, unit conversion, the result cache,
+Treeview updates and the cold import of the package, and prints the results
+as JSON. Imports slower than import_budget, loading tkinter/NumPy where
+they are not wanted, a benchmark slower than ratio_budgets allows against
+its reference or slower per item than item_budgets allows, and a benchmark
+whose setup raises fail the run; only the Treeview benchmarks are skipped
+when there is no display. Save a run with --output and compare a later one
+against it with --baseline to spot regressions.
+
+Example:
+    python -m gas_dynamics.benchmark --output baseline.json
+    python -m gas_dynamics.benchmark --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from math import pow
+from timeit import Timer
+
+from . import equations
+from .cache import SolverCache
+from .fluids import get_fluid
+from .units import default_cp, default_n
+
+benchmarks = []
+
+
+def benchmark(name):
+    """
+    Register a benchmark. The decorated function returns (callable, items per
+    call) or (callable, items per call, cleanup), cleanup being called once the
+    timing is done, e.g. to destroy a Tk root
+    """
+    def register(function):
+        benchmarks.append((name, function))
+        return function
+    return register
+
+
+def time_call(function, items, repeat):
+    """
+    Best time over repeat runs, with the number of calls per run picked so a run lasts ~0.1 s
+    """
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, number // 2)
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {'seconds_per_call': best, 'items_per_call': items, 'items_per_second': items / best if best else None}
+
+
+@benchmark("scalar.ideal_compression_p_vs_t")
+def bench_scalar_ideal_compression():
+    return lambda: equations.ideal_compression_p_vs_t(100000, 200000, 300, 0, default_n), 1
+
+
+def _if_chain_ideal_compression(p1, p2, t1, t2, g):
+    """
+    Hand written solver of the zero convention, reference of the generated ones
+    """
+    if p1 == 0 and (p2 * t1 * t2) != 0:
+        p1 = p2 * pow((t1 / t2), (g / (g - 1)))
+    if p2 == 0 and (p1 * t1 * t2) != 0:
+        p2 = p1 * pow((t2 / t1), (g - 1) / g)
+    if t1 == 0 and (p1 * p2 * t2) != 0:
+        t1 = t2 * pow((p1 / p2), ((g - 1) / g))
+    if t2 == 0 and (p1 * p2 * t1) != 0:
+        t2 = t1 * pow((p2 / p1), ((g - 1) / g))
+    return p1, p2, t1, t2
+
+
+def _if_chain_static_pressure(pt, ps, m, g):
+    """
+    Hand written solver of the zero convention, reference of the generated ones
+    """
+    if pt == 0 and (ps * m) != 0:
+        pt = ps * pow((1 + ((pow(m, 2) * (g - 1) / 2))), (g / (g - 1)))
+    if ps == 0 and (pt * m) != 0:
+        ps = pt / pow((1 + ((pow(m, 2) * (g - 1) / 2))), (g / (g - 1)))
+    if m == 0 and (ps * pt) != 0:
+        m = pow((pow(pt / ps, (g - 1) / g) - 1) / ((g - 1) / 2), 0.5)
+    return ps, pt, m
+
+
+@benchmark("scalar.ideal_compression_if_chain")
+def bench_scalar_ideal_compression_if_chain():
+    return lambda: _if_chain_ideal_compression(100000, 200000, 300, 0, default_n), 1
+
+
+@benchmark("scalar.static_temperature")
+def bench_scalar_static_temperature():
+    return lambda: equations.static_temperature(0, 300, 0.8, default_n), 1
+
+
+@benchmark("scalar.static_pressure")
+def bench_scalar_static_pressure():
+    return lambda: equations.static_pressure(200000, 100000, 0, default_n), 1
+
+
+@benchmark("scalar.static_pressure_if_chain")
+def bench_scalar_static_pressure_if_chain():
+    return lambda: _if_chain_static_pressure(200000, 100000, 0, default_n), 1
+
+
+@benchmark("scalar.shaft_work")
+def bench_scalar_shaft_work():
+    return lambda: equations.shaft_work(0, 400, 300, default_cp), 1
+
+
+@benchmark("scalar.ideal_compression_real")
+def bench_scalar_ideal_compression_real():
+    fluid = get_fluid()
+    return lambda: equations.ideal_compression_real(100000, 200000, 300, 0, fluid), 1
+
+
+@benchmark("scalar.shaft_work_real")
+def bench_scalar_shaft_work_real():
+    fluid = get_fluid()
+    return lambda: equations.shaft_work_real(0, 400, 300, fluid), 1
+
+
+def _batch_inputs():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    return np, rng
+
+
+def _register_batch(size):
+    @benchmark("batch.ideal_compression_p_vs_t[%d]" % size)
+    def bench_batch_ideal_compression():
+        from . import batch
+        np, rng = _batch_inputs()
+        p1 = rng.uniform(1e5, 2e5, size)
+        p2 = rng.uniform(2e5, 4e5, size)
+        t1 = rng.uniform(250, 320, size)
+        t2 = np.zeros(size)
+        return lambda: batch.ideal_compression_p_vs_t(p1, p2, t1, t2, default_n), size
+
+    @benchmark("batch.static_pressure[%d]" % size)
+    def bench_batch_static_pressure():
+        from . import batch
+        np, rng = _batch_inputs()
+        pt = rng.uniform(2e5, 4e5, size)
+        ps = rng.uniform(1e5, 2e5, size)
+        return lambda: batch.static_pressure(pt, ps, np.zeros(size), default_n), size
+
+    @benchmark("batch.shaft_work[%d]" % size)
+    def bench_batch_shaft_work():
+        from . import batch
+        np, rng = _batch_inputs()
+        t1 = rng.uniform(300, 600, size)
+        t2 = rng.uniform(250, 300, size)
+        return lambda: batch.shaft_work(np.zeros(size), t1, t2, default_cp), size
+
+    @benchmark("batch.ideal_compression_real[%d]" % size)
+    def bench_batch_ideal_compression_real():
+        from . import batch
+        np, rng = _batch_inputs()
+        p1 = rng.uniform(1e5, 2e5, size)
+        p2 = rng.uniform(2e5, 4e5, size)
+        t1 = rng.uniform(250, 320, size)
+        fluid = get_fluid()
+        return lambda: batch.ideal_compression_real(p1, p2, t1, np.zeros(size), fluid), size
+
+    @benchmark("train.evaluate_4_stages[%d]" % size)
+    def bench_train_evaluate():
+        from .trains import Train
+        np, rng = _batch_inputs()
+        p1 = rng.uniform(1e5, 2e5, size)
+        t1 = rng.uniform(250, 320, size)
+        train = Train.equal_split(16, 4, 0.85, 300)
+        return lambda: train.evaluate(p1, t1), size
+
+    @benchmark("batch.oblique_shock_angle[%d]" % size)
+    def bench_batch_oblique_shock_angle():
+        from . import shocks
+        np, rng = _batch_inputs()
+        m1 = rng.uniform(1.5, 5, size)
+        theta = np.radians(rng.uniform(0, 20, size))
+        return lambda: shocks.oblique_shock_angle(m1, theta, default_n), size
+
+    @benchmark("table.oblique_shock_angle[%d]" % size)
+    def bench_table_oblique_shock_angle():
+        from . import shocks
+        np, rng = _batch_inputs()
+        m1 = rng.uniform(1.5, 5, size)
+        theta = np.radians(rng.uniform(0, 20, size))
+        table = shocks.get_table(default_n)
+        return lambda: table.lookup(m1, theta), size
+
+    @benchmark("ducts.fanno_march_outlet_1000_segments[%d]" % size)
+    def bench_fanno_march_outlet():
+        from . import ducts
+        np, rng = _batch_inputs()
+        m1 = rng.uniform(0.1, 0.5, size)
+        lengths = np.full(1000, 0.01)
+        ducts.get_table("fanno", default_n)
+        return lambda: ducts.fanno_march(m1, 1e5, 300, lengths, 0.003, 0.2, default_n, profile=False), size
+
+    @benchmark("table.fanno_mach[%d]" % size)
+    def bench_table_fanno_mach():
+        from . import ducts
+        np, rng = _batch_inputs()
+        fld = rng.uniform(0.01, 50, size)
+        table = ducts.get_table("fanno", default_n)
+        return lambda: table.mach("fld", fld), size
+
+    @benchmark("batch.flat_plate[%d]" % size)
+    def bench_flat_plate():
+        from . import boundary_layer
+        np, rng = _batch_inputs()
+        mach = rng.uniform(0.1, 4, size)
+        t_edge = rng.uniform(200, 300, size)
+        length = rng.uniform(0.01, 10, size)
+        boundary_layer.get_fluid().transport_arrays()
+        return lambda: boundary_layer.flat_plate(mach, t_edge, 5e4, length, 300), size
+
+    @benchmark("derivatives.jacobian_static_pressure[%d]" % size)
+    def bench_jacobian_static_pressure():
+        from .derivatives import jacobian
+        np, rng = _batch_inputs()
+        pt = rng.uniform(1e5, 1e6, size)
+        m = rng.uniform(0.01, 3, size)
+        return lambda: jacobian("static_pressure", (pt, 0.0, m), "ps", default_n, property_derivative=True), size
+
+    @benchmark("compressor_map.shaft_work[%d]" % size)
+    def bench_compressor_map():
+        from .compressor_map import CompressorMap
+        np, rng = _batch_inputs()
+        # 20 SPEED LINES OF 1500 POINTS EACH
+        speed = np.repeat(np.linspace(0.5, 1.1, 20), 1500)
+        beta = np.tile(np.linspace(0, 1, 1500), 20)
+        compressor_map = CompressorMap(speed, speed * (0.6 + 0.4 * beta), 1 + 1.5 * speed ** 2 * (1 - 0.5 * beta ** 2),
+                                       0.88 - 0.3 * (beta - 0.5) ** 2 - 0.2 * (speed - 0.9) ** 2)
+        flow = rng.uniform(0.3, 1.2, size)
+        pressure_ratio = rng.uniform(1.2, 3.0, size)
+        return lambda: compressor_map.shaft_work(flow, pressure_ratio, 288.15), size
+
+
+for _size in (1000, 100000):
+    _register_batch(_size)
+
+
+@benchmark("ducts.fanno_march_profile[2000x1000]")
+def bench_fanno_march_profile():
+    import numpy as np
+    from . import ducts
+    m1 = np.random.default_rng(0).uniform(0.1, 0.5, 1000)
+    lengths = np.full(2000, 0.01)
+    ducts.get_table("fanno", default_n)
+    return lambda: ducts.fanno_march(m1, 1e5, 300, lengths, 0.003, 0.2, default_n), 2000 * 1000
+
+
+@benchmark("uncertainty.static_pressure[1000000]")
+def bench_uncertainty_static_pressure():
+    from .uncertainty import Normal, Uniform, propagate
+    inputs = {'pt': Normal(2e5, 2e3), 'm': Uniform(0.5, 0.52)}
+    return lambda: propagate("static_pressure", inputs, "ps", samples=1000000, seed=1), 1000000
+
+
+@benchmark("plot.columns_exact[10000000]")
+def bench_plot_columns():
+    import numpy as np
+    from .plot import DecimatedSeries
+    x = np.linspace(1, 10, 10000000)
+    series = DecimatedSeries(x, np.random.default_rng(0).normal(x, 0.1))
+    return lambda: series.columns(1, 10, 440), 10000000
+
+
+@benchmark("history.append_sorted[1000000]")
+def bench_history_append_sorted():
+    import numpy as np
+    from .history import ResultHistory
+    history = ResultHistory(("p1", "p2", "t1", "t2"))
+    rows = np.random.default_rng(0).uniform(300, 400, (4, 1000000))
+    history.extend(rows)
+    history.filter("t1", 320, None)
+    history.sort("t2", descending=True)
+
+    def append():
+        # ONE LIVE ROW, THEN THE VIEW LENGTH THE TREEVIEW ASKS FOR ON ITS NEXT RENDER
+        history.append((350.0, 350.0, 350.0, 350.0))
+        return len(history)
+    return append, 1
+
+
+@benchmark("units.convert_to_si")
+def bench_convert_to_si():
+    from .gui import EntryProperty
+    item = EntryProperty("Temperature 1", "temperature")
+    item.unit_input = "°F"
+    item.read_value = 80.0
+    return item.convert_to_si, 1
+
+
+@benchmark("units.convert_from_si")
+def bench_convert_from_si():
+    from .gui import EntryProperty
+    item = EntryProperty("Pressure 1", "pressure")
+    item.unit_input = "PSi"
+    item.actual_value = 101325.0
+    return item.convert_from_si, 1
+
+
+@benchmark("cache.hit")
+def bench_cache_hit():
+    cache = SolverCache()
+    properties = {'n': default_n, 'Cp': default_cp}
+    cache.solve("ideal_compression", (100000, 200000, 300, 0), properties)
+    return lambda: cache.solve("ideal_compression", (100000, 200000, 300, 0), properties), 1
+
+
+@benchmark("cache.miss")
+def bench_cache_miss():
+    cache = SolverCache(max_size=1024)
+    properties = {'n': default_n, 'Cp': default_cp}
+    counter = iter(range(10 ** 9))
+    return lambda: cache.solve("ideal_compression", (100000, 200000, 300 + next(counter), 0), properties), 1
+
+
+@benchmark("cache.disabled")
+def bench_cache_disabled():
+    cache = SolverCache(enabled=False)
+    properties = {'n': default_n, 'Cp': default_cp}
+    return lambda: cache.solve("ideal_compression", (100000, 200000, 300, 0), properties), 1
+
+
+@benchmark("instrumentation.stage_disabled")
+def bench_instrumentation_stage_disabled():
+    from .instrumentation import Instrumentation
+    instruments = Instrumentation()
+
+    def block():
+        with instruments.stage("block"):
+            pass
+    return block, 1
+
+
+@benchmark("instrumentation.stage_enabled")
+def bench_instrumentation_stage_enabled():
+    from .instrumentation import Instrumentation
+    instruments = Instrumentation()
+    instruments.enable()
+
+    def block():
+        with instruments.stage("block"):
+            pass
+    return block, 1
+
+
+def _tree_form(history_size):
+    """
+    (hidden Tk root, ideal compression TabForm with history_size rows in its table)
+    """
+    from tkinter import Tk, Frame
+    from .gui import TabForm
+    root = Tk()
+    root.withdraw()
+    try:
+        form = TabForm(Frame(root), None)
+        form.add_all_properties((("Pressure 1", "pressure"), ("Pressure 2", "pressure"),
+                                 ("Temperature 1", "temperature"), ("Temperature 2", "temperature")))
+        for i in range(history_size):
+            form.tree_insert_value((100000, 200000, 300, 365.7 + i))
+    except Exception:
+        root.destroy()
+        raise
+    return root, form
+
+
+def _register_treeview(history_size):
+    @benchmark("gui.tree_insert_value[%d]" % history_size)
+    def bench_tree_insert_value():
+        root, form = _tree_form(history_size)
+
+        def insert():
+            form.tree_insert_value((100000, 200000, 300, 365.7))
+            root.update_idletasks()
+        return insert, 1, root.destroy
+
+    if not history_size:
+        return
+
+    @benchmark("gui.clear_table[%d]" % history_size)
+    def bench_clear_table():
+        root, form = _tree_form(0)
+        columns = [[100000.0] * history_size, [200000.0] * history_size, [300.0] * history_size,
+                   [365.7 + i for i in range(history_size)]]
+
+        def clear():
+            # REFILL THE TABLE AND ITS VISIBLE TREEVIEW ROWS, THEN DELETE THEM ALL
+            form.history.extend(columns)
+            form.tree_render()
+            form.clear_table()
+            root.update_idletasks()
+        return clear, history_size, root.destroy
+
+
+for _size in (0, 100, 10000):
+    _register_treeview(_size)
+
+
+# MODULE: (SECONDS ALLOWED FOR A COLD IMPORT, MODULES IT MUST NOT LOAD)
+import_budget = {
+    "gas_dynamics": (0.05, ("tkinter", "numpy")),
+    "gas_dynamics.cli": (0.1, ("tkinter", "numpy")),
+    "gas_dynamics.gui": (0.5, ("numpy",)),
+}
+
+_import_probe = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {forbidden!r} if name in sys.modules]}}))
+"""
+
+
+def time_import(module, forbidden, repeat):
+    """
+    Best cold import time of module over repeat fresh interpreters, with the forbidden modules it loaded
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _import_probe.format(module=module, forbidden=forbidden)],
+                                cwd=root, capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output)
+        best = probe['seconds'] if best is None else min(best, probe['seconds'])
+        loaded = probe['loaded']
+    return best, loaded
+
+
+def run_import_budget(pattern=None, repeat=5):
+    """
+    Check the cold import time of the package against import_budget
+    """
+    results = {}
+    for module, (budget, forbidden) in import_budget.items():
+        name = "import." + module
+        if pattern and pattern not in name:
+            continue
+        try:
+            seconds, loaded = time_import(module, forbidden, repeat)
+        except subprocess.CalledProcessError as error:
+            results[name] = {'skipped': error.stderr.strip().splitlines()[-1]}
+            continue
+        results[name] = {
+            'seconds_per_call': seconds,
+            'items_per_call': 1,
+            'budget': budget,
+            'unexpected_imports': loaded,
+            'over_budget': seconds > budget or bool(loaded),
+        }
+    return results
+
+
+def _no_display(error):
+    """
+    True for the TclError of a Tk root created without a display
+    """
+    tkinter = sys.modules.get("tkinter")
+    return tkinter is not None and isinstance(error, tkinter.TclError) and "display" in str(error)
+
+
+def run(pattern=None, repeat=5):
+    """
+    Run the registered benchmarks whose name contains pattern
+    """
+    results = {}
+    for name, setup in benchmarks:
+        if pattern and pattern not in name:
+            continue
+        try:
+            function, items, *cleanup = setup()
+        except ImportError as error:
+            results[name] = {'skipped': "missing dependency: %s" % error}
+            continue
+        except Exception as error:
+            if not _no_display(error):
+                # A BROKEN BENCHMARK FAILS THE RUN INSTEAD OF HIDING AS SKIPPED
+                results[name] = {'error': "%s: %s" % (type(error).__name__, error)}
+                continue
+            results[name] = {'skipped': str(error)}
+            continue
+        try:
+            results[name] = time_call(function, items, repeat)
+        finally:
+            for finish in cleanup:
+                finish()
+    return results
+
+
+# BENCHMARK: (REFERENCE BENCHMARK, LARGEST TIME RATIO TO IT), RATIOS HOLD ON ANY MACHINE
+ratio_budgets = {
+    # A CACHE HIT MUST COST LESS THAN SOLVING THE SAME POINT
+    'cache.hit': ('cache.disabled', 1.0),
+    # THE GENERATED SCALAR SOLVERS STAY CLOSE TO A HAND WRITTEN IF-CHAIN
+    'scalar.ideal_compression_p_vs_t': ('scalar.ideal_compression_if_chain', 2.0),
+    'scalar.static_pressure': ('scalar.static_pressure_if_chain', 2.0),
+}
+
+
+def check_ratios(results):
+    """
+    Add the time ratio to its reference to every benchmark of ratio_budgets
+    that ran with its reference, over budget above the allowed ratio
+    """
+    for name, (reference, budget) in ratio_budgets.items():
+        result, base = results.get(name, {}), results.get(reference, {})
+        if 'seconds_per_call' not in result or 'seconds_per_call' not in base:
+            continue
+        result['ratio_to_reference'] = result['seconds_per_call'] / base['seconds_per_call']
+        result['ratio_budget'] = budget
+        result['over_budget'] = result['ratio_to_reference'] > budget
+
+
+# BENCHMARK: LARGEST TIME PER ITEM IN SECONDS, ABSOLUTE LIKE import_budget
+item_budgets = {
+    # UNDER 1 MS PER 1000 OPERATING POINTS THROUGH THE MAP AND THE SHAFT WORK EQUATIONS
+    'compressor_map.shaft_work[1000]': 1e-6,
+    'compressor_map.shaft_work[100000]': 1e-6,
+}
+
+
+def check_item_budgets(results):
+    """
+    Add the time per item to every benchmark of item_budgets that ran, over
+    budget above the allowed time
+    """
+    for name, budget in item_budgets.items():
+        result = results.get(name, {})
+        if 'seconds_per_call' not in result:
+            continue
+        result['seconds_per_item'] = result['seconds_per_call'] / result['items_per_call']
+        result['item_budget'] = budget
+        result['over_budget'] = result['seconds_per_item'] > budget
+
+
+def compare(results, baseline, threshold):
+    """
+    Ratio of current to baseline time per benchmark, flags the ones slower than threshold
+    """
+    report = {}
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name, {})
+        if 'seconds_per_call' not in result or 'seconds_per_call' not in old:
+            continue
+        ratio = result['seconds_per_call'] / old['seconds_per_call']
+        report[name] = {'ratio': ratio, 'regression': ratio > threshold}
+    return report
+
+
+def main(argv=None):
+    """
+    Entry point of the benchmark suite
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Gas Dynamics Calculator")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains PATTERN")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio reported as a regression (default 1.2)")
+    args = parser.parse_args(argv)
+
+    document = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'results': run(args.pattern, args.repeat),
+    }
+    document['results'].update(run_import_budget(args.pattern, args.repeat))
+    check_ratios(document['results'])
+    check_item_budgets(document['results'])
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as stream:
+            document['comparison'] = compare(document['results'], json.load(stream), args.threshold)
+
+    text = json.dumps(document, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            stream.write(text)
+    print(text)
+
+    if any(item['regression'] for item in document.get('comparison', {}).values()):
+        return 1
+    if any(item.get('over_budget') or 'error' in item for item in document['results'].values()):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Flat plate boundary layer correlations on arrays
+
+Skin friction and heat transfer of a flat plate at zero incidence, local (at
+x) or averaged over the plate length:
+    laminar       Cf = 0.664 / sqrt(Re)      average 1.328 / sqrt(Re)
+    turbulent     Cf = 0.0592 Re^-1/5        average 0.074 Re^-1/5
+    transitional  laminar up to re_transition and turbulent after it, the
+                  average subtracts the laminar part: 0.074 Re^-1/5 - A / Re
+Heat transfer follows from the Reynolds-Colburn analogy, St = Cf / 2 Pr^-2/3
+(Nu = 0.332 Re^1/2 Pr^1/3 laminar, 0.0296 Re^4/5 Pr^1/3 turbulent).
+
+Compressibility is taken into account with Eckert's reference temperature
+    T* = 0.28 Te + 0.5 Tw + 0.22 Taw
+the incompressible correlations are evaluated with the density, viscosity
+and conductivity at T*. The recovery factor is sqrt(Pr) laminar and Pr^1/3
+turbulent, a wall temperature of 0 (or NaN) is an adiabatic wall. The
+transition is decided once, on the edge Reynolds number, and that regime is
+used for both the recovery factor and the skin friction law.
+
+flat_plate() evaluates whole arrays (or broadcast grids of Mach number, edge
+state and length) in one call. Viscosity and conductivity are interpolated in
+the cached Sutherland tables of the fluid (see fluids.py), so a grid of any
+size costs a few table lookups instead of one property evaluation per point.
+"""
+import numpy as np
+
+from .batch import fluid_interp, unknown_masks
+from .fluids import default_fluid, get_fluid
+from .units import default_cp, default_n
+
+default_re_transition = 5e5
+regimes = ("laminar", "turbulent", "transitional")
+
+# VARIABLES OF THE flat_plate EQUATION IN CALL ORDER, THE FIRST FIVE ARE THE INPUTS
+equation_variables = ("mach", "t_edge", "p_edge", "length", "t_wall", "re", "cf", "st", "q_wall")
+
+
+def _check_regime(regime):
+    if regime not in regimes:
+        raise ValueError("Unknown regime %r, expected one of %s" % (regime, ", ".join(regimes)))
+
+
+def skin_friction(re, regime="transitional", average=False, re_transition=default_re_transition, turbulent=None):
+    """
+    Incompressible skin friction coefficient at the Reynolds number re (based
+    on x, or on the plate length for the average). turbulent (boolean array)
+    overrides where the transitional law is turbulent, re >= re_transition
+    by default
+    """
+    _check_regime(regime)
+    re = np.asarray(re, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if average:
+            laminar_law = 1.328 / np.sqrt(re)
+            turbulent_law = 0.074 * np.power(re, -0.2)
+        else:
+            laminar_law = 0.664 / np.sqrt(re)
+            turbulent_law = 0.0592 * np.power(re, -0.2)
+        if regime == "laminar":
+            return laminar_law
+        if regime == "turbulent":
+            return turbulent_law
+        if average:
+            # LAMINAR UP TO THE TRANSITION, TURBULENT FROM THERE ON
+            turbulent_law = turbulent_law - (0.074 * np.power(re_transition, 0.8)
+                                             - 1.328 * np.sqrt(re_transition)) / re
+    if turbulent is None:
+        turbulent = re >= re_transition
+    return np.where(turbulent, turbulent_law, laminar_law)
+
+
+def stanton(cf, pr):
+    """
+    Stanton number from the skin friction, Reynolds-Colburn analogy
+    """
+    return cf / 2 * np.power(pr, -2 / 3)
+
+
+def nusselt(re, pr, regime="transitional", average=False, re_transition=default_re_transition):
+    """
+    Incompressible Nusselt number at the Reynolds number re and Prandtl number pr
+    """
+    return stanton(skin_friction(re, regime, average, re_transition), pr) * re * pr
+
+
+def reference_temperature(t_edge, t_wall, t_aw):
+    """
+    Eckert's reference temperature
+    """
+    return 0.28 * t_edge + 0.5 * t_wall + 0.22 * t_aw
+
+
+def flat_plate(mach, t_edge, p_edge, length, t_wall=None, regime="transitional", average=False, g=default_n,
+               cp=default_cp, fluid=default_fluid, re_transition=default_re_transition):
+    """
+    Skin friction and heat transfer of a flat plate for arrays of edge Mach
+    number, edge temperature [K], edge pressure [Pa] and length x [m], all
+    broadcast together. t_wall [K] is None, 0 or NaN for an adiabatic wall.
+    Returns a dict of arrays: re (edge Reynolds number), re_ref, t_ref, t_aw,
+    t_wall, cf and st (referred to the edge state), nu, h [W/m2 K], q_wall
+    [W/m2, into the wall], tau_wall [Pa] and turbulent (boolean).
+    """
+    _check_regime(regime)
+    arrays = [np.asarray(value, dtype=float) for value in (mach, t_edge, p_edge, length,
+                                                           0.0 if t_wall is None else t_wall)]
+    mach, t_edge, p_edge, length, t_wall = np.broadcast_arrays(*arrays)
+    fluid = get_fluid(fluid)
+    viscosity = fluid_interp(fluid, "viscosity")
+    conductivity = fluid_interp(fluid, "conductivity")
+    r = cp * (g - 1) / g
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = mach * np.sqrt(g * r * t_edge)
+        rho_edge = p_edge / (r * t_edge)
+        mu_edge = viscosity(t_edge)
+        re = rho_edge * u * length / mu_edge
+        pr_edge = cp * mu_edge / conductivity(t_edge)
+        if regime == "transitional":
+            turbulent = re >= re_transition
+        else:
+            turbulent = np.full(re.shape, regime == "turbulent")
+        recovery = np.where(turbulent, np.cbrt(pr_edge), np.sqrt(pr_edge))
+        t_aw = t_edge * (1 + recovery * (g - 1) / 2 * mach * mach)
+        adiabatic = np.isnan(t_wall) | (t_wall == 0)
+        t_wall = np.where(adiabatic, t_aw, t_wall)
+
+        t_ref = reference_temperature(t_edge, t_wall, t_aw)
+        rho_ref = p_edge / (r * t_ref)
+        mu_ref = viscosity(t_ref)
+        k_ref = conductivity(t_ref)
+        re_ref = rho_ref * u * length / mu_ref
+        cf_ref = skin_friction(re_ref, regime, average, re_transition, turbulent)
+        tau_wall = cf_ref * rho_ref * u * u / 2
+        h = stanton(cf_ref, cp * mu_ref / k_ref) * rho_ref * u * cp
+        return {
+            're': re,
+            're_ref': re_ref,
+            't_ref': t_ref,
+            't_aw': t_aw,
+            't_wall': t_wall,
+            'cf': tau_wall / (rho_edge * u * u / 2),
+            'st': h / (rho_edge * u * cp),
+            'nu': h * length / k_ref,
+            'h': h,
+            'q_wall': h * (t_aw - t_wall),
+            'tau_wall': tau_wall,
+            'turbulent': turbulent,
+        }
+
+
+def range_grid(*axes):
+    """
+    Columns of every combination of the values of the axes (one sequence per
+    input), the last axis varying fastest
+    """
+    grids = np.meshgrid(*[np.asarray(axis, dtype=float) for axis in axes], indexing='ij')
+    return [grid.reshape(-1) for grid in grids]
+
+
+def solve_grid(axes, regime="transitional", average=False, g=default_n, cp=default_cp, fluid=default_fluid):
+    """
+    SI rows (in equation_variables order) of every combination of the input
+    axes (Mach, edge temperature, edge pressure, length, wall temperature)
+    """
+    columns = range_grid(*axes)
+    result = flat_plate(*columns, regime=regime, average=average, g=g, cp=cp, fluid=fluid)
+    columns[4] = result['t_wall']
+    columns += [result[name] for name in equation_variables[5:]]
+    return np.column_stack(columns).tolist()
+
+
+def flat_plate_solve(mach, t_edge, p_edge, length, t_wall, re, cf, st, q_wall, g, unknown=None):
+    """
+    Solve the flat_plate equation on arrays (transitional local values with
+    constant Cp and air transport properties), same variables as
+    equations.flat_plate. Rows with the first four inputs given and re, cf,
+    st and q_wall unknown are solved, the unknowns of other rows are NaN (no
+    solution). A blank or zero wall temperature is an adiabatic wall.
+    """
+    values = [np.array(array) for array in np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in
+                                                                  (mach, t_edge, p_edge, length, t_wall,
+                                                                   re, cf, st, q_wall)])]
+    masks = unknown_masks(values, unknown)
+    solve = ~(masks[0] | masks[1] | masks[2] | masks[3]) & masks[5] & masks[6] & masks[7] & masks[8]
+    result = flat_plate(*values[:4], np.where(masks[4], 0.0, values[4]), g=g)
+    for position, name in enumerate(equation_variables[4:], 4):
+        values[position] = np.where(solve, result[name], values[position])
+    # AN UNKNOWN THAT CAN NOT BE SOLVED IS NO SOLUTION, AS THE SCALAR SOLVER RAISES FOR IT
+    return tuple(np.where(mask & ~solve, np.nan, value) for mask, value in zip(masks, values))
@@ -0,0 +1,187 @@
+"""
+Bounded LRU memoization of the solvers in equations.py
+
+The key of a call is the equation name, its inputs rounded to a number of
+significant digits and the fluid properties (n, Cp, fluid model), so solving the same
+operating point again costs a dictionary lookup. Rounding is the expensive
+part of a lookup, so the exact inputs of every stored call are also kept as
+an alias of their rounded key: a point repeated bit for bit is found without
+rounding at all. Inputs that only round to a stored point get the stored
+solution with their own inputs echoed back, not the ones of the first call.
+The cache is opt-in: a disabled cache calls the solver straight away.
+"""
+from collections import OrderedDict
+from threading import Lock
+
+from . import equations
+
+default_max_size = 4096
+default_digits = 12
+
+
+class SolverCache:
+    """
+    LRU cache around equations.equation_table solvers
+    """
+
+    def __init__(self, max_size=default_max_size, digits=default_digits, enabled=True):
+        self.max_size = max_size
+        self.digits = digits
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # ROUNDED KEY -> (RESULT, INPUTS OF THE CALL THAT STORED IT)
+        self._entries = OrderedDict()
+        # EXACT KEY -> (ROUNDED KEY OF _ENTRIES, RESULT FOR THOSE EXACT INPUTS),
+        # ALIASES OF EVICTED ENTRIES ARE DROPPED LAZILY
+        self._aliases = {}
+        self._properties = None
+        self._lock = Lock()
+
+    def _round(self, value):
+        """
+        Round to the configured number of significant digits
+        """
+        if value is None:
+            return None
+        return float("%.*g" % (self.digits, value))
+
+    def _check_properties(self, properties):
+        """
+        Invalidate the cache when the fluid properties change
+        """
+        current = (properties['n'], properties['Cp'], properties.get('fluid'))
+        if current != self._properties:
+            self._entries.clear()
+            self._aliases.clear()
+            self._properties = current
+
+    def solve(self, equation, inputs, properties, unknown=None):
+        """
+        Solve equation (name in equations.equation_table) for the inputs given
+        in call order, with properties a dict holding 'n', 'Cp' and, for the
+        real gas equations, 'fluid'. unknown (name or position) is passed to
+        the relation of the equation, None keeps the zero is unknown rule
+        """
+        if not self.enabled:
+            info = equations.equation_table[equation]
+            if unknown is not None and info.relation is not None:
+                unknown = info.relation.position(unknown)
+            return self._solve(info, inputs, properties[info.gas_property], unknown)
+
+        # FAST PATH: EXACT INPUTS ALREADY SEEN, NO ROUNDING. ACQUIRE/RELEASE
+        # COSTS A FRACTION OF A WITH BLOCK, WHICH WOULD MAKE A HIT SLOWER THAN A SOLVE
+        inputs = tuple(inputs)
+        exact = (equation, inputs, unknown)
+        current = (properties['n'], properties['Cp'], properties.get('fluid'))
+        self._lock.acquire()
+        try:
+            if current == self._properties:
+                alias = self._aliases.get(exact)
+                if alias is not None and alias[0] in self._entries:
+                    self._entries.move_to_end(alias[0])
+                    self.hits += 1
+                    return alias[1]
+        finally:
+            self._lock.release()
+
+        info = equations.equation_table[equation]
+        if unknown is not None and info.relation is not None:
+            unknown = info.relation.position(unknown)
+        key = (equation, tuple(self._round(value) for value in inputs), unknown)
+        with self._lock:
+            self._check_properties(properties)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                result = self._echo(info, entry, inputs, unknown)
+                self._alias(exact, key, result)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = self._solve(info, inputs, properties[info.gas_property], unknown)
+
+        with self._lock:
+            self._entries[key] = (result, inputs)
+            self._alias(exact, key, result)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def _alias(self, exact, key, result):
+        """
+        Remember the rounded key and result of exact inputs, dropping the aliases when they outgrow the entries
+        """
+        if len(self._aliases) >= 2 * self.max_size:
+            self._aliases.clear()
+        self._aliases[exact] = (key, result)
+
+    @staticmethod
+    def _echo(info, entry, inputs, unknown):
+        """
+        Stored result with the inputs it echoes replaced by the caller's own
+        inputs, the solved values are kept
+        """
+        result, stored = entry
+        echoed = []
+        for name, value in zip(info.outputs, result):
+            position = info.inputs.index(name) if name in info.inputs else None
+            if position is not None and position != unknown and value == stored[position]:
+                value = inputs[position]
+            echoed.append(value)
+        return tuple(echoed)
+
+    @staticmethod
+    def _solve(info, inputs, gas_property, unknown):
+        if unknown is None or info.relation is None:
+            return info.solver(*inputs, gas_property)
+        return info.relation.solve(inputs, gas_property, unknown)
+
+    def invalidate(self):
+        """
+        Drop every cached result, counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self._properties = None
+
+    def resize(self, max_size):
+        """
+        Change the size limit, evicting the least recently used entries if needed
+        """
+        with self._lock:
+            self.max_size = max_size
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._aliases.clear()
+
+    def reset_counters(self):
+        """
+        Zero the hit, miss and eviction counters
+        """
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Dictionary of the cache counters
+        """
+        return {
+            'enabled': self.enabled,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ONE CACHE SHARED BY THE GUI TABS AND THE BATCH TOOLS, OFF UNTIL ENABLED
+shared_cache = SolverCache(enabled=False)
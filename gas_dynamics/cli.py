@@ -0,0 +1,412 @@
+# !/usr/bin/env python3
+# coding: utf-8
+"""
+Headless command line mode of the Gas Dynamics Calculator.
+
+Reads rows from a CSV or JSON Lines file (or stdin), solves each row with the
+chosen equation and streams the results to stdout. Rows are read lazily and
+solved chunk by chunk, so memory use does not grow with the size of the input.
+A blank or missing field marks the unknown of that row, a field that is not
+a number or a JSON line that does not parse is reported in the error column
+of its row. tkinter is never imported.
+
+Example:
+    python -m gas_dynamics ideal_compression points.csv --unit p1=bar --unit p2=bar
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+from math import isfinite
+
+from . import equations
+from .cache import shared_cache
+from .fluids import compositions, default_fluid
+from .instrumentation import instruments, profile
+from .result_log import ResultLog
+from .units import default_cp, default_n, unit_registry
+
+default_chunk_size = 10000
+
+
+def batch_available():
+    """
+    True when NumPy is installed and chunks can be solved in one pass.
+    NumPy is only imported here, on the first solve.
+    """
+    try:
+        from . import batch  # noqa: F401
+    except ImportError:  # NUMPY NOT INSTALLED, SOLVE ROW BY ROW
+        return False
+    return True
+
+
+def read_csv_rows(stream):
+    """
+    Generator of rows from a CSV stream with a header line
+    """
+    for row in csv.DictReader(stream):
+        yield row
+
+
+class UnreadableRow:
+    """
+    Row of the input that could not be read, solved as an all blank row and
+    reported with its message
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+
+def read_jsonl_rows(stream):
+    """
+    Generator of rows from a JSON Lines stream, blank lines are skipped and a
+    line that is not a JSON object gives an UnreadableRow
+    """
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:  # JSONDecodeError, OR A LINE THAT IS NOT UTF-8
+            yield UnreadableRow("Check JSON on line %d" % number)
+            continue
+        yield row if isinstance(row, dict) else UnreadableRow("Check JSON object on line %d" % number)
+
+
+def parse_value(value):
+    """
+    Returns the float value of a field, None for a blank field
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+    return float(value)
+
+
+def fill_blank_values(info, row):
+    """
+    SI row with the blank inputs that have a value in info.blank_values filled in
+    """
+    for name, value in info.blank_values:
+        position = info.inputs.index(name)
+        if row[position] is None:
+            row[position] = value
+    return row
+
+
+def row_error(values, unknowns=1):
+    """
+    Same rule as the GUI: exactly one input (unknowns inputs) must be blank
+    """
+    count_unknown = sum(1 for value in values if value is None)
+    if unknowns != 1:
+        return "" if count_unknown == unknowns else "%d Inputs must be blank" % unknowns
+    if count_unknown == 0:
+        return "One Input must be blank"
+    elif count_unknown > 1:
+        return "More than One Input is not defined"
+    return ""
+
+
+def solve_error(row, solved, unknowns=1):
+    """
+    Error message of a row after solving, empty if it was solved. A NaN or
+    infinite value is no solution, as the scalar solvers raise for it
+    """
+    error = row_error(row, unknowns)
+    if not error and any(value is None or not isfinite(value) for value in solved):
+        error = "No solution"
+    return error
+
+
+def chunks(rows, size):
+    """
+    Split a row generator in lists of at most size rows
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_chunk_scalar(info, values, gas_property):
+    """
+    Solve a chunk of SI rows one by one with equations.py
+    """
+    solved = []
+    for row in values:
+        if row_error(row, info.unknowns):
+            solved.append(row)
+            continue
+        try:
+            if info.relation is not None:
+                # THE BLANK IS THE UNKNOWN, A REAL ZERO STAYS AN INPUT
+                result = info.relation.solve([value or 0 for value in row], gas_property, row.index(None))
+            else:
+                result = info.solver(*[value or 0 for value in row], gas_property)
+        except (ValueError, ZeroDivisionError):
+            solved.append(row)
+            continue
+        result = dict(zip(info.outputs, result))
+        solved.append([result[name] for name in info.inputs])
+    return solved
+
+
+def solve_chunk_cached(info, values, gas_property, equation, cache):
+    """
+    Solve a chunk of SI rows one by one through a SolverCache
+    """
+    properties = {'n': default_n, 'Cp': default_cp, info.gas_property: gas_property}
+    solved = []
+    for row in values:
+        if row_error(row, info.unknowns):
+            solved.append(row)
+            continue
+        try:
+            unknown = row.index(None) if info.relation is not None else None
+            result = cache.solve(equation, [value or 0 for value in row], properties, unknown)
+        except (ValueError, ZeroDivisionError):
+            solved.append(row)
+            continue
+        result = dict(zip(info.outputs, result))
+        solved.append([result[name] for name in info.inputs])
+    return solved
+
+
+def solve_chunk_batch(info, values, gas_property):
+    """
+    Solve a chunk of SI rows in one pass with the batch solvers
+    """
+    from . import batch
+    np = batch.np
+    columns = list(zip(*values))
+    unknown = [np.array([value is None for value in column]) for column in columns]
+    arrays = [np.array([value or 0 for value in column], dtype=float) for column in columns]
+    if info.relation is not None:
+        result = info.relation.solve_arrays(arrays, gas_property, unknown)
+    else:
+        solver = getattr(batch, info.solver.__name__)
+        result = solver(*arrays, gas_property, unknown=unknown)
+    result = dict(zip(info.outputs, result))
+    solved = list(zip(*[result[name].tolist() for name in info.inputs]))
+    return [row if row_error(row, info.unknowns) else list(solved_row) for row, solved_row in zip(values, solved)]
+
+
+def solve_rows(rows, equation, units=None, gas_property=None, chunk_size=default_chunk_size, batch=True,
+               cache=None, log=None):
+    """
+    Generator solving input rows with the named equation.
+    Yields one dict per row with every variable in the requested units and an
+    error message for rows that could not be solved. Repeated points are
+    looked up in cache (a SolverCache) when one is given and enabled, and
+    solved rows are appended to log (a ResultLog) when one is given.
+    """
+    info = equations.equation_table[equation]
+    units = units or {}
+    if gas_property is None:
+        gas_property = {"n": default_n, "Cp": default_cp, "fluid": default_fluid}[info.gas_property]
+    quantities = [unit_registry[quantity] for quantity in info.quantities]
+    unit_ids = [quantity.unit_id(units.get(name, quantity.units[0])) for name, quantity in zip(info.inputs,
+                                                                                               quantities)]
+    if cache is not None and cache.enabled:
+        def solve_chunk(chunk_info, chunk_values, chunk_property):
+            return solve_chunk_cached(chunk_info, chunk_values, chunk_property, equation, cache)
+    elif batch and batch_available():
+        solve_chunk = solve_chunk_batch
+    else:
+        solve_chunk = solve_chunk_scalar
+
+    blank = [None] * len(info.inputs)
+    for chunk in chunks(rows, chunk_size):
+        values = []
+        parse_errors = []
+        with instruments.stage("cli.parse_rows"):
+            for row in chunk:
+                if isinstance(row, UnreadableRow):
+                    values.append(list(blank))
+                    parse_errors.append(row.message)
+                    continue
+                converted = []
+                parse_error = ""
+                for name, quantity, unit_id in zip(info.inputs, quantities, unit_ids):
+                    try:
+                        value = parse_value(row.get(name))
+                    except (TypeError, ValueError):
+                        # REPORTED IN THE ROW, THE REST OF THE CHUNK IS STILL SOLVED
+                        parse_error = parse_error or "Check values in %s" % name
+                        value = None
+                    converted.append(value if value is None else quantity.to_si(value, unit_id))
+                values.append(fill_blank_values(info, converted))
+                parse_errors.append(parse_error)
+        # A ROW THAT DID NOT PARSE GOES THROUGH THE SOLVERS AS AN ALL BLANK ROW, WHICH IS NEVER SOLVED
+        solved_chunk = solve_chunk(info, [blank if error else row for row, error in zip(values, parse_errors)],
+                                   gas_property)
+        solved_chunk = [row if error else solved for row, solved, error in zip(values, solved_chunk, parse_errors)]
+        errors = [parse_error or solve_error(row, solved, info.unknowns)
+                  for row, solved, parse_error in zip(values, solved_chunk, parse_errors)]
+        if log is not None:
+            properties = {'n': default_n, 'Cp': default_cp, info.gas_property: gas_property}
+            log.append_rows([solved for solved, error in zip(solved_chunk, errors) if not error],
+                            unit_ids, properties)
+        for solved, error in zip(solved_chunk, errors):
+            output = {}
+            for name, quantity, unit_id, value in zip(info.inputs, quantities, unit_ids, solved):
+                output[name] = None if value is None or not isfinite(value) else quantity.from_si(value, unit_id)
+            output["error"] = error
+            yield output
+
+
+def import_file(job, path, equation, gas_property=None, chunk_size=default_chunk_size):
+    """
+    Solve every row of a CSV or JSON Lines file in SI units as a background
+    job (see workers.JobExecutor), reporting progress by bytes read.
+    Returns the solved rows as lists of SI values in equation input order,
+    rows that could not be solved are left out.
+    """
+    info = equations.equation_table[equation]
+    size = max(os.path.getsize(path), 1)
+    read = [0]
+
+    def counted(lines):
+        for line in lines:
+            read[0] += len(line)
+            yield line
+
+    solved = []
+    with open(path, newline="", encoding="utf-8") as stream:
+        lines = counted(stream)
+        rows = read_jsonl_rows(lines) if path.endswith((".jsonl", ".json")) else read_csv_rows(lines)
+        for i, result in enumerate(solve_rows(rows, equation, gas_property=gas_property, chunk_size=chunk_size)):
+            if not result["error"]:
+                solved.append([result[name] for name in info.inputs])
+            if i % chunk_size == 0:
+                job.set_progress(read[0] / size)
+                job.check_cancelled()
+    return solved
+
+
+def write_csv(results, stream, fields):
+    """
+    Stream results as CSV
+    """
+    writer = csv.DictWriter(stream, fieldnames=fields, lineterminator="\n")
+    writer.writeheader()
+    for result in results:
+        writer.writerow(result)
+
+
+def write_jsonl(results, stream, fields):
+    """
+    Stream results as JSON Lines
+    """
+    for result in results:
+        stream.write(json.dumps(result) + "\n")
+
+
+def parse_units(unit_arguments):
+    """
+    Turns ["p1=bar", "t1=°C"] into {"p1": "bar", "t1": "°C"}
+    """
+    units = {}
+    for item in unit_arguments or []:
+        name, _, unit = item.partition("=")
+        if not unit:
+            raise argparse.ArgumentTypeError("Units must be given as VARIABLE=UNIT, got %r" % item)
+        units[name.strip()] = unit.strip()
+    return units
+
+
+def build_parser():
+    """
+    Command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Solve gas dynamics equations on CSV/JSONL rows without the GUI")
+    parser.add_argument("equation", choices=sorted(equations.equation_table))
+    parser.add_argument("input", nargs="?", default="-", help="input file, - for stdin (default)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="input and output format, default from extension")
+    parser.add_argument("--unit", action="append", metavar="VARIABLE=UNIT",
+                        help="unit of a variable for input and output, SI if not given")
+    parser.add_argument("--property", type=float, dest="gas_property",
+                        help="isentropic exponent n, or Cp for shaft_work")
+    parser.add_argument("--fluid", choices=sorted(compositions),
+                        help="variable property fluid of the *_real equations (default %s)" % default_fluid)
+    parser.add_argument("--chunk-size", type=int, default=default_chunk_size)
+    parser.add_argument("--scalar", action="store_true", help="solve row by row even if NumPy is available")
+    parser.add_argument("--log", metavar="PATH", help="append the solved rows to a result log file")
+    parser.add_argument("--cache", type=int, metavar="SIZE",
+                        help="memoize repeated points in an LRU cache of SIZE entries, rows are then "
+                             "solved one by one instead of in NumPy batches")
+    parser.add_argument("--timings", action="store_true",
+                        help="print the time spent per stage to stderr after the run")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write a cProfile report of the run, PATH ending in .prof gets raw pstats data")
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point of the command line mode
+    """
+    args = build_parser().parse_args(argv)
+    if args.timings:
+        instruments.enable()
+    if args.profile:
+        with profile(args.profile):
+            status = run(args)
+    else:
+        status = run(args)
+    if args.timings:
+        sys.stderr.write(json.dumps(instruments.report(), indent=2) + "\n")
+    return status
+
+
+def run(args):
+    """
+    Solve the input of parsed command line arguments
+    """
+    data_format = args.format or ("jsonl" if args.input.endswith((".jsonl", ".json")) else "csv")
+    info = equations.equation_table[args.equation]
+    if args.cache:
+        shared_cache.resize(args.cache)
+        shared_cache.enabled = True
+    fields = list(info.inputs) + ["error"]
+
+    stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    log = None
+    try:
+        if args.log:
+            log = ResultLog(args.log, args.equation)
+        rows = read_jsonl_rows(stream) if data_format == "jsonl" else read_csv_rows(stream)
+        gas_property = args.fluid if info.gas_property == "fluid" else args.gas_property
+        results = solve_rows(rows, args.equation, parse_units(args.unit), gas_property, args.chunk_size,
+                             batch=not args.scalar, cache=shared_cache, log=log)
+        writer = write_jsonl if data_format == "jsonl" else write_csv
+        writer(results, sys.stdout, fields)
+    except (ValueError, KeyError, OSError) as error:
+        sys.stderr.write("Error: %s\n" % error)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if log is not None:
+            log.close()
+    return 0
+
+
+# STAGES TIMED WITH --timings
+instruments.register(sys.modules[__name__], "solve_chunk_scalar", "cli.solve_chunk_scalar")
+instruments.register(sys.modules[__name__], "solve_chunk_cached", "cli.solve_chunk_cached")
+instruments.register(sys.modules[__name__], "solve_chunk_batch", "cli.solve_chunk_batch")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
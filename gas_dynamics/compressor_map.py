@@ -0,0 +1,276 @@
+"""
+Compressor maps: speed lines of corrected flow, pressure ratio and efficiency
+
+A map is read from a CSV file with the columns speed, flow, pressure_ratio
+and efficiency, one row per map point, the points of a speed line in order
+along the line. Every speed line is resampled to beta_points points spaced
+evenly along the line (beta = 0 at the low flow, surge end, beta = 1 at the
+choke end), which turns the map into a regular (speed, beta) grid. Its cells,
+split in two triangles each, cover the map in the (flow, pressure ratio)
+plane.
+
+TriangleIndex is a spatial index of these triangles in uniform grid buckets,
+pure NumPy: an operating point is tested only against the few triangles of
+its bucket, all points of a batch at once, and the speed and efficiency are
+interpolated linearly in the triangle that contains it. Points outside the
+map get NaN.
+
+Surge margin at constant corrected speed, with the surge point interpolated
+between the surge ends of the speed lines:
+    SM = (PR_surge / W_surge) / (PR / W) - 1
+
+CompressorMap.shaft_work() feeds the interpolated efficiency into the
+compressor_efficiency and shaft_work relations of equations.py.
+"""
+import csv
+import os
+
+import numpy as np
+
+from . import equations
+from .units import default_cp, default_n
+
+default_beta_points = 101
+# TRIANGLES PER BUCKET THE GRID IS SIZED FOR, THE LONG THIN CELLS OF A MAP EACH COVER SEVERAL BUCKETS
+default_bucket_load = 0.25
+map_columns = ("speed", "flow", "pressure_ratio", "efficiency")
+
+_map_cache = {}
+
+
+class TriangleIndex:
+    """
+    Point location in a set of triangles through uniform grid buckets
+    """
+
+    def __init__(self, vertices, triangles, bucket_load=default_bucket_load):
+        """
+        vertices (n, 2) coordinates, triangles (m, 3) vertex indices
+        """
+        vertices = np.asarray(vertices, dtype=float)
+        triangles = np.asarray(triangles, dtype=int)
+        self.origin = vertices.min(axis=0)
+        self.scale = np.where(np.ptp(vertices, axis=0) > 0, np.ptp(vertices, axis=0), 1.0)
+        points = (vertices - self.origin) / self.scale
+
+        # AFFINE INVERSE OF EVERY TRIANGLE: (l1, l2) = inverse @ (p - a), DEGENERATE TRIANGLES ARE DROPPED
+        a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+        determinant = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+        keep = np.abs(determinant) > 1e-14
+        self.triangles = triangles[keep]
+        a, b, c, determinant = a[keep], b[keep], c[keep], determinant[keep]
+        # ONE ROW PER TRIANGLE SO A CANDIDATE COSTS A SINGLE GATHER: ax, ay, i00, i01, i10, i11
+        self.coefficients = np.stack([a[:, 0], a[:, 1],
+                                      (c[:, 1] - a[:, 1]) / determinant, (a[:, 0] - c[:, 0]) / determinant,
+                                      (a[:, 1] - b[:, 1]) / determinant, (b[:, 0] - a[:, 0]) / determinant], axis=1)
+
+        # CANDIDATE (BUCKET, TRIANGLE) PAIRS FROM THE BOUNDING BOX OF EACH TRIANGLE
+        count = len(self.triangles)
+        self.cells = max(1, int(np.sqrt(count / bucket_load)))
+        corners = np.stack([a, b, c], axis=1)
+        low = self._cell(corners.min(axis=1))
+        high = self._cell(corners.max(axis=1))
+        span = high - low + 1
+        repeats = span[:, 0] * span[:, 1]
+        owner = np.repeat(np.arange(count), repeats)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        ix = low[owner, 0] + offset % span[owner, 0]
+        iy = low[owner, 1] + offset // span[owner, 0]
+
+        # SEPARATING AXIS TEST: DROP THE PAIR WHEN THE BUCKET LIES ENTIRELY OUTSIDE ONE EDGE OF THE
+        # TRIANGLE (SKINNY DIAGONAL TRIANGLES HAVE BOUNDING BOXES FAR LARGER THAN THEMSELVES)
+        size = 1.0 / self.cells
+        corner_x = (ix[:, None] + np.array([0, 1, 0, 1])) * size
+        corner_y = (iy[:, None] + np.array([0, 0, 1, 1])) * size
+        orientation = np.sign(determinant)[owner]
+        touching = np.ones(len(owner), dtype=bool)
+        for start, end in ((a, b), (b, c), (c, a)):
+            start, end = start[owner], end[owner]
+            side = ((end[:, 0] - start[:, 0])[:, None] * (corner_y - start[:, 1][:, None])
+                    - (end[:, 1] - start[:, 1])[:, None] * (corner_x - start[:, 0][:, None]))
+            touching &= np.any(side * orientation[:, None] >= -1e-12, axis=1)
+        owner = owner[touching]
+        bucket = ix[touching] * self.cells + iy[touching]
+
+        # COMPACT TABLE BUCKET -> TRIANGLES: THE TRIANGLES OF BUCKET k ARE owners[starts[k]:starts[k] + sizes[k]]
+        order = np.argsort(bucket, kind='stable')
+        self.owners = owner[order]
+        self.sizes = np.bincount(bucket, minlength=self.cells * self.cells)
+        self.starts = np.cumsum(self.sizes) - self.sizes
+
+    def _cell(self, points):
+        """
+        Bucket coordinates of normalized points, clipped to the grid
+        """
+        return np.clip((points * self.cells).astype(int), 0, self.cells - 1)
+
+    def locate(self, points, tolerance=1e-9):
+        """
+        (triangle position in self.triangles or -1, barycentric weights (q, 3))
+        of an array of points (q, 2)
+        """
+        points = (np.asarray(points, dtype=float).reshape(-1, 2) - self.origin) / self.scale
+        inside_box = np.all((points >= -tolerance) & (points <= 1 + tolerance), axis=1)
+        cell = self._cell(np.nan_to_num(points, nan=-1.0))
+        bucket = cell[:, 0] * self.cells + cell[:, 1]
+        # ONE (POINT, CANDIDATE) PAIR PER TRIANGLE OF THE BUCKET, ONLY AS MANY AS THE BUCKET HOLDS
+        counts = np.where(inside_box, self.sizes[bucket], 0)
+        query = np.repeat(np.arange(len(points)), counts)
+        first = np.cumsum(counts) - counts
+        candidates = self.owners[np.repeat(self.starts[bucket] - first, counts) + np.arange(len(query))]
+        coefficients = self.coefficients[candidates]
+        dx = points[query, 0] - coefficients[:, 0]
+        dy = points[query, 1] - coefficients[:, 1]
+        l1 = coefficients[:, 2] * dx + coefficients[:, 3] * dy
+        l2 = coefficients[:, 4] * dx + coefficients[:, 5] * dy
+        l0 = 1 - l1 - l2
+        hit = np.flatnonzero((l0 >= -tolerance) & (l1 >= -tolerance) & (l2 >= -tolerance))
+        # FIRST HIT OF EVERY POINT, THE PAIRS ARE IN POINT ORDER
+        hit = hit[np.concatenate([[True], query[hit[1:]] != query[hit[:-1]]])] if len(hit) else hit
+        triangle = np.full(len(points), -1, dtype=np.intp)
+        weights = np.full((len(points), 3), np.nan)
+        triangle[query[hit]] = candidates[hit]
+        weights[query[hit]] = np.stack([l0[hit], l1[hit], l2[hit]], axis=1)
+        return triangle, weights
+
+
+class CompressorMap:
+    """
+    Compressor map on a regular (speed, beta) grid with a spatial index over its cells
+    """
+
+    def __init__(self, speed, flow, pressure_ratio, efficiency, beta_points=default_beta_points):
+        """
+        Arrays of map points, the points of one speed line in order along the line
+        """
+        speed, flow, pressure_ratio, efficiency = [np.asarray(value, dtype=float).reshape(-1) for value in
+                                                   (speed, flow, pressure_ratio, efficiency)]
+        if beta_points < 2:
+            raise ValueError("beta_points must be at least 2")
+        self.speeds, line = np.unique(speed, return_inverse=True)
+        if len(self.speeds) < 2:
+            raise ValueError("A compressor map needs at least two speed lines")
+        flow_range = np.ptp(flow) or 1.0
+        pressure_ratio_range = np.ptp(pressure_ratio) or 1.0
+
+        # RESAMPLE EVERY SPEED LINE EVENLY ALONG ITS LENGTH IN THE NORMALIZED PLANE, SURGE END FIRST
+        beta = np.linspace(0, 1, beta_points)
+        grid = np.empty((3, len(self.speeds), beta_points))
+        for i in range(len(self.speeds)):
+            rows = np.flatnonzero(line == i)
+            if len(rows) < 2:
+                raise ValueError("Speed line %g has less than two points" % self.speeds[i])
+            if flow[rows[0]] > flow[rows[-1]]:
+                rows = rows[::-1]
+            step = np.hypot(np.diff(flow[rows]) / flow_range, np.diff(pressure_ratio[rows]) / pressure_ratio_range)
+            length = np.concatenate([[0.0], np.cumsum(step)])
+            if length[-1] == 0:
+                raise ValueError("Speed line %g has no length" % self.speeds[i])
+            for column, values in enumerate((flow, pressure_ratio, efficiency)):
+                grid[column, i] = np.interp(beta * length[-1], length, values[rows])
+        self.beta = beta
+        self.flow, self.pressure_ratio, self.efficiency = grid
+        self.surge_flow = self.flow[:, 0]
+        self.surge_pressure_ratio = self.pressure_ratio[:, 0]
+
+        # TWO TRIANGLES PER GRID CELL, VERTEX NUMBER = SPEED LINE * BETA_POINTS + BETA POSITION
+        i, j = np.meshgrid(np.arange(len(self.speeds) - 1), np.arange(beta_points - 1), indexing='ij')
+        corner = (i * beta_points + j).reshape(-1)
+        triangles = np.concatenate([
+            np.stack([corner, corner + beta_points, corner + beta_points + 1], axis=1),
+            np.stack([corner, corner + beta_points + 1, corner + 1], axis=1),
+        ])
+        vertices = np.stack([self.flow.reshape(-1), self.pressure_ratio.reshape(-1)], axis=1)
+        self.index = TriangleIndex(vertices, triangles)
+        # SPEED, BETA AND EFFICIENCY OF EVERY VERTEX, INTERPOLATED TOGETHER WITH ONE SET OF WEIGHTS
+        self._vertex_values = np.stack([np.repeat(self.speeds, beta_points), np.tile(beta, len(self.speeds)),
+                                        self.efficiency.reshape(-1)], axis=1)
+
+    def interpolate(self, flow, pressure_ratio):
+        """
+        Dict of speed, beta, efficiency and surge_margin arrays at operating
+        points (corrected flow, pressure ratio), NaN outside the map, and inside
+        """
+        flow, pressure_ratio = np.broadcast_arrays(np.asarray(flow, dtype=float),
+                                                   np.asarray(pressure_ratio, dtype=float))
+        shape = flow.shape
+        triangle, weights = self.index.locate(np.stack([flow.reshape(-1), pressure_ratio.reshape(-1)], axis=1))
+        vertices = self.index.triangles[np.maximum(triangle, 0)]
+        result = {'inside': (triangle >= 0).reshape(shape)}
+        values = np.einsum('qk,qkc->cq', weights, self._vertex_values[vertices])
+        for name, column in zip(('speed', 'beta', 'efficiency'), values):
+            result[name] = column.reshape(shape)
+        surge_flow = np.interp(result['speed'], self.speeds, self.surge_flow)
+        surge_pressure_ratio = np.interp(result['speed'], self.speeds, self.surge_pressure_ratio)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result['surge_margin'] = (surge_pressure_ratio / surge_flow) / (pressure_ratio / flow) - 1
+        return result
+
+    def shaft_work(self, flow, pressure_ratio, t1, g=default_n, cp=default_cp, fluid=None):
+        """
+        Operating points through the map and the shaft work equations: the
+        interpolated efficiency gives the outlet temperature (compressor_efficiency
+        relation) and the work per kg (shaft_work relation, negative for a
+        compressor). With a fluid the real gas relations are used instead.
+        Returns the interpolate() dict with t2_ideal, t2 and work added.
+        """
+        result = self.interpolate(flow, pressure_ratio)
+        pressure_ratio, t1 = np.broadcast_arrays(np.asarray(pressure_ratio, dtype=float),
+                                                 np.asarray(t1, dtype=float))
+        if fluid is None:
+            _, _, _, t2_ideal = equations.ideal_compression_relation.solve_arrays(
+                (1.0, pressure_ratio, t1, 0.0), g, "t2")
+            _, _, t2, _ = equations.compressor_efficiency_relation.solve_arrays(
+                (pressure_ratio, t1, 0.0, result['efficiency']), g, "t2")
+            work, _, _ = equations.shaft_work_relation.solve_arrays((0.0, t1, t2), cp, "w")
+        else:
+            _, _, _, t2_ideal = equations.ideal_compression_real_relation.solve_arrays(
+                (1.0, pressure_ratio, t1, 0.0), fluid, "t2")
+            ideal_work, _, _ = equations.shaft_work_real_relation.solve_arrays((0.0, t1, t2_ideal), fluid, "w")
+            work = ideal_work / result['efficiency']
+            _, _, t2 = equations.shaft_work_real_relation.solve_arrays((work, t1, 0.0), fluid, "t2")
+        result['t2_ideal'] = t2_ideal
+        result['t2'] = t2
+        result['work'] = work
+        return result
+
+    def __repr__(self):
+        return "CompressorMap(%d speed lines, %d beta points)" % (len(self.speeds), len(self.beta))
+
+
+def read_map(path, beta_points=default_beta_points):
+    """
+    CompressorMap from a CSV file with the columns of map_columns
+    """
+    with open(path, newline="", encoding="utf-8") as stream:
+        reader = csv.DictReader(stream)
+        missing = [name for name in map_columns if name not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError("Compressor map %s has no column %s" % (path, ", ".join(missing)))
+        try:
+            columns = list(zip(*[[float(row[name]) for name in map_columns] for row in reader]))
+        except (TypeError, ValueError) as error:
+            raise ValueError("Compressor map %s: %s" % (path, error)) from None
+    if not columns:
+        raise ValueError("Compressor map %s is empty" % path)
+    return CompressorMap(*columns, beta_points=beta_points)
+
+
+def get_map(path, beta_points=default_beta_points):
+    """
+    Cached CompressorMap of a CSV file, read again when the file changes
+    """
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path), int(beta_points))
+    compressor_map = _map_cache.get(key)
+    if compressor_map is None:
+        compressor_map = read_map(path, beta_points)
+        _map_cache[key] = compressor_map
+    return compressor_map
+
+
+def clear_cache():
+    """
+    Drop every cached map
+    """
+    _map_cache.clear()
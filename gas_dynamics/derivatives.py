@@ -0,0 +1,230 @@
+"""
+Analytic derivatives of the relations by forward mode dual numbers
+
+A Dual carries a NumPy array of values and the gradient of every value with
+respect to the seeded variables, one row per variable. The closed form
+solutions of relations.py are written against a math namespace, so running
+the solution for the unknown on Duals with dual_math gives the unknown and
+its exact partial derivatives with respect to every known variable (and
+optionally the gas property) for a whole batch in one evaluation, without
+finite difference steps. The fluid table functions are differentiated as the
+piecewise linear interpolation they are.
+
+    result = jacobian("static_pressure", (2e5, 0, mach), "ps")
+    result.matrix    # (points, 2): d ps / d pt, d ps / d m
+"""
+from collections import OrderedDict, namedtuple
+from types import SimpleNamespace
+
+import numpy as np
+
+from . import equations
+from .fluids import default_fluid
+from .units import default_cp, default_n
+
+# VALUE OF THE UNKNOWN, NAMES OF THE COLUMNS AND (POINTS, NAMES) MATRIX OF PARTIAL DERIVATIVES
+Jacobian = namedtuple("Jacobian", ("value", "names", "matrix"))
+
+
+def _parts(x):
+    """
+    (value, gradient) of a Dual, gradient None for a constant
+    """
+    if isinstance(x, Dual):
+        return x.value, x.gradient
+    return x, None
+
+
+def _sum(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return first + second
+
+
+def _scale(gradient, factor):
+    return None if gradient is None else gradient * factor
+
+
+class Dual:
+    """
+    Array of values with their gradients over the seeded variables
+    """
+    __slots__ = ("value", "gradient")
+    # NUMPY ARRAYS AND SCALARS ON THE LEFT DEFER TO THE REFLECTED OPERATORS
+    __array_ufunc__ = None
+
+    def __init__(self, value, gradient):
+        self.value = value
+        self.gradient = gradient
+
+    def __neg__(self):
+        return Dual(-self.value, -self.gradient)
+
+    def __add__(self, other):
+        value, gradient = _parts(other)
+        return Dual(self.value + value, _sum(self.gradient, gradient))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        value, gradient = _parts(other)
+        return Dual(self.value - value, _sum(self.gradient, _scale(gradient, -1)))
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        value, gradient = _parts(other)
+        return Dual(self.value * value, _sum(self.gradient * value, _scale(gradient, self.value)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        value, gradient = _parts(other)
+        result = self.value / value
+        return Dual(result, _sum(self.gradient / value, _scale(gradient, -result / value)))
+
+    def __rtruediv__(self, other):
+        result = other / self.value
+        return Dual(result, self.gradient * (-result / self.value))
+
+    def __pow__(self, other):
+        return power(self, other)
+
+    def __rpow__(self, other):
+        return power(other, self)
+
+    def __repr__(self):
+        return "Dual(%r, %r)" % (self.value, self.gradient)
+
+
+def power(base, exponent):
+    """
+    base ** exponent, either of them a Dual
+    """
+    base_value, base_gradient = _parts(base)
+    exponent_value, exponent_gradient = _parts(exponent)
+    value = np.power(base_value, exponent_value)
+    gradient = _scale(base_gradient, exponent_value * np.power(base_value, exponent_value - 1))
+    # THE LOG TERM ONLY WHEN THE EXPONENT VARIES, SO A NEGATIVE BASE WITH A CONSTANT EXPONENT STAYS FINITE
+    gradient = _sum(gradient, _scale(exponent_gradient, value * np.log(base_value)))
+    return Dual(value, gradient) if gradient is not None else value
+
+
+def _unary(function, derivative):
+    """
+    Math function applied to a float, array or Dual, derivative(value, result)
+    """
+    def apply(x):
+        value, gradient = _parts(x)
+        result = function(value)
+        if gradient is None:
+            return result
+        return Dual(result, gradient * derivative(value, result))
+    return apply
+
+
+def _table_slope(x_table, y_table, x):
+    """
+    Slope of the piecewise linear interpolation of y_table over x_table at x, NaN outside
+    """
+    i = np.clip(np.searchsorted(x_table, x, side='right') - 1, 0, len(x_table) - 2)
+    slope = (y_table[i + 1] - y_table[i]) / (x_table[i + 1] - x_table[i])
+    return np.where((x >= x_table[0]) & (x <= x_table[-1]), slope, np.nan)
+
+
+def _fluid_function(name):
+    """
+    Fluid table lookup of dual_math: interpolated value and table slope
+    """
+    def apply(fluid, x):
+        temperature, enthalpy, entropy = fluid.arrays()
+        column = entropy if name.endswith("entropy") else enthalpy
+        x_table, y_table = (column, temperature) if name.startswith("temperature_from_") else (temperature, column)
+        value, gradient = _parts(x)
+        result = np.interp(value, x_table, y_table, left=np.nan, right=np.nan)
+        if gradient is None:
+            return result
+        return Dual(result, gradient * _table_slope(x_table, y_table, value))
+    return apply
+
+
+# MATH OF THE SOLUTIONS ON DUALS, SAME NAMES AS relations.scalar_math
+dual_math = SimpleNamespace(
+    pow=power,
+    sqrt=_unary(np.sqrt, lambda value, result: 0.5 / result),
+    exp=_unary(np.exp, lambda value, result: result),
+    log=_unary(np.log, lambda value, result: 1 / value),
+    enthalpy=_fluid_function("enthalpy"),
+    entropy=_fluid_function("entropy"),
+    temperature_from_enthalpy=_fluid_function("temperature_from_enthalpy"),
+    temperature_from_entropy=_fluid_function("temperature_from_entropy"),
+)
+
+
+def jacobian(equation, values, unknown, gas_property=None, property_derivative=False):
+    """
+    Solve every point of an equation of equations.equation_table for unknown
+    and differentiate it with respect to the other variables in one pass.
+    values are arrays (or numbers) in call order, the value of the unknown is
+    ignored. With property_derivative the gas property (n or Cp, not a fluid)
+    gets a column too. Returns a Jacobian.
+    """
+    info = equations.equation_table[equation]
+    relation = info.relation
+    if relation is None:
+        raise ValueError("Analytic derivatives need an equation with a relation, %s has none" % equation)
+    position = relation.position(unknown)
+    if gas_property is None:
+        gas_property = {"n": default_n, "Cp": default_cp, "fluid": default_fluid}[info.gas_property]
+    if property_derivative and relation.prepare is not None:
+        raise ValueError("%s has a fluid, its property cannot be differentiated" % equation)
+
+    arrays = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in values],
+                                 np.asarray(gas_property if relation.prepare is None else 0.0, dtype=float))
+    shape = arrays[0].shape
+    names = [name for i, name in enumerate(relation.variables) if i != position]
+    if property_derivative:
+        names.append(info.gas_property)
+    count = int(np.prod(shape))
+    seeds = {name: Dual(array.reshape(-1), np.zeros((len(names), count)))
+             for name, array in zip(relation.variables, arrays) if name in names}
+    for row, name in enumerate(names[:len(names) - property_derivative]):
+        seeds[name].gradient[row] = 1.0
+    if relation.prepare is not None:
+        prepared = relation.prepare(gas_property)
+    elif property_derivative:
+        prepared = Dual(arrays[-1].reshape(-1), np.zeros((len(names), count)))
+        prepared.gradient[-1] = 1.0
+    else:
+        prepared = arrays[-1].reshape(-1)
+
+    function, arguments = relation.dispatch[position]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = function(*[seeds[relation.variables[i]] for i in arguments], prepared, dual_math)
+    value, gradient = _parts(result)
+    if gradient is None:
+        gradient = np.zeros((len(names), count))
+    value = np.broadcast_to(value, (count,)).reshape(shape)
+    return Jacobian(value, tuple(names), gradient.T.reshape(shape + (len(names),)))
+
+
+def sensitivity(equation, values, unknown, gas_property=None):
+    """
+    Relative sensitivities (d ln unknown / d ln variable) of the solved unknown
+    to every other variable and the gas property, one array each, from a
+    single Jacobian evaluation
+    """
+    info = equations.equation_table[equation]
+    numeric = info.relation is not None and info.relation.prepare is None
+    result = jacobian(equation, values, unknown, gas_property, property_derivative=numeric)
+    if gas_property is None:
+        gas_property = {"n": default_n, "Cp": default_cp, "fluid": default_fluid}[info.gas_property]
+    arrays = dict(zip(info.relation.variables, np.broadcast_arrays(*[np.asarray(value, dtype=float)
+                                                                     for value in values])))
+    arrays[info.gas_property] = gas_property
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return OrderedDict((name, result.matrix[..., i] * arrays[name] / result.value)
+                           for i, name in enumerate(result.names))
@@ -0,0 +1,432 @@
+"""
+Fanno and Rayleigh flow through long ducts on arrays
+
+Fanno flow is adiabatic flow with wall friction in a constant area duct,
+Rayleigh flow is frictionless flow with heat addition or removal. Both are
+described by reference functions of the Mach number, relative to the choked
+state (M = 1, marked *):
+    Fanno:    4fL*/D, p/p*, T/T*, pt/pt*
+    Rayleigh: p/p*, T/T*, Tt/Tt*, pt/pt*
+
+A duct is a list of segments. Across a Fanno segment 4fL*/D drops by
+4 f dx / D, across a Rayleigh segment Tt rises by q / Cp, so marching through
+the duct is a cumulative sum over the segments and the Mach number at every
+station is one inverse lookup of the reference function. fanno_march() and
+rayleigh_march() do this for whole arrays of inlet cases at once, with no
+Python loop per segment or per case. A case chokes where 4fL*/D would become
+negative (Fanno) or Tt/Tt* would exceed 1 (Rayleigh): the position is
+reported and the stations downstream of it are NaN.
+
+ReferenceTable precomputes the reference functions of one flow and gamma on a
+subsonic and a supersonic Mach grid and answers inverse lookups (Mach number
+from 4fL*/D, p/p*, T/T*, ...) by interpolation, the grid is refined until the
+lookups are within the requested tolerance. Tables are cached per (flow,
+gamma, mach_min, mach_max, tolerance), use get_table() to share them.
+"""
+import numpy as np
+
+from .batch import unknown_masks
+from .equations import reference_mach_min
+
+# SAME SUBSONIC LIMIT AS THE SCALAR BISECTION, SO BOTH PATHS SOLVE THE SAME INPUTS
+default_mach_min = reference_mach_min
+default_mach_max = 10.0
+default_tolerance = 1e-6  # RELATIVE ERROR OF THE MACH NUMBER
+max_points = 2 ** 16
+
+fanno_names = ("fld", "p_ratio", "t_ratio", "pt_ratio")
+rayleigh_names = ("p_ratio", "t_ratio", "tt_ratio", "pt_ratio")
+
+_table_cache = {}
+
+
+def fanno_functions(m, g):
+    """
+    (4fL*/D, p/p*, T/T*, pt/pt*) of Fanno flow at Mach m
+    """
+    m = np.asarray(m, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m_sq = m * m
+        a = 2 + (g - 1) * m_sq
+        t_ratio = (g + 1) / a
+        fld = (1 - m_sq) / (g * m_sq) + (g + 1) / (2 * g) * np.log((g + 1) * m_sq / a)
+        p_ratio = np.sqrt(t_ratio) / m
+        pt_ratio = np.power(a / (g + 1), (g + 1) / (2 * (g - 1))) / m
+    return fld, p_ratio, t_ratio, pt_ratio
+
+
+def rayleigh_functions(m, g):
+    """
+    (p/p*, T/T*, Tt/Tt*, pt/pt*) of Rayleigh flow at Mach m
+    """
+    m = np.asarray(m, dtype=float)
+    m_sq = m * m
+    a = 2 + (g - 1) * m_sq
+    b = 1 + g * m_sq
+    p_ratio = (1 + g) / b
+    t_ratio = m_sq * p_ratio * p_ratio
+    tt_ratio = (g + 1) * m_sq * a / (b * b)
+    pt_ratio = p_ratio * np.power(a / (g + 1), g / (g - 1))
+    return p_ratio, t_ratio, tt_ratio, pt_ratio
+
+
+# FLOW: (REFERENCE FUNCTIONS, THEIR NAMES)
+flows = {
+    "fanno": (fanno_functions, fanno_names),
+    "rayleigh": (rayleigh_functions, rayleigh_names),
+}
+
+
+# REFERENCE FUNCTIONS WITH A ZERO SLOPE AT M = 1 (THE EXTREMUM OF 4fL*/D, Tt/Tt* AND pt/pt*)
+flat_names = ("fld", "tt_ratio", "pt_ratio")
+
+
+def _star(name):
+    """
+    Value of a reference function at M = 1
+    """
+    return 0.0 if name == "fld" else 1.0
+
+
+class ReferenceTable:
+    """
+    Reference functions of one flow and gamma on a subsonic and a supersonic Mach grid
+    """
+
+    def __init__(self, flow, g, mach_min=default_mach_min, mach_max=default_mach_max, tolerance=default_tolerance):
+        if flow not in flows:
+            raise ValueError("Unknown flow %r, expected one of %s" % (flow, ", ".join(flows)))
+        self.flow = flow
+        self.g = float(g)
+        self.mach_min = float(mach_min)
+        self.mach_max = float(mach_max)
+        self.tolerance = float(tolerance)
+        self.functions, self.names = flows[flow]
+
+        points = 257
+        while True:
+            self._build(points)
+            error = self.max_error()
+            if error <= self.tolerance:
+                break
+            if points * 2 > max_points:
+                raise ValueError("Tolerance %g not reachable for gamma %g, best was %g" % (tolerance, g, error))
+            points = points * 2 - 1
+        self.error = error
+
+    def _grid(self, points, supersonic):
+        """
+        Mach grid of a branch, uniform in log M below 1 (the functions go like
+        1/M or 1/M^2 at low Mach) and uniform in M above
+        """
+        if supersonic:
+            return np.linspace(1, self.mach_max, points)
+        return np.exp(np.linspace(np.log(self.mach_min), 0, points))
+
+    @staticmethod
+    def _coordinate(name, value):
+        """
+        Interpolation coordinate of a reference value, |value - value at M = 1|,
+        or its square root for the functions flat at M = 1: they go like
+        (M - 1)^2 there, so the Mach number is smooth in the square root
+        """
+        if name in flat_names:
+            return np.sqrt(np.abs(value - _star(name)))
+        return np.abs(value - _star(name))
+
+    def _build(self, points):
+        """
+        Fill the columns of both branches and the inverse of every column that
+        is monotonic on the branch
+        """
+        # SUPERSONIC: (MACH GRID, {NAME: COLUMN}, {NAME: (SORTED COORDINATE, MACH, SIDE OF THE * VALUE)})
+        self.branches = {}
+        for supersonic in (False, True):
+            mach = self._grid(points, supersonic)
+            columns = dict(zip(self.names, self.functions(mach, self.g)))
+            inverse = {}
+            for name, column in columns.items():
+                coordinate = self._coordinate(name, column)
+                step = np.diff(coordinate)
+                side = np.sign(column[0 if not supersonic else -1] - _star(name))
+                if np.all(step > 0):
+                    inverse[name] = (coordinate, mach, side)
+                elif np.all(step < 0):
+                    inverse[name] = (coordinate[::-1], mach[::-1], side)
+            self.branches[supersonic] = (mach, columns, inverse)
+
+    def invertible(self, name, supersonic=False):
+        """
+        True if name gives a unique Mach number on the branch
+        """
+        return name in self.branches[bool(supersonic)][2]
+
+    def _lookup(self, name, value, supersonic):
+        mach, columns, inverse = self.branches[supersonic]
+        try:
+            coordinate, grid, side = inverse[name]
+        except KeyError:
+            raise ValueError("%s of %s flow gives no unique %s Mach number" % (
+                name, self.flow, "supersonic" if supersonic else "subsonic")) from None
+        result = np.interp(self._coordinate(name, value), coordinate, grid, left=np.nan, right=np.nan)
+        with np.errstate(invalid='ignore'):
+            return np.where((value - _star(name)) * side >= 0, result, np.nan)
+
+    def mach(self, name, value, supersonic=False):
+        """
+        Mach number at which the reference function name has value, on the
+        subsonic or supersonic branch (supersonic may be a boolean array, one
+        branch per value). NaN outside the table
+        """
+        value = np.asarray(value, dtype=float)
+        if np.ndim(supersonic) == 0:
+            return self._lookup(name, value, bool(supersonic))
+        supersonic = np.asarray(supersonic, dtype=bool)
+        result = self._lookup(name, value, False)
+        if supersonic.any():
+            result = np.where(supersonic, self._lookup(name, value, True), result)
+        return result
+
+    def max_error(self):
+        """
+        Largest relative error of the inverse lookups at the cell centres
+        """
+        error = 0.0
+        for supersonic, (mach, columns, inverse) in self.branches.items():
+            if supersonic:
+                mid = (mach[1:] + mach[:-1]) / 2
+            else:
+                mid = np.sqrt(mach[1:] * mach[:-1])
+            exact = dict(zip(self.names, self.functions(mid, self.g)))
+            for name in inverse:
+                found = self._lookup(name, exact[name], supersonic)
+                error = max(error, np.nanmax(np.abs(found - mid) / mid))
+        return error
+
+    def __repr__(self):
+        return "ReferenceTable(%r, g=%g, points=%d, error=%.2g)" % (self.flow, self.g, len(self.branches[False][0]),
+                                                                   self.error)
+
+
+def get_table(flow, g, mach_min=default_mach_min, mach_max=default_mach_max, tolerance=default_tolerance):
+    """
+    Cached reference table of flow ("fanno" or "rayleigh") for gamma g
+    """
+    key = (flow, float(g), float(mach_min), float(mach_max), float(tolerance))
+    table = _table_cache.get(key)
+    if table is None:
+        table = ReferenceTable(flow, g, mach_min, mach_max, tolerance)
+        _table_cache[key] = table
+    return table
+
+
+def clear_cache():
+    """
+    Drop every cached table
+    """
+    _table_cache.clear()
+
+
+def _per_segment(value, ndim):
+    """
+    Segment parameter with one value per segment on the first axis, shaped to
+    broadcast against (segments, points)
+    """
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 1:
+        return value.reshape(value.shape + (1,) * ndim)
+    return value
+
+
+def _choke(change, limit, lengths):
+    """
+    Segments passed before the cumulative change reaches limit (the number of
+    segments if it never does) and the position where it does (NaN if never)
+    """
+    segments = change.shape[0]
+    cumulative = np.cumsum(change, axis=0)
+    running = np.maximum.accumulate(cumulative, axis=0)
+    if running.size == segments:
+        passed = np.searchsorted(running.reshape(-1), limit, side='right')
+    else:
+        passed = (running <= limit).sum(axis=0)
+    # GATHER THE CHOKING SEGMENT OF EACH POINT, PER SEGMENT ARRAYS ARE NOT BROADCAST TO (SEGMENTS, POINTS)
+    index = np.expand_dims(np.minimum(passed, segments - 1), 0)
+    index = index.reshape(index.shape + (1,) * (change.ndim - index.ndim))
+
+    def gather(array):
+        return np.take_along_axis(array, np.broadcast_to(index, np.broadcast_shapes(
+            index.shape, (1,) + array.shape[1:])), 0)[0]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = (limit - gather(cumulative - change)) / gather(change)
+    position = gather(np.cumsum(lengths, axis=0) - lengths) + gather(lengths) * fraction
+    return passed, cumulative, np.where(passed < segments, position, np.nan)
+
+
+def _stations(lengths, shape, profile):
+    """
+    Positions of the segment ends starting with the inlet at 0, or only the
+    duct length if not profile
+    """
+    if not profile:
+        return np.broadcast_to(lengths.sum(axis=0), shape).copy()
+    positions = np.cumsum(np.broadcast_to(lengths, np.broadcast_shapes(lengths.shape, (1,) + shape)), axis=0)
+    return np.concatenate([np.zeros((1,) + positions.shape[1:]), positions])
+
+
+def _lookup_stations(table, name, value, supersonic):
+    """
+    Mach numbers of station values, looked up along the duct: consecutive
+    values of one case are close, so each interpolation search starts next to
+    its answer (about twice as fast as looking up across the cases)
+    """
+    supersonic = np.broadcast_to(supersonic, value.shape)
+    return table.mach(name, value.T, supersonic.T).T
+
+
+def _inlet(m1, p1, t1):
+    """
+    Inlet arrays broadcast together
+    """
+    return [np.array(value) for value in np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in
+                                                               (m1, p1, t1)])]
+
+
+def fanno_march(m1, p1, t1, lengths, friction, diameter, g, table=None, profile=True):
+    """
+    March Fanno flow through duct segments for arrays of inlet Mach numbers,
+    static pressures [Pa] and temperatures [K]. lengths [m] has one value per
+    segment, the Fanning friction factor and the diameter [m] are scalars or
+    one value per segment; any of them may also be (segments, points) arrays.
+    Returns a dict of station arrays "x", "mach", "p", "t", "pt" with shape
+    (segments + 1, points), or only the outlet values (points) if profile is
+    False, plus per point "choked", "choke_segment" (-1 if not choked) and
+    "choke_length", the position where M reaches 1 (NaN if not choked).
+    """
+    m1, p1, t1 = _inlet(m1, p1, t1)
+    table = table or get_table("fanno", g)
+    ndim = m1.ndim
+    lengths = _per_segment(lengths, ndim)
+    if lengths.ndim == 0:
+        raise ValueError("lengths needs one value per segment")
+    change = 4 * _per_segment(friction, ndim) * lengths / _per_segment(diameter, ndim)
+    fld1, p_ratio1, t_ratio1, pt_ratio1 = fanno_functions(m1, g)
+    passed, travelled, choke_length = _choke(change, fld1, lengths)
+    segments = change.shape[0]
+
+    if profile:
+        fld = fld1 - np.concatenate([np.zeros((1,) + travelled.shape[1:]), travelled])
+        # A STATION PAST THE CHOKING POINT STAYS CHOKED EVEN IF THE DUCT PARAMETERS WOULD TAKE IT BACK
+        downstream = np.arange(segments + 1).reshape((-1,) + (1,) * ndim) > passed
+    else:
+        fld = fld1 - travelled[-1]
+        downstream = passed < segments
+    mach = np.where(downstream, np.nan, _lookup_stations(table, "fld", np.maximum(fld, 0), m1 > 1))
+    _, p_ratio, t_ratio, pt_ratio = fanno_functions(mach, g)
+    pt1 = p1 * np.power(1 + (g - 1) / 2 * m1 * m1, g / (g - 1))
+    result = {
+        "mach": mach,
+        "p": p1 * p_ratio / p_ratio1,
+        "t": t1 * t_ratio / t_ratio1,
+        "pt": pt1 * pt_ratio / pt_ratio1,
+        "choked": passed < segments,
+        "choke_segment": np.where(passed < segments, passed, -1),
+        "choke_length": choke_length,
+    }
+    result["x"] = _stations(lengths, m1.shape, profile)
+    return result
+
+
+def rayleigh_march(m1, p1, t1, heat, cp, g, table=None, profile=True):
+    """
+    March Rayleigh flow through duct segments for arrays of inlet Mach numbers,
+    static pressures [Pa] and temperatures [K]. heat [J/kg] has one value per
+    segment (negative for cooling) or is a (segments, points) array, cp is the
+    constant specific heat. Returns a dict of station arrays "mach", "p", "t",
+    "tt", "pt" with shape (segments + 1, points), or only the outlet values
+    (points) if profile is False, plus per point "choked", "choke_segment"
+    (-1 if not choked) and "choke_heat", the heat per kg at which M reaches 1
+    (NaN if not choked).
+    """
+    m1, p1, t1 = _inlet(m1, p1, t1)
+    table = table or get_table("rayleigh", g)
+    ndim = m1.ndim
+    heat = _per_segment(heat, ndim)
+    if heat.ndim == 0:
+        raise ValueError("heat needs one value per segment")
+    p_ratio1, t_ratio1, tt_ratio1, pt_ratio1 = rayleigh_functions(m1, g)
+    tt1 = t1 * (1 + (g - 1) / 2 * m1 * m1)
+    # TOTAL TEMPERATURE RISE THAT CHOKES THE FLOW
+    limit = tt1 * (1 / tt_ratio1 - 1)
+    passed, rise, choke_heat = _choke(heat / cp, limit, heat / cp)
+    segments = heat.shape[0]
+
+    if profile:
+        tt = tt1 + np.concatenate([np.zeros((1,) + rise.shape[1:]), rise])
+        downstream = np.arange(segments + 1).reshape((-1,) + (1,) * ndim) > passed
+    else:
+        tt = tt1 + rise[-1]
+        downstream = passed < segments
+    mach = np.where(downstream, np.nan, _lookup_stations(table, "tt_ratio", np.minimum(tt_ratio1 * tt / tt1, 1),
+                                                         m1 > 1))
+    p_ratio, t_ratio, _, pt_ratio = rayleigh_functions(mach, g)
+    pt1 = p1 * np.power(1 + (g - 1) / 2 * m1 * m1, g / (g - 1))
+    return {
+        "mach": mach,
+        "p": p1 * p_ratio / p_ratio1,
+        "t": t1 * t_ratio / t_ratio1,
+        "tt": np.where(np.isnan(mach), np.nan, tt),
+        "pt": pt1 * pt_ratio / pt_ratio1,
+        "choked": passed < segments,
+        "choke_segment": np.where(passed < segments, passed, -1),
+        "choke_heat": choke_heat * cp,
+    }
+
+
+def _solve_flow(flow, values, g, unknown, table):
+    """
+    Solve rows of (M, reference values) where exactly one value is given: M
+    gives every reference value, a reference value gives M (the subsonic
+    solution first) and then the others
+    """
+    functions, names = flows[flow]
+    values = [np.array(array) for array in np.broadcast_arrays(*[np.asarray(value, dtype=float)
+                                                                  for value in values])]
+    masks = unknown_masks(values, unknown)
+    given = [~mask for mask in masks]
+    count = sum(mask.astype(int) for mask in given)
+    table = table or get_table(flow, g)
+    mach = np.full(values[0].shape, np.nan)
+    for position, name in enumerate(("m",) + names):
+        rows = given[position] & (count == 1)
+        if not rows.any():
+            continue
+        if position == 0:
+            mach[rows] = values[0][rows]
+            continue
+        found = table.mach(name, values[position][rows], False) if table.invertible(name, False) else np.nan
+        found = np.where(np.isnan(found), table.mach(name, values[position][rows], True), found)
+        mach[rows] = found
+    solve = count == 1
+    results = (mach,) + functions(mach, g)
+    for position, result in enumerate(results):
+        values[position] = np.where(solve & masks[position], result, values[position])
+    return tuple(values)
+
+
+def fanno_flow(m, fld, p_ratio, t_ratio, pt_ratio, g, unknown=None, table=None):
+    """
+    Solve Fanno reference values on arrays, same variables as
+    equations.fanno_flow. Rows with one given value are solved, Mach numbers
+    outside the table are NaN.
+    """
+    return _solve_flow("fanno", (m, fld, p_ratio, t_ratio, pt_ratio), g, unknown, table)
+
+
+def rayleigh_flow(m, p_ratio, t_ratio, tt_ratio, pt_ratio, g, unknown=None, table=None):
+    """
+    Solve Rayleigh reference values on arrays, same variables as
+    equations.rayleigh_flow. T/T* only gives a supersonic Mach number.
+    """
+    return _solve_flow("rayleigh", (m, p_ratio, t_ratio, tt_ratio, pt_ratio), g, unknown, table)
@@ -0,0 +1,329 @@
+from collections import namedtuple
+from math import acos, atan, cos, degrees, log, pow, radians, sin, sqrt, tan
+
+from .fluids import get_fluid
+from .relations import Relation
+from .units import default_cp
+
+
+# EACH RELATION IS DECLARED ONCE WITH ONE CLOSED FORM SOLUTION PER VARIABLE, THE LAST
+# PARAMETER OF A SOLUTION IS THE MATH NAMESPACE (math FOR FLOATS, numpy FOR ARRAYS, SEE relations.py)
+ideal_compression_relation = Relation("ideal_compression", ("p1", "p2", "t1", "t2"), {
+    "p1": lambda p2, t1, t2, g, m: p2 * m.pow((t1 / t2), (g / (g - 1))),
+    "p2": lambda p1, t1, t2, g, m: p1 * m.pow((t2 / t1), (g - 1) / g),
+    "t1": lambda p1, p2, t2, g, m: t2 * m.pow((p1 / p2), ((g - 1) / g)),
+    "t2": lambda p1, p2, t1, g, m: t1 * m.pow((p2 / p1), ((g - 1) / g)),
+})
+
+static_temperature_relation = Relation("static_temperature", ("tt", "ts", "m"), {
+    "tt": lambda ts, m, g, math: ts * (1 + ((math.pow(m, 2) * (g - 1) / 2))),
+    "ts": lambda tt, m, g, math: tt / (1 + ((math.pow(m, 2) * (g - 1) / 2))),
+    "m": lambda tt, ts, g, math: math.pow((tt / ts - 1) / ((g - 1) / 2), 0.5),
+}, outputs=("ts", "tt", "m"))
+
+static_pressure_relation = Relation("static_pressure", ("pt", "ps", "m"), {
+    "pt": lambda ps, m, g, math: ps * math.pow((1 + ((math.pow(m, 2) * (g - 1) / 2))), (g / (g - 1))),
+    "ps": lambda pt, m, g, math: pt / math.pow((1 + ((math.pow(m, 2) * (g - 1) / 2))), (g / (g - 1))),
+    "m": lambda pt, ps, g, math: math.pow((math.pow(pt / ps, (g - 1) / g) - 1) / ((g - 1) / 2), 0.5),
+}, outputs=("ps", "pt", "m"))
+
+shaft_work_relation = Relation("shaft_work", ("w", "t1", "t2"), {
+    "w": lambda t1, t2, cp, m: cp * (t1 - t2),
+    "t1": lambda w, t2, cp, m: w / cp + t2,
+    "t2": lambda w, t1, cp, m: t1 - w / cp,
+})
+
+# ISENTROPIC EFFICIENCY OF A COMPRESSOR: eta = (T2s - T1) / (T2 - T1), T2s = T1 pr^((g-1)/g)
+compressor_efficiency_relation = Relation("compressor_efficiency", ("pr", "t1", "t2", "eta"), {
+    "pr": lambda t1, t2, eta, g, m: m.pow(1 + eta * (t2 - t1) / t1, g / (g - 1)),
+    "t1": lambda pr, t2, eta, g, m: t2 / (1 + (m.pow(pr, (g - 1) / g) - 1) / eta),
+    "t2": lambda pr, t1, eta, g, m: t1 * (1 + (m.pow(pr, (g - 1) / g) - 1) / eta),
+    "eta": lambda pr, t1, t2, g, m: t1 * (m.pow(pr, (g - 1) / g) - 1) / (t2 - t1),
+})
+
+# ISENTROPIC: s0(T2) - s0(T1) = R ln(p2/p1), SHAFT WORK: w = h(T1) - h(T2)
+ideal_compression_real_relation = Relation("ideal_compression_real", ("p1", "p2", "t1", "t2"), {
+    "p1": lambda p2, t1, t2, fluid, m: p2 / m.exp((m.entropy(fluid, t2) - m.entropy(fluid, t1)) / fluid.r),
+    "p2": lambda p1, t1, t2, fluid, m: p1 * m.exp((m.entropy(fluid, t2) - m.entropy(fluid, t1)) / fluid.r),
+    "t1": lambda p1, p2, t2, fluid, m: m.temperature_from_entropy(
+        fluid, m.entropy(fluid, t2) - fluid.r * m.log(p2 / p1)),
+    "t2": lambda p1, p2, t1, fluid, m: m.temperature_from_entropy(
+        fluid, m.entropy(fluid, t1) + fluid.r * m.log(p2 / p1)),
+}, prepare=get_fluid)
+
+shaft_work_real_relation = Relation("shaft_work_real", ("w", "t1", "t2"), {
+    "w": lambda t1, t2, fluid, m: m.enthalpy(fluid, t1) - m.enthalpy(fluid, t2),
+    "t1": lambda w, t2, fluid, m: m.temperature_from_enthalpy(fluid, m.enthalpy(fluid, t2) + w),
+    "t2": lambda w, t1, fluid, m: m.temperature_from_enthalpy(fluid, m.enthalpy(fluid, t1) - w),
+}, prepare=get_fluid)
+
+
+def ideal_compression_p_vs_t(p1, p2, t1, t2, g):
+    """
+    Solve Ideal Compression Law for Pressure
+    """
+    return ideal_compression_relation.solve_zero(p1, p2, t1, t2, g)
+
+
+def static_temperature(tt, ts, m, g):
+    """
+    Solve Static Temperature Equation
+    """
+    return static_temperature_relation.solve_zero(tt, ts, m, g)
+
+
+def static_pressure(pt, ps, m, g):
+    """
+    Solve Static Pressure Equation
+    """
+    return static_pressure_relation.solve_zero(pt, ps, m, g)
+
+
+def shaft_work(w, t1, t2, cp):
+    """
+    Solve shaft work
+    """
+    return shaft_work_relation.solve_zero(w, t1, t2, cp)
+
+
+def compressor_efficiency(pr, t1, t2, eta, g):
+    """
+    Isentropic efficiency of a compression with the pressure ratio pr from T1 to T2
+    """
+    return compressor_efficiency_relation.solve_zero(pr, t1, t2, eta, g)
+
+
+def ideal_compression_real(p1, p2, t1, t2, fluid):
+    """
+    Solve Ideal Compression Law with temperature dependent Cp,
+    fluid is a fluids.Fluid or its name
+    """
+    return ideal_compression_real_relation.solve_zero(p1, p2, t1, t2, fluid)
+
+
+def shaft_work_real(w, t1, t2, fluid):
+    """
+    Solve shaft work with temperature dependent Cp,
+    fluid is a fluids.Fluid or its name
+    """
+    return shaft_work_real_relation.solve_zero(w, t1, t2, fluid)
+
+
+def oblique_shock_angle(m1, theta, g, strong=False):
+    """
+    Shock angle in radians for a deflection theta in radians, from the closed form
+    solution of the theta-beta-M cubic. Weak solution unless strong is set.
+    """
+    m_sq = m1 * m1
+    tan_theta = tan(theta)
+    a = 1 + (g - 1) / 2 * m_sq
+    lambda_sq = pow(m_sq - 1, 2) - 3 * a * (1 + (g + 1) / 2 * m_sq) * pow(tan_theta, 2)
+    if lambda_sq < 0:
+        raise ValueError("Shock is detached, deflection is above the maximum for Mach %g" % m1)
+    lambda_ = sqrt(lambda_sq)
+    chi = (pow(m_sq - 1, 3) - 9 * a * (a + (g + 1) / 4 * m_sq * m_sq) * pow(tan_theta, 2)) / pow(lambda_, 3)
+    if chi < -1 - 1e-12:
+        raise ValueError("Shock is detached, deflection is above the maximum for Mach %g" % m1)
+    chi = max(-1.0, min(1.0, chi))
+    b = 1 + (g + 1) / 2 * m_sq
+    tan_beta = (m_sq - 1 + 2 * lambda_ * cos(acos(chi) / 3)) / (3 * a * tan_theta)
+    if not strong:
+        # WEAK ROOT FROM THE STRONG ONE, THE CLOSED FORM CANCELS AS THETA -> 0 (SEE shocks.oblique_shock_angle)
+        product = -1 / (a * tan_theta * tan_beta)
+        total = (b / a - product) / tan_beta
+        tan_beta = (total + sqrt(total * total - 4 * product)) / 2
+    return atan(tan_beta)
+
+
+def oblique_shock(m1, theta, beta, m2, p_ratio, t_ratio, pt_ratio, g):
+    """
+    Solve Oblique Shock (weak solution) from the upstream Mach number and the
+    deflection angle in degrees, a deflection of 0 gives the normal shock.
+    Every other value is an output.
+    """
+    if m1 <= 1:
+        raise ValueError("Upstream Mach number must be supersonic")
+    if theta == 0:
+        beta = 90.0
+    else:
+        beta = degrees(oblique_shock_angle(m1, radians(theta), g))
+    mn1_sq = pow(m1 * sin(radians(beta)), 2)
+    p_ratio = 1 + 2 * g / (g + 1) * (mn1_sq - 1)
+    rho_ratio = (g + 1) * mn1_sq / ((g - 1) * mn1_sq + 2)
+    t_ratio = p_ratio / rho_ratio
+    mn2 = sqrt((1 + (g - 1) / 2 * mn1_sq) / (g * mn1_sq - (g - 1) / 2))
+    m2 = mn2 / sin(radians(beta - theta))
+    pt_ratio = pow(rho_ratio, g / (g - 1)) * pow(1 / p_ratio, 1 / (g - 1))
+    return m1, theta, beta, m2, p_ratio, t_ratio, pt_ratio
+
+
+# LOWEST SUBSONIC MACH NUMBER OF THE FANNO AND RAYLEIGH SOLVERS, SHARED WITH THE TABLES OF ducts.py
+reference_mach_min = 1e-4
+
+
+def fanno_reference(m, g):
+    """
+    4fL*/D, p/p*, T/T* and pt/pt* of Fanno flow at Mach m
+    """
+    m_sq = m * m
+    a = 2 + (g - 1) * m_sq
+    t_ratio = (g + 1) / a
+    fld = (1 - m_sq) / (g * m_sq) + (g + 1) / (2 * g) * log((g + 1) * m_sq / a)
+    return fld, sqrt(t_ratio) / m, t_ratio, pow(a / (g + 1), (g + 1) / (2 * (g - 1))) / m
+
+
+def rayleigh_reference(m, g):
+    """
+    p/p*, T/T*, Tt/Tt* and pt/pt* of Rayleigh flow at Mach m
+    """
+    m_sq = m * m
+    a = 2 + (g - 1) * m_sq
+    p_ratio = (1 + g) / (1 + g * m_sq)
+    return (p_ratio, m_sq * p_ratio * p_ratio, (g + 1) * m_sq * a / pow(1 + g * m_sq, 2),
+            p_ratio * pow(a / (g + 1), g / (g - 1)))
+
+
+def mach_from_reference(reference, position, value, g, supersonic=False):
+    """
+    Mach number at which reference(m, g)[position] equals value, by bisection
+    on the subsonic (reference_mach_min to 1) or supersonic (1 to 50) branch
+    """
+    low, high = (1.0, 50.0) if supersonic else (reference_mach_min, 1.0)
+    f_low = reference(low, g)[position] - value
+    if f_low * (reference(high, g)[position] - value) > 0:
+        raise ValueError("No %s Mach number for the reference value %g" % ("supersonic" if supersonic
+                                                                              else "subsonic", value))
+    for _ in range(100):
+        mid = (low + high) / 2
+        f_mid = reference(mid, g)[position] - value
+        if (f_mid < 0) == (f_low < 0):
+            low, f_low = mid, f_mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def _reference_flow(reference, values, g):
+    """
+    Solve a reference flow row: the single nonzero value is the input, a
+    reference value gives the subsonic Mach number if there is one
+    """
+    if values.count(0) != len(values) - 1:
+        return values
+    position = next(i for i, value in enumerate(values) if value != 0)
+    m = values[0]
+    if position:
+        try:
+            m = mach_from_reference(reference, position - 1, values[position], g)
+        except ValueError:
+            m = mach_from_reference(reference, position - 1, values[position], g, supersonic=True)
+    return (m,) + tuple(reference(m, g))
+
+
+def fanno_flow(m, fld, p_ratio, t_ratio, pt_ratio, g):
+    """
+    Solve Fanno Flow (adiabatic duct flow with friction) from one of the Mach
+    number and the reference values 4fL*/D, p/p*, T/T*, pt/pt*. 4fL*/D and
+    pt/pt* have a subsonic and a supersonic solution, the subsonic one is returned.
+    """
+    return _reference_flow(fanno_reference, (m, fld, p_ratio, t_ratio, pt_ratio), g)
+
+
+def rayleigh_flow(m, p_ratio, t_ratio, tt_ratio, pt_ratio, g):
+    """
+    Solve Rayleigh Flow (duct flow with heat addition) from one of the Mach
+    number and the reference values p/p*, T/T*, Tt/Tt*, pt/pt*. Tt/Tt* and
+    pt/pt* give the subsonic solution, T/T* only the supersonic one
+    (two subsonic Mach numbers share each T/T* below M = 1).
+    """
+    if t_ratio != 0 and (m, p_ratio, tt_ratio, pt_ratio) == (0, 0, 0, 0):
+        m = mach_from_reference(rayleigh_reference, 1, t_ratio, g, supersonic=True)
+        return (m,) + rayleigh_reference(m, g)
+    return _reference_flow(rayleigh_reference, (m, p_ratio, t_ratio, tt_ratio, pt_ratio), g)
+
+
+def flat_plate(mach, t_edge, p_edge, length, t_wall, re, cf, st, q_wall, g):
+    """
+    Solve Flat Plate skin friction and heat transfer at x = length, transitional
+    at Re = 5e5, with Eckert's reference temperature. A wall temperature of 0
+    is an adiabatic wall. Cp is the default one and the transport properties
+    are those of air. See boundary_layer.py for the correlations. Re, Cf, St
+    and q_wall are always the unknowns, the other inputs must be given.
+    """
+    if (re, cf, st, q_wall) != (0, 0, 0, 0) or 0 in (mach, t_edge, p_edge, length):
+        raise ValueError("Flat Plate solves Re, Cf, St and q_wall from the Mach number, edge state and length")
+    fluid = get_fluid()
+    cp = default_cp
+    r = cp * (g - 1) / g
+    u = mach * sqrt(g * r * t_edge)
+    rho_edge = p_edge / (r * t_edge)
+    mu_edge = fluid.viscosity(t_edge)
+    re = rho_edge * u * length / mu_edge
+    turbulent = re >= 5e5
+    pr_edge = cp * mu_edge / fluid.conductivity(t_edge)
+    t_aw = t_edge * (1 + pow(pr_edge, 1 / 3 if turbulent else 1 / 2) * (g - 1) / 2 * mach * mach)
+    if t_wall == 0:
+        t_wall = t_aw
+    t_ref = 0.28 * t_edge + 0.5 * t_wall + 0.22 * t_aw
+    rho_ref = p_edge / (r * t_ref)
+    mu_ref = fluid.viscosity(t_ref)
+    re_ref = rho_ref * u * length / mu_ref
+    # SAME REGIME AS THE RECOVERY FACTOR, DECIDED ON THE EDGE REYNOLDS NUMBER
+    cf_ref = 0.0592 * pow(re_ref, -0.2) if turbulent else 0.664 / sqrt(re_ref)
+    h = cf_ref / 2 * pow(cp * mu_ref / fluid.conductivity(t_ref), -2 / 3) * rho_ref * u * cp
+    cf = cf_ref * rho_ref / rho_edge
+    st = h / (rho_edge * u * cp)
+    return mach, t_edge, p_edge, length, t_wall, re, cf, st, h * (t_aw - t_wall)
+
+
+# SOLVER, INPUT VARIABLES IN CALL ORDER, RETURNED VARIABLES IN RETURN ORDER,
+# QUANTITY OF EACH INPUT (FOR UNIT CONVERSION), GAS PROPERTY PASSED LAST,
+# NUMBER OF BLANK INPUTS EXPECTED, RELATION FOR AN EXPLICIT UNKNOWN (NONE IF THE SOLVER HAS NO RELATION),
+# (INPUT, SI VALUE) PAIRS A BLANK OPTIONAL INPUT TAKES BEFORE THE BLANK INPUTS ARE COUNTED
+EquationInfo = namedtuple("EquationInfo", ("solver", "inputs", "outputs", "quantities", "gas_property", "unknowns",
+                                           "relation", "blank_values"), defaults=(1, None, ()))
+
+equation_table = {
+    "ideal_compression": EquationInfo(ideal_compression_p_vs_t, ("p1", "p2", "t1", "t2"), ("p1", "p2", "t1", "t2"),
+                                      ("pressure", "pressure", "temperature", "temperature"), "n",
+                                      relation=ideal_compression_relation),
+    "static_temperature": EquationInfo(static_temperature, ("tt", "ts", "m"), ("ts", "tt", "m"),
+                                       ("temperature", "temperature", "constant"), "n",
+                                       relation=static_temperature_relation),
+    "static_pressure": EquationInfo(static_pressure, ("pt", "ps", "m"), ("ps", "pt", "m"),
+                                    ("pressure", "pressure", "constant"), "n", relation=static_pressure_relation),
+    "shaft_work": EquationInfo(shaft_work, ("w", "t1", "t2"), ("w", "t1", "t2"),
+                               ("specific_work", "temperature", "temperature"), "Cp", relation=shaft_work_relation),
+    "compressor_efficiency": EquationInfo(compressor_efficiency, ("pr", "t1", "t2", "eta"),
+                                          ("pr", "t1", "t2", "eta"),
+                                          ("constant", "temperature", "temperature", "constant"), "n",
+                                          relation=compressor_efficiency_relation),
+    "oblique_shock": EquationInfo(oblique_shock, ("m1", "theta", "beta", "m2", "p_ratio", "t_ratio", "pt_ratio"),
+                                  ("m1", "theta", "beta", "m2", "p_ratio", "t_ratio", "pt_ratio"),
+                                  ("constant", "angle", "angle", "constant", "constant", "constant", "constant"),
+                                  "n", 5, blank_values=(("theta", 0.0),)),
+    "fanno_flow": EquationInfo(fanno_flow, ("m", "fld", "p_ratio", "t_ratio", "pt_ratio"),
+                               ("m", "fld", "p_ratio", "t_ratio", "pt_ratio"),
+                               ("constant", "constant", "constant", "constant", "constant"), "n", 4),
+    "rayleigh_flow": EquationInfo(rayleigh_flow, ("m", "p_ratio", "t_ratio", "tt_ratio", "pt_ratio"),
+                                  ("m", "p_ratio", "t_ratio", "tt_ratio", "pt_ratio"),
+                                  ("constant", "constant", "constant", "constant", "constant"), "n", 4),
+    "flat_plate": EquationInfo(flat_plate,
+                               ("mach", "t_edge", "p_edge", "length", "t_wall", "re", "cf", "st", "q_wall"),
+                               ("mach", "t_edge", "p_edge", "length", "t_wall", "re", "cf", "st", "q_wall"),
+                               ("constant", "temperature", "pressure", "length", "temperature", "constant",
+                                "constant", "constant", "heat_flux"), "n", 4,
+                               blank_values=(("t_wall", 0.0),)),
+    "ideal_compression_real": EquationInfo(ideal_compression_real, ("p1", "p2", "t1", "t2"), ("p1", "p2", "t1", "t2"),
+                                           ("pressure", "pressure", "temperature", "temperature"), "fluid",
+                                           relation=ideal_compression_real_relation),
+    "shaft_work_real": EquationInfo(shaft_work_real, ("w", "t1", "t2"), ("w", "t1", "t2"),
+                                    ("specific_work", "temperature", "temperature"), "fluid",
+                                    relation=shaft_work_real_relation),
+}
+
+# EQUATION SOLVED INSTEAD WHEN A VARIABLE PROPERTY FLUID MODEL IS SELECTED
+real_gas_equations = {
+    "ideal_compression": "ideal_compression_real",
+    "shaft_work": "shaft_work_real",
+}
@@ -0,0 +1,312 @@
+"""
+Temperature dependent ideal gas properties from NASA 7-coefficient polynomials
+
+Cp(T)/R is a 4th order polynomial per temperature range, its integrals give the
+enthalpy h(T) and the standard state entropy s0(T). A Fluid evaluates both
+integrals once on a uniform temperature grid and caches them, so the real gas
+solvers in equations.py and batch.py only do a table lookup with linear
+interpolation (forward) or a binary search (inverse, temperature from h or s0)
+instead of integrating Cp on every call. With the default 1 K grid the
+interpolated temperatures are within a few 1e-4 K of the exact integrals.
+
+Isentropic change of an ideal gas with variable Cp:
+    s0(T2) - s0(T1) = R ln(p2/p1)
+Shaft work:
+    w = h(T1) - h(T2)
+
+The constant n/Cp solvers stay the default, the fluid model is only used by
+the *_real equations. Use get_fluid() to share the cached tables.
+
+Every species polynomial is valid from its T_low to T_high, all of them
+cover 200 to 3500 K. The polynomials are never extrapolated: a Fluid whose
+table range leaves the range of one of its species raises ValueError, and
+so do cp(), gamma() and the exact_* functions outside the range.
+
+Viscosity and thermal conductivity follow Sutherland's law per fluid (not per
+species), their tables are built on the same grid on first use.
+"""
+from array import array
+from bisect import bisect_right
+from math import log, pow
+
+universal_gas_constant = 8.314462618  # J/mol K
+
+# NAME: (MOLAR MASS [kg/kmol], T_LOW, T_MID, T_HIGH, LOW RANGE COEFFICIENTS, HIGH RANGE COEFFICIENTS)
+# COEFFICIENTS a1..a7 OF Cp/R = a1 + a2 T + a3 T^2 + a4 T^3 + a5 T^4 (GRI-MECH 3.0 THERMO DATA, N2 FROM
+# BURCAT'S DATABASE AS GRI-MECH STARTS AT 300 K, Ar IS MONATOMIC WITH A CONSTANT Cp/R = 2.5 DOWN TO 200 K)
+species = {
+    "N2": (28.0134, 200.0, 1000.0, 6000.0,
+           (3.53100528, -1.23660988e-04, -5.02999433e-07, 2.43530612e-09, -1.40881235e-12, -1046.97628, 2.96747038),
+           (2.95257637, 1.3969004e-03, -4.92631603e-07, 7.86010195e-11, -4.60755204e-15, -923.948688, 5.87188762)),
+    "O2": (31.9988, 200.0, 1000.0, 3500.0,
+           (3.78245636, -2.99673416e-03, 9.84730201e-06, -9.68129509e-09, 3.24372837e-12, -1063.94356, 3.65767573),
+           (3.28253784, 1.48308754e-03, -7.57966669e-07, 2.09470555e-10, -2.16717794e-14, -1088.45772, 5.45323129)),
+    "Ar": (39.948, 200.0, 1000.0, 5000.0,
+           (2.5, 0.0, 0.0, 0.0, 0.0, -745.375, 4.366),
+           (2.5, 0.0, 0.0, 0.0, 0.0, -745.375, 4.366)),
+    "CO2": (44.0095, 200.0, 1000.0, 3500.0,
+            (2.35677352, 8.98459677e-03, -7.12356269e-06, 2.45919022e-09, -1.43699548e-13, -48371.9697, 9.90105222),
+            (3.85746029, 4.41437026e-03, -2.21481404e-06, 5.23490188e-10, -4.72084164e-14, -48759.166, 2.27163806)),
+    "H2O": (18.01528, 200.0, 1000.0, 3500.0,
+            (4.19864056, -2.0364341e-03, 6.52040211e-06, -5.48797062e-09, 1.77197817e-12, -30293.7267, -0.849032208),
+            (3.03399249, 2.17691804e-03, -1.64072518e-07, -9.7041987e-11, 1.68200992e-14, -30004.2971, 4.9667701)),
+}
+
+# FLUID NAME: MOLE FRACTION OF EACH SPECIES
+compositions = {
+    "air": {"N2": 0.78084, "O2": 0.20946, "Ar": 0.00934, "CO2": 0.00036},
+    "N2": {"N2": 1.0},
+    "O2": {"O2": 1.0},
+    "Ar": {"Ar": 1.0},
+    "CO2": {"CO2": 1.0},
+    "H2O": {"H2O": 1.0},
+}
+
+# FLUID NAME: SUTHERLAND CONSTANTS (MU0 [Pa s], S_MU [K], K0 [W/m K], S_K [K]) AT T0 (WHITE, VISCOUS FLUID FLOW)
+sutherland = {
+    "air": (1.716e-5, 111.0, 0.0241, 194.0),
+    "N2": (1.663e-5, 107.0, 0.0242, 150.0),
+    "O2": (1.919e-5, 139.0, 0.0244, 240.0),
+    "Ar": (2.125e-5, 144.0, 0.0163, 170.0),
+    "CO2": (1.370e-5, 222.0, 0.0146, 1800.0),
+    "H2O": (1.12e-5, 1064.0, 0.0181, 2200.0),
+}
+sutherland_t0 = 273.0  # K
+
+default_fluid = "air"
+default_t_min = 200.0  # K
+default_t_max = 3500.0  # K
+default_step = 1.0  # K
+
+_fluid_cache = {}
+
+
+def _sutherland(reference, s, t):
+    """
+    Sutherland's law for a transport property with value reference at sutherland_t0
+    """
+    return reference * pow(t / sutherland_t0, 1.5) * (sutherland_t0 + s) / (t + s)
+
+
+def _cp_r(a, t):
+    """
+    Cp/R of one polynomial range
+    """
+    return a[0] + t * (a[1] + t * (a[2] + t * (a[3] + t * a[4])))
+
+
+def _h_rt(a, t):
+    """
+    H/(R T) of one polynomial range
+    """
+    return a[0] + t * (a[1] / 2 + t * (a[2] / 3 + t * (a[3] / 4 + t * a[4] / 5))) + a[5] / t
+
+
+def _s_r(a, t):
+    """
+    S0/R of one polynomial range
+    """
+    return a[0] * log(t) + t * (a[1] + t * (a[2] / 2 + t * (a[3] / 3 + t * a[4] / 4))) + a[6]
+
+
+class Fluid:
+    """
+    Ideal gas mixture with Cp(T) from NASA polynomials and cached h(T), s0(T) tables
+    """
+
+    def __init__(self, name, composition, t_min=default_t_min, t_max=default_t_max, step=default_step):
+        self.name = name
+        total = sum(composition.values())
+        self.composition = {item: fraction / total for item, fraction in composition.items()}
+        self.molar_mass = sum(fraction * species[item][0] for item, fraction in self.composition.items())
+        self.r = universal_gas_constant * 1000 / self.molar_mass  # J/kg K
+        self.t_min = float(t_min)
+        self.t_max = float(t_max)
+        self.step = float(step)
+        # RANGE COVERED BY THE POLYNOMIALS OF EVERY SPECIES
+        self.t_low = max(species[item][1] for item in self.composition)
+        self.t_high = min(species[item][3] for item in self.composition)
+        if self.t_min < self.t_low or self.t_max > self.t_high:
+            raise ValueError("Table of %s (%g to %g K) outside its polynomials (%g to %g K)" % (
+                name, self.t_min, self.t_max, self.t_low, self.t_high))
+
+        count = int(round((self.t_max - self.t_min) / self.step)) + 1
+        self.temperature = array('d', (self.t_min + i * self.step for i in range(count)))
+        self.enthalpy_table = array('d', (self.exact_enthalpy(t) for t in self.temperature))
+        self.entropy_table = array('d', (self.exact_entropy(t) for t in self.temperature))
+        self._arrays = None
+        self.transport = sutherland.get(name)
+        self._transport_tables = None
+        self._transport_arrays = None
+
+    def _sum(self, function, t):
+        """
+        Mole fraction weighted sum of a polynomial function over the species
+        """
+        if not self.t_low <= t <= self.t_high:
+            raise ValueError("Temperature %g K outside the %s polynomials (%g to %g K)" % (t, self.name, self.t_low,
+                                                                                           self.t_high))
+        total = 0.0
+        for item, fraction in self.composition.items():
+            _, _, t_mid, _, low, high = species[item]
+            total += fraction * function(low if t < t_mid else high, t)
+        return total
+
+    def cp(self, t):
+        """
+        Specific heat at constant pressure [J/kg K]
+        """
+        return self._sum(_cp_r, t) * self.r
+
+    def gamma(self, t):
+        """
+        Ratio of specific heats
+        """
+        cp = self.cp(t)
+        return cp / (cp - self.r)
+
+    def exact_enthalpy(self, t):
+        """
+        Specific enthalpy [J/kg] from the polynomials, no table
+        """
+        return self._sum(_h_rt, t) * self.r * t
+
+    def exact_entropy(self, t):
+        """
+        Standard state specific entropy s0 [J/kg K] from the polynomials, no table
+        """
+        return self._sum(_s_r, t) * self.r
+
+    def _check(self, t):
+        if not self.t_min <= t <= self.t_max:
+            raise ValueError("Temperature %g K outside the %s table (%g to %g K)" % (t, self.name, self.t_min,
+                                                                                     self.t_max))
+
+    def _lookup(self, table, t):
+        """
+        Linear interpolation of a table on the uniform temperature grid
+        """
+        self._check(t)
+        position = (t - self.t_min) / self.step
+        i = min(int(position), len(table) - 2)
+        fraction = position - i
+        return table[i] + fraction * (table[i + 1] - table[i])
+
+    def _inverse(self, table, value):
+        """
+        Temperature at which the increasing table reaches value
+        """
+        i = bisect_right(table, value) - 1
+        if i < 0 or value > table[-1]:
+            raise ValueError("Value %g outside the %s table (%g to %g K)" % (value, self.name, self.t_min, self.t_max))
+        i = min(i, len(table) - 2)
+        return self.temperature[i] + self.step * (value - table[i]) / (table[i + 1] - table[i])
+
+    def enthalpy(self, t):
+        """
+        Specific enthalpy [J/kg] at temperature t
+        """
+        return self._lookup(self.enthalpy_table, t)
+
+    def entropy(self, t):
+        """
+        Standard state specific entropy s0 [J/kg K] at temperature t
+        """
+        return self._lookup(self.entropy_table, t)
+
+    def temperature_from_enthalpy(self, h):
+        """
+        Temperature at which the specific enthalpy is h
+        """
+        return self._inverse(self.enthalpy_table, h)
+
+    def temperature_from_entropy(self, s):
+        """
+        Temperature at which the standard state entropy is s
+        """
+        return self._inverse(self.entropy_table, s)
+
+    def exact_viscosity(self, t):
+        """
+        Dynamic viscosity [Pa s] from Sutherland's law, no table
+        """
+        if self.transport is None:
+            raise ValueError("No transport properties for fluid %r" % self.name)
+        return _sutherland(self.transport[0], self.transport[1], t)
+
+    def exact_conductivity(self, t):
+        """
+        Thermal conductivity [W/m K] from Sutherland's law, no table
+        """
+        if self.transport is None:
+            raise ValueError("No transport properties for fluid %r" % self.name)
+        return _sutherland(self.transport[2], self.transport[3], t)
+
+    def transport_tables(self):
+        """
+        (viscosity, conductivity) tables on the temperature grid, built on first use
+        """
+        if self._transport_tables is None:
+            self._transport_tables = (array('d', (self.exact_viscosity(t) for t in self.temperature)),
+                                      array('d', (self.exact_conductivity(t) for t in self.temperature)))
+        return self._transport_tables
+
+    def viscosity(self, t):
+        """
+        Dynamic viscosity [Pa s] at temperature t
+        """
+        return self._lookup(self.transport_tables()[0], t)
+
+    def conductivity(self, t):
+        """
+        Thermal conductivity [W/m K] at temperature t
+        """
+        return self._lookup(self.transport_tables()[1], t)
+
+    def arrays(self):
+        """
+        (temperature, enthalpy, entropy) tables as NumPy arrays, built on first
+        use so NumPy is only imported by the batch solvers
+        """
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = (np.array(self.temperature), np.array(self.enthalpy_table), np.array(self.entropy_table))
+        return self._arrays
+
+    def transport_arrays(self):
+        """
+        (temperature, viscosity, conductivity) tables as NumPy arrays
+        """
+        if self._transport_arrays is None:
+            import numpy as np
+            viscosity, conductivity = self.transport_tables()
+            self._transport_arrays = (np.array(self.temperature), np.array(viscosity), np.array(conductivity))
+        return self._transport_arrays
+
+    def __repr__(self):
+        return "Fluid(%r, %g to %g K, step=%g)" % (self.name, self.t_min, self.t_max, self.step)
+
+
+def get_fluid(fluid=default_fluid, step=default_step):
+    """
+    Cached Fluid by name (see compositions), a Fluid is returned unchanged
+    """
+    if isinstance(fluid, Fluid):
+        return fluid
+    key = (fluid, float(step))
+    cached = _fluid_cache.get(key)
+    if cached is None:
+        try:
+            composition = compositions[fluid]
+        except KeyError:
+            raise ValueError("Unknown fluid %r, expected one of %s" % (fluid, ", ".join(compositions))) from None
+        cached = Fluid(fluid, composition, step=step)
+        _fluid_cache[key] = cached
+    return cached
+
+
+def clear_cache():
+    """
+    Drop every cached fluid table
+    """
+    _fluid_cache.clear()
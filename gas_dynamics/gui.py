@@ -0,0 +1,1722 @@
+# !/usr/bin/env python3
+# coding: utf-8
+
+__author__ = "Shushanth Prabhu"
+__email__ = "shushanth@gmail.com"
+__version__ = "1.0"
+
+# Built using Python 3.7.5
+
+import os
+from tkinter import Frame, Label, messagebox, Menu, Button, Entry, BooleanVar, filedialog, Checkbutton, Canvas
+from tkinter import Y, BOTH, LEFT, Toplevel, END, N, E, W, S, X, TclError, VERTICAL, DISABLED, NORMAL  # TOP, N
+from tkinter.ttk import Notebook, Combobox, Treeview, Scrollbar
+from . import equations
+from .cache import shared_cache
+from .cli import import_file
+from .history import ResultHistory
+from .instrumentation import instruments
+from .result_log import ResultLog, log_path
+from .fluids import compositions
+from .units import default_n, default_cp, unit_registry
+from .workers import JobExecutor
+
+# ROWS OF RESULT HISTORY SHOWN AT ONCE
+history_visible_rows = 4
+
+# REFRESH PERIOD OF THE DIAGNOSTICS WINDOW
+diagnostics_refresh_interval = 500  # ms
+
+# LARGEST GRID OF POINTS A TAB ACCEPTING RANGES SOLVES AT ONCE
+max_range_points = 100000
+
+# FLOW REGIMES OF THE FLAT PLATE TAB (boundary_layer.regimes)
+flat_plate_regimes = ("transitional", "laminar", "turbulent")
+
+# SIZE OF THE PLOT PANEL BELOW THE TABLE AND MARGIN LEFT FOR THE AXIS LABELS
+plot_width = 480
+plot_height = 200
+plot_margin = 40
+
+# IDLE TIME AFTER A ZOOM OR PAN BEFORE THE PREVIEW IS REDRAWN EXACTLY
+plot_refine_delay = 150  # ms
+
+# PAUSE IN TYPING BEFORE A LIVE RECALCULATION
+live_delay = 250  # ms
+
+# FLUID MODEL CHOICES, CONSTANT n AND Cp FIRST
+constant_fluid_model = "Constant n, Cp"
+fluid_models = (constant_fluid_model,) + tuple(compositions)
+
+# py installer --hidden-import=pkg_resources.py2_warn --one file --no console MainWindow_RC.py
+# py installer MainWindow.spec
+
+
+class GasDynamicsCalculatorError(Exception):
+    """
+    Base Class for any Error encountered in the Code
+    """
+    pass
+
+
+def parse_range(text):
+    """
+    Values of a field accepting ranges: comma separated numbers or
+    start:stop:count ranges, e.g. "0.5, 1:3:5". Blank gives no value.
+    """
+    values = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" not in part:
+            values.append(float(part))
+            continue
+        start, stop, count = part.split(":")
+        start, stop, count = float(start), float(stop), int(count)
+        if count < 1:
+            raise ValueError("Range count must be at least 1")
+        if count == 1:
+            values.append(start)
+            continue
+        values.extend(start + (stop - start) * i / (count - 1) for i in range(count))
+    return values
+
+
+class EntryProperty:
+    """
+    Class to store air properties
+    """
+
+    def __init__(self, name, property_type):
+        self.text = name
+        # self.default_value = default_value
+        self.unit_input = 0
+        self.type = property_type
+        self.quantity = unit_registry[property_type]
+        self.read_value = None
+        self.actual_value = None
+
+    def convert_to_si(self):
+        """
+        Converting Units to SI Units
+        """
+        try:
+            return self.quantity.to_si(self.read_value, self.quantity.unit_id(self.unit_input))
+        except ValueError as error:
+            error = str(error)
+            raise GasDynamicsCalculatorError("Unit Conversion failed " + error)
+
+    def convert_from_si(self):
+        """
+        Convert Units from SI
+        """
+        try:
+            return self.quantity.from_si(self.actual_value, self.quantity.unit_id(self.unit_input))
+        except ValueError as error:
+            error = str(error)
+            raise GasDynamicsCalculatorError("Unit Conversion failed " + error)
+
+    @property
+    def units(self):
+        """
+        Provide List of defined Units in a list
+        """
+        return self.quantity.units
+
+    @property
+    def conversion(self):
+        """
+        Return List of Conversion Factors
+        """
+        return list(zip(self.quantity.scale, self.quantity.offset))
+
+    @property
+    def default_unit(self):
+        """
+        Return SI unit
+        """
+        return self.quantity.units[0]
+
+    def __repr__(self):
+        """
+        Returns Name of the field
+        """
+        return self.text
+
+
+class PlotPanel:
+    """
+    Plot of two history columns below the table, drawn with min/max per pixel
+    decimation (plot.DecimatedSeries). Mouse wheel zooms around the pointer,
+    dragging pans and a double click shows all points. While the view changes
+    a coarse level of detail is drawn, the exact plot follows once it stops.
+    """
+
+    def __init__(self, form, row):
+        self.form = form
+        self.frame = Frame(form.table_frame)
+        self.frame.grid(row=row, column=0, columnspan=6)
+        self.x_column = Combobox(self.frame, width=16, values=form.history.columns, state="readonly")
+        self.x_column.grid(row=0, column=0)
+        self.y_column = Combobox(self.frame, width=16, values=form.history.columns, state="readonly")
+        self.y_column.grid(row=0, column=1)
+        if form.history.columns:
+            self.x_column.current(0)
+            self.y_column.current(len(form.history.columns) - 1)
+        Button(self.frame, text="Plot", command=self.plot_history).grid(row=0, column=2)
+        self.canvas = Canvas(self.frame, width=plot_width, height=plot_height, background="white")
+        self.canvas.grid(row=1, column=0, columnspan=3)
+        self.canvas.bind("<MouseWheel>", lambda event: self.zoom(event, 0.8 if event.delta > 0 else 1.25))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(event, 0.8))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(event, 1.25))
+        self.canvas.bind("<ButtonPress-1>", self.pan_start)
+        self.canvas.bind("<B1-Motion>", self.pan)
+        self.canvas.bind("<Double-Button-1>", lambda event: self.reset_view())
+        self.series = None
+        self.labels = ("", "")
+        # X LOW, X HIGH, Y LOW, Y HIGH OF THE VISIBLE WINDOW
+        self.view = None
+        self.pan_origin = None
+        self.refine_job = None
+
+    def plot_history(self):
+        """
+        Plot the selected columns of the table, the points are sorted in the background
+        """
+        x_name, y_name = self.x_column.get(), self.y_column.get()
+        if not x_name or not y_name or not self.form.history.total:
+            return
+        from .plot import DecimatedSeries
+        self.form.status_bar_class.submit(DecimatedSeries, self.form.history.column(x_name),
+                                          self.form.history.column(y_name), description="Plot",
+                                          on_done=lambda series: self.show_series(series, x_name, y_name))
+
+    def show_series(self, series, x_label="", y_label=""):
+        """
+        Show a plot.DecimatedSeries, e.g. built from sweep chunks with DecimatedSeries.from_chunks
+        """
+        self.series = series
+        self.labels = (x_label, y_label)
+        self.reset_view()
+
+    def reset_view(self):
+        """
+        Show every point
+        """
+        if self.series is None or not len(self.series):
+            return
+        x_low, x_high, y_low, y_high = self.series.bounds()
+        # DEGENERATE RANGES GET A SMALL SPAN AROUND THE VALUE
+        if x_high <= x_low:
+            x_low, x_high = x_low - max(abs(x_low) * 1e-6, 1e-12), x_high + max(abs(x_high) * 1e-6, 1e-12)
+        if y_high <= y_low:
+            y_low, y_high = y_low - max(abs(y_low) * 1e-6, 1e-12), y_high + max(abs(y_high) * 1e-6, 1e-12)
+        self.view = [x_low, x_high, y_low, y_high]
+        self.draw(exact=True)
+
+    def to_data(self, px, py):
+        """
+        Data coordinates of a canvas pixel
+        """
+        x_low, x_high, y_low, y_high = self.view
+        x = x_low + (px - plot_margin) / (plot_width - plot_margin) * (x_high - x_low)
+        y = y_high - py / (plot_height - plot_margin) * (y_high - y_low)
+        return x, y
+
+    def zoom(self, event, factor):
+        """
+        Scale the view by factor around the pointer
+        """
+        if self.view is None:
+            return
+        x, y = self.to_data(event.x, event.y)
+        x_low, x_high, y_low, y_high = self.view
+        self.view = [x + (x_low - x) * factor, x + (x_high - x) * factor, y + (y_low - y) * factor,
+                     y + (y_high - y) * factor]
+        self.draw()
+
+    def pan_start(self, event):
+        if self.view is not None:
+            self.pan_origin = (event.x, event.y, list(self.view))
+
+    def pan(self, event):
+        """
+        Move the view with the pointer
+        """
+        if self.pan_origin is None:
+            return
+        px, py, (x_low, x_high, y_low, y_high) = self.pan_origin
+        dx = (event.x - px) / (plot_width - plot_margin) * (x_high - x_low)
+        dy = (event.y - py) / (plot_height - plot_margin) * (y_high - y_low)
+        self.view = [x_low - dx, x_high - dx, y_low + dy, y_high + dy]
+        self.draw()
+
+    def draw(self, exact=False):
+        """
+        Redraw the canvas, a preview unless exact, in which case the exact plot is scheduled
+        """
+        if self.refine_job is not None:
+            self.canvas.after_cancel(self.refine_job)
+            self.refine_job = None
+        self.canvas.delete("all")
+        if self.series is None or self.view is None:
+            return
+        x_low, x_high, y_low, y_high = self.view
+        width = plot_width - plot_margin
+        height = plot_height - plot_margin
+        with instruments.stage("gui.plot_draw"):
+            column, low, high, level = self.series.columns(x_low, x_high, width, exact)
+            scale = height / (y_high - y_low)
+            top = (y_high - high) * scale
+            bottom = (y_high - low) * scale
+            visible = (bottom >= 0) & (top <= height)
+            column = column[visible] + plot_margin
+            # AT LEAST ONE PIXEL HIGH, CLIPPED TO THE PLOT AREA
+            top = top[visible].clip(0, height)
+            bottom = (bottom[visible] + 1).clip(0, height)
+            for x, y0, y1 in zip(column.tolist(), top.tolist(), bottom.tolist()):
+                self.canvas.create_line(x, y0, x, y1, fill="blue")
+
+        self.canvas.create_rectangle(plot_margin, 0, plot_width - 1, height, outline="gray")
+        self.canvas.create_text(plot_margin, height + 2, text="%.4g" % x_low, anchor=N + W)
+        self.canvas.create_text(plot_width - 1, height + 2, text="%.4g" % x_high, anchor=N + E)
+        self.canvas.create_text(plot_margin - 2, 0, text="%.4g" % y_high, anchor=N + E)
+        self.canvas.create_text(plot_margin - 2, height, text="%.4g" % y_low, anchor=S + E)
+        self.canvas.create_text(plot_width / 2, plot_height - 2, text="%s vs %s" % (self.labels[1], self.labels[0]),
+                                anchor=S)
+        if not exact and level:
+            self.refine_job = self.canvas.after(plot_refine_delay, lambda: self.draw(exact=True))
+
+
+class TabForm(Frame):
+    """
+    A class containing different operations in a form.
+    """
+
+    def __init__(self, frame, status_bar_class):
+        self.property_list = []
+        self.status_bar_class = status_bar_class
+        # self.label_list = []
+        self.field_list = []
+        self.unit_list = []
+        self.main_frame = frame
+        self.frame = Frame(self.main_frame)
+        self.frame.grid(row=1, column=1)
+
+        # ONLY THE VISIBLE WINDOW OF THE HISTORY IS RENDERED IN THE TREEVIEW
+        self.table_frame = Frame(self.main_frame)
+        self.table_frame.grid(row=1, column=2)
+        self.tv = Treeview(self.table_frame, height=history_visible_rows)
+        self.tv.grid(row=0, column=0, columnspan=5)
+        self.scroll_bar = Scrollbar(self.table_frame, orient=VERTICAL, command=self.tree_scroll)
+        self.scroll_bar.grid(row=0, column=5, sticky=N + S)
+        self.tv.bind("<MouseWheel>", lambda event: self.tree_scroll('scroll', -1 if event.delta > 0 else 1, 'units'))
+        self.tv.bind("<Button-4>", lambda event: self.tree_scroll('scroll', -1, 'units'))
+        self.tv.bind("<Button-5>", lambda event: self.tree_scroll('scroll', 1, 'units'))
+        self.history = ResultHistory(())
+        self.result_log = None
+        self.tree_first_row = 0
+        self.tree_view_number = 1
+        self.filter_column = None
+        self.filter_low = None
+        self.filter_high = None
+        self.plot = None
+
+        # LIVE MODE: SI VALUE OF EACH PARSED FIELD (NONE WHEN BLANK), FIELDS TO PARSE AGAIN,
+        # FIELD SHOWING THE LIVE RESULT AND THE DEPENDENCIES IT WAS SOLVED FROM
+        self.live_values = {}
+        self.live_dirty = set()
+        self.live_output = None
+        self.live_key = None
+        self.live_job = None
+
+    def create_tree(self):
+        """
+        Function to create a tree.
+        """
+        column_list = []
+        for item in self.property_list:
+            column_list.append(item.text)
+        self.history = ResultHistory(column_list)
+        self.tv['columns'] = column_list
+        self.tv.heading("#0", text="Index")
+        self.tv.column("#0", anchor='center', width=40)
+
+        for item in column_list:
+            self.tv.heading(item, text=item, command=lambda column=item: self.tree_sort(column))
+            self.tv.column(item, anchor='center', width=100)
+
+        # FILTER ROW BELOW THE TABLE
+        self.filter_column = Combobox(self.table_frame, width=16, values=column_list, state="readonly")
+        self.filter_column.grid(row=1, column=0)
+        self.filter_column.current(0)
+        self.filter_low = Entry(self.table_frame, width=12)
+        self.filter_low.grid(row=1, column=1)
+        self.filter_high = Entry(self.table_frame, width=12)
+        self.filter_high.grid(row=1, column=2)
+        Button(self.table_frame, text="Filter", command=self.tree_filter).grid(row=1, column=3)
+        Button(self.table_frame, text="Show All", command=self.tree_filter_reset).grid(row=1, column=4)
+
+        # PLOT OF TWO COLUMNS BELOW THE FILTER ROW
+        self.plot = PlotPanel(self, row=2)
+
+    def tree_render(self):
+        """
+        Shows the visible window of the history in the Treeview
+        """
+        self.tv.delete(*self.tv.get_children())
+        for index, values in self.history.rows(self.tree_first_row, self.tree_first_row + history_visible_rows):
+            display_list = []
+            for item in values:
+                display_list.append(str(round(item, 6)))
+            self.tv.insert('', 'end', text=str(index + 1), values=display_list)
+
+        total = len(self.history)
+        if total:
+            last = min(total, self.tree_first_row + history_visible_rows)
+            self.scroll_bar.set(self.tree_first_row / total, last / total)
+        else:
+            self.scroll_bar.set(0.0, 1.0)
+
+    def tree_scroll(self, *args):
+        """
+        Scrollbar and mouse wheel callback, moves the visible window
+        """
+        total = len(self.history)
+        if args[0] == 'moveto':
+            first = int(float(args[1]) * total)
+        else:
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= history_visible_rows
+            first = self.tree_first_row + step
+        self.tree_first_row = max(0, min(first, total - history_visible_rows))
+        self.tree_render()
+
+    def tree_sort(self, column):
+        """
+        Heading click: ascending, descending, then insertion order
+        """
+        if self.history.sort_column != column:
+            self.history.sort(column)
+        elif not self.history.sort_descending:
+            self.history.sort(column, descending=True)
+        else:
+            self.history.sort(None)
+
+        self.tree_headings()
+        self.tree_first_row = 0
+        self.tree_render()
+
+    def tree_headings(self):
+        """
+        Column headings with the sort arrow
+        """
+        for item in self.history.columns:
+            text = item
+            if item == self.history.sort_column:
+                text += " \u25bc" if self.history.sort_descending else " \u25b2"
+            self.tv.heading(item, text=text)
+
+    def tree_filter(self):
+        """
+        Keeps only the rows with the selected column between the two bounds, blank for no bound
+        """
+        bounds = []
+        for field in (self.filter_low, self.filter_high):
+            value = field.get().strip()
+            try:
+                bounds.append(float(value) if value else None)
+            except ValueError:
+                messagebox.showerror("Error", message="Check filter value " + value)
+                return
+        self.history.filter(self.filter_column.get(), *bounds)
+        self.tree_first_row = 0
+        self.tree_render()
+
+    def tree_filter_reset(self):
+        """
+        Removes all filters of the table
+        """
+        self.filter_low.delete(0, END)
+        self.filter_high.delete(0, END)
+        self.history.clear_filters()
+        self.tree_first_row = 0
+        self.tree_render()
+
+    def clear_table(self):
+        """
+        Clears the table
+        """
+        self.history.clear()
+        for item in self.history.columns:
+            self.tv.heading(item, text=item)
+        self.tree_first_row = 0
+        self.tree_view_number = 1
+        self.tree_render()
+
+    def tree_insert_value(self, insert_list):
+        """
+        Inserts values in trees.
+        """
+        self.history.append(insert_list)
+        self.tree_view_number += 1
+        if self.history.sort_column is None:
+            # FOLLOW THE NEWEST ROW
+            self.tree_first_row = max(0, len(self.history) - history_visible_rows)
+        self.tree_render()
+
+    def session_state(self):
+        """
+        Field texts, unit choices and history of the form, for session.write_session
+        """
+        return {
+            'fields': [field.get() for field in self.field_list],
+            'units': [None if units is None else units.get() for units in self.unit_list],
+            'history': self.history,
+        }
+
+    def check_state(self, state):
+        """
+        Raise ValueError if restore_state would fail on or drop part of a state read by session.read_session
+        """
+        fields, units, history = state['fields'], state['units'], state['history']
+        if len(fields) != len(self.field_list) or not all(isinstance(text, str) for text in fields):
+            raise ValueError("Expected %d field texts" % len(self.field_list))
+        if len(units) != len(self.unit_list):
+            raise ValueError("Expected %d units" % len(self.unit_list))
+        for item, unit in zip(self.property_list, units):
+            if unit and unit not in item.units:
+                raise ValueError("Unknown unit %r of %s" % (unit, item))
+        if history['columns'] != self.history.columns:
+            raise ValueError("Expected the table columns %s" % ", ".join(self.history.columns))
+        self.history.check_load(state['buffers'], history['sort_column'],
+                                {name: (low, high) for name, low, high in history['filters']})
+
+    def restore_state(self, state):
+        """
+        Restore a state read by session.read_session and accepted by check_state,
+        the history buffers are used as they are
+        """
+        for field, text in zip(self.field_list, state['fields']):
+            field.delete(0, END)
+            field.insert(0, text)
+        for units, unit in zip(self.unit_list, state['units']):
+            if units is not None and unit:
+                units.set(unit)
+        self.live_reset()
+        history = state['history']
+        self.history.load(state['buffers'], history['sort_column'], bool(history['sort_descending']),
+                          {name: (low, high) for name, low, high in history['filters']})
+        self.tree_headings()
+        self.tree_view_number = self.history.total + 1
+        self.tree_first_row = 0 if self.history.sort_column else max(0, len(self.history) - history_visible_rows)
+        self.tree_render()
+
+    def live_equation(self):
+        """
+        Equation solved live by this form, None when live mode is off or the
+        tab is not a single unknown equation
+        """
+        live_enabled = getattr(self.status_bar_class, 'live_enabled', None)
+        equation = getattr(self.main_frame, 'equation', None)
+        if live_enabled is None or not live_enabled.get() or equation is None:
+            return None
+        if equations.equation_table[equation].unknowns != 1:
+            return None
+        return equation
+
+    def live_reset(self):
+        """
+        Forget every parsed field, e.g. after the form was filled by the program
+        """
+        self.live_values = {}
+        self.live_dirty = set()
+        self.live_output = None
+        self.live_key = None
+
+    def live_text_changed(self, position):
+        """
+        Key typed in a field: parse only that field again once typing pauses.
+        Typing in the field showing the live result makes it an input
+        """
+        if self.live_equation() is None:
+            return
+        if position == self.live_output:
+            self.live_output = None
+        self.live_dirty.add(position)
+        self.live_schedule()
+
+    def live_unit_changed(self, position):
+        """
+        Unit chosen for a field: an input is converted again, the live result is only shown in the new unit
+        """
+        if self.live_equation() is None:
+            return
+        if position == self.live_output:
+            self.live_show(position)
+            return
+        self.live_dirty.add(position)
+        self.live_schedule()
+
+    def live_schedule(self):
+        """
+        Debounce: restart the wait for a pause in the changes
+        """
+        if self.live_job is not None:
+            self.frame.after_cancel(self.live_job)
+        self.live_job = self.frame.after(live_delay, self.live_recompute)
+
+    def live_parse(self, position):
+        """
+        SI value of one field, None when blank or showing the live result
+        """
+        text = self.field_list[position].get().strip()
+        if position == self.live_output or not text:
+            return None
+        item = self.property_list[position]
+        unit = self.unit_list[position].get() if self.unit_list[position] is not None else 1
+        try:
+            return item.quantity.to_si(float(text), item.quantity.unit_id(unit))
+        except ValueError:
+            raise GasDynamicsCalculatorError("Check values in " + str(item)) from None
+
+    def live_recompute(self):
+        """
+        Parse the changed fields and solve again if an input of the result changed
+        """
+        self.live_job = None
+        equation = self.live_equation()
+        if equation is None:
+            return
+        with instruments.stage("gui.live_recompute"):
+            try:
+                for position in range(len(self.property_list)):
+                    if position in self.live_dirty or position not in self.live_values:
+                        self.live_values[position] = self.live_parse(position)
+                        self.live_dirty.discard(position)
+            except GasDynamicsCalculatorError as error:
+                self.status_bar_class.status_bar.configure(text=str(error))
+                return
+            values = [self.live_values[position] for position in range(len(self.property_list))]
+            blank = [position for position, value in enumerate(values) if value is None]
+            if len(blank) != 1:
+                self.status_bar_class.status_bar.configure(text="Live: leave exactly one field blank")
+                return
+            unknown = blank[0]
+            properties = self.status_bar_class.properties_air_dict
+            key = (tuple(values), unknown, properties['n'], properties['Cp'], properties['fluid'])
+            if key == self.live_key:
+                instruments.count("gui.live_unchanged")
+                return
+            inputs = tuple(0.0 if value is None else value for value in values)
+            try:
+                result = self.status_bar_class.solve(equation, inputs, unknown=unknown)
+            except (ValueError, ZeroDivisionError, OverflowError) as error:
+                self.status_bar_class.status_bar.configure(text="Live: " + str(error))
+                return
+            instruments.count("gui.live_solves")
+            # RESULTS COME IN OUTPUT ORDER, THE FIELDS IN INPUT ORDER
+            info = equations.equation_table[equation]
+            self.property_list[unknown].actual_value = dict(zip(info.outputs, result))[info.inputs[unknown]]
+            self.live_output = unknown
+            self.live_key = key
+            self.live_show(unknown)
+            self.status_bar_class.status_bar.configure(text="Live: " + str(self.property_list[unknown]) + " solved")
+
+    def live_show(self, position):
+        """
+        Write the live result into its field in the selected unit
+        """
+        item = self.property_list[position]
+        unit = self.unit_list[position].get() if self.unit_list[position] is not None else 1
+        value = item.quantity.from_si(item.actual_value, item.quantity.unit_id(unit))
+        self.field_list[position].delete(0, END)
+        self.field_list[position].insert(0, round(value, 6))
+
+    def add_property(self, name, property_type):
+        """
+        Function to add a property in the frame
+        """
+        item = EntryProperty(name, property_type)
+        self.property_list.append(item)
+        # item.default_value = item.default_value
+
+    def arrange_form(self):
+        """
+        Populates all fields of Labels, Adds default value and size of Entry Box
+        """
+        row_count = 1
+        for item in self.property_list:
+            label = Label(self.frame, text=item.text)
+            label.grid(row=row_count, column=0)
+
+            field = Entry(self.frame)
+            field.grid(row=row_count, column=1, ipadx="30")
+            field.bind("<KeyRelease>", lambda event, position=row_count - 1: self.live_text_changed(position))
+
+            self.field_list.append(field)
+            if item.type != "constant":
+                units = Combobox(self.frame, width=12, values=item.units, state="readonly")
+                units.grid(column=3, row=row_count)
+                units.current(0)
+                units.bind("<<ComboboxSelected>>",
+                           lambda event, position=row_count - 1: self.live_unit_changed(position))
+                self.unit_list.append(units)
+            else:
+                # KEEP UNIT_LIST ALIGNED WITH PROPERTY_LIST
+                self.unit_list.append(None)
+
+            row_count += 1
+
+        self.create_tree()
+
+    def clear_entries(self):
+        """
+        Clears the form
+        """
+        i = 0
+        while i < len(self.field_list):
+            self.field_list[i].delete(0, END)
+            if self.unit_list[i] is not None:
+                self.unit_list[i].set(self.property_list[i].default_unit)
+            # self.field_list[i].insert(0, self.property_list[i].default_value)
+            i += 1
+        self.live_reset()
+
+    def get_input(self, form, position):
+        """
+        Performs sanity check of field read from a form.
+        The field showing a live result counts as blank.
+        """
+        if len(form.get()) == 0 or position == self.live_output:
+            return 0
+        else:
+            value = form.get()
+        try:
+            value.is_integer()
+            return int(value)
+        except AttributeError:
+            try:
+                value.isnumeric()
+                return float(value)
+            except ValueError:
+                error_string = "Check values in " + str(self.property_list[position])
+                raise GasDynamicsCalculatorError(error_string)
+
+    @staticmethod
+    def sanity_check(parameter_list):
+        """
+        Sanity Check of Input
+        """
+        # CHECK IF ONLY ONE VARIABLE IS MISSING
+        count_zero = 0
+        for item in parameter_list:
+            if item == 0:
+                count_zero += 1
+        if count_zero == 0:
+            raise GasDynamicsCalculatorError("One Input must be blank")
+        elif count_zero > 1:
+            raise GasDynamicsCalculatorError("More than One Input is not defined")
+            # return False
+
+        # IF ALL CONDITIONS ARE MET
+        return True
+
+    def put_output(self):
+        """
+        Updates the parameter list
+        """
+        i = 0
+        tree_list = []
+        while i != len(self.property_list):
+            self.field_list[i].delete(0, END)
+            self.property_list[i].read_value = self.property_list[i].convert_from_si()
+            self.field_list[i].insert(0, round(self.property_list[i].read_value, 6))
+            if self.property_list[i].type != "constant":
+                self.unit_list[i].set(self.property_list[i].unit_input)
+            tree_list.append(round(self.property_list[i].read_value, 6))
+            i += 1
+
+        self.tree_insert_value(tree_list)
+        self.log_result()
+        self.live_reset()
+
+    def open_log(self, equation):
+        """
+        Attach the persistent result log of an equation and show its rows in the table
+        """
+        self.result_log = self.status_bar_class.result_log(equation)
+        if self.result_log is None:
+            return
+        try:
+            self.history.extend(self.result_log.display_columns())
+        except ImportError:
+            # NO NUMPY, CONVERT RECORD BY RECORD
+            count = len(self.property_list)
+            for record in self.result_log.iter_records():
+                self.history.append([item.quantity.from_si(value, unit_id) for item, value, unit_id in
+                                     zip(self.property_list, record[1:1 + count], record[1 + count:1 + 2 * count])])
+        self.tree_view_number = self.history.total + 1
+        self.tree_first_row = max(0, len(self.history) - history_visible_rows)
+        self.tree_render()
+
+    def add_points(self, rows):
+        """
+        Add solved points given in SI units, e.g. from a file import, to the table and the log
+        """
+        if not rows:
+            return
+        self.history.extend(list(zip(*rows)))
+        if self.result_log is not None:
+            self.result_log.append_rows(rows, [0] * len(self.property_list),
+                                        self.status_bar_class.properties_air_dict)
+        self.tree_view_number = self.history.total + 1
+        self.tree_first_row = max(0, len(self.history) - history_visible_rows)
+        self.tree_render()
+
+    def log_result(self):
+        """
+        Append the solved point in SI units to the result log
+        """
+        if self.result_log is None:
+            return
+        values = [item.actual_value for item in self.property_list]
+        unit_ids = [item.quantity.unit_id(item.unit_input) for item in self.property_list]
+        try:
+            self.result_log.append(values, unit_ids, self.status_bar_class.properties_air_dict)
+        except OSError as error:
+            messagebox.showerror("Error", message="Result could not be logged " + str(error))
+
+    def read_form(self):
+        """
+        Function to read inputs  in the form
+        """
+        i = 0
+        try:
+            while i != len(self.property_list):
+                self.property_list[i].read_value = self.get_input(self.field_list[i], i)
+                if self.property_list[i].type != "constant":
+                    self.property_list[i].unit_input = self.unit_list[i].get()
+                else:
+                    self.property_list[i].unit_input = 1
+                self.property_list[i].actual_value = self.property_list[i].convert_to_si()
+                i += 1
+        except GasDynamicsCalculatorError as error:
+            error = str(error)
+            messagebox.showerror("Error", message=error)
+
+    def add_all_properties(self, property_list):
+        """
+        Functions add properties from list to class
+        """
+        for item in property_list:
+            self.add_property(item[0], item[1])
+        self.arrange_form()
+
+    def return_actual_value(self):
+        """
+        Returns value after conversion
+        :return:
+        """
+        return_list = []
+        for item in self.property_list:
+            return_list.append(item.actual_value)
+        return return_list
+
+    def update_actual_value(self, property_list):
+        i = 0
+        for item in property_list:
+            self.property_list[i].actual_value = item
+            i += 1
+        return property_list
+
+
+class TabIdealCompression(Frame):
+    """
+    Class for each Tab
+    """
+
+    def __init__(self, nb, status_bar_class):
+        Frame.__init__(self, nb)
+        self.status_bar_class = status_bar_class
+        self.parent = nb
+        self.form = TabForm(self, self.status_bar_class)
+
+        # Property name, default type,
+        property_list = ("Pressure 1", "pressure"), ("Pressure 2", "pressure"), ("Temperature 1", "temperature"), (
+            "Temperature 2", "temperature")
+        self.form.add_all_properties(property_list)
+        self.equation = "ideal_compression"
+        self.form.open_log(self.equation)
+
+        button_accept = Button(self, text="Calculate", command=self.button_calculate)
+        button_clear = Button(self, text="Clear", command=self.button_clear)
+        button_clear_table = Button(self, text="Clear Table", command=self.button_clear_table)
+        button_accept.grid(row=len(property_list) + 1, column=0)
+        button_clear.grid(row=len(property_list) + 1, column=1)
+        button_clear_table.grid(row=len(property_list) + 1, column=2)
+
+    def button_clear_table(self):
+        """
+        Clear Table
+        """
+        self.form.clear_table()
+
+    def button_calculate(self):
+        """
+        performs sanity check of the input
+        Solves the Equation
+        """
+        self.form.read_form()
+        p1, p2, t1, t2 = self.form.return_actual_value()
+        try:
+            self.form.sanity_check((p1, p2, t1, t2))
+        except GasDynamicsCalculatorError as error:
+            error = str(error)
+            messagebox.showerror("Error", message=error)
+            return
+        self.status_bar_class.submit(self.status_bar_class.solve, "ideal_compression", (p1, p2, t1, t2),
+                                     description="Ideal Compression", on_done=self.show_result)
+
+    def show_result(self, result):
+        """
+        Shows a solved point, runs in the Tk main loop
+        """
+        p1, p2, t1, t2 = result
+        self.form.update_actual_value((p1, p2, t1, t2))
+        self.form.put_output()
+
+    def button_clear(self):
+        """
+        Clears the form with default values
+        """
+        self.form.clear_entries()
+
+
+class TabStaticTemperature(Frame):
+    """
+    Class for each Tab
+    """
+
+    def __init__(self, nb, status_bar_class):
+        Frame.__init__(self, nb)
+        self.status_bar_class = status_bar_class
+        self.parent = nb
+        self.form = TabForm(self, self.status_bar_class)
+
+        # Property name, default type,
+        property_list = (("Total Temeprature", "temperature"), ("Static Temperature", "temperature"), (
+            "Mach Number", "constant"))
+        self.form.add_all_properties(property_list)
+        self.equation = "static_temperature"
+        self.form.open_log(self.equation)
+
+        button_accept = Button(self, text="Calculate", command=self.button_calculate)
+        button_clear = Button(self, text="Clear", command=self.button_clear)
+        button_clear_table = Button(self, text="Clear Table", command=self.button_clear_table)
+        button_accept.grid(row=len(property_list) + 1, column=0)
+        button_clear.grid(row=len(property_list) + 1, column=1)
+        button_clear_table.grid(row=len(property_list) + 1, column=2)
+
+    def button_clear_table(self):
+        """
+        Clear Table
+        """
+        self.form.clear_table()
+
+    def button_calculate(self):
+        """
+        performs sanity check of the input
+        Solves the Equation
+        """
+        self.form.read_form()
+        tt, ts, ma = self.form.return_actual_value()
+        try:
+            self.form.sanity_check((tt, ts, ma))
+        except GasDynamicsCalculatorError as error:
+            error = str(error)
+            messagebox.showerror("Error", message=error)
+            return
+        self.status_bar_class.submit(self.status_bar_class.solve, "static_temperature", (tt, ts, ma),
+                                     description="Static Temperature", on_done=self.show_result)
+
+    def show_result(self, result):
+        """
+        Shows a solved point, runs in the Tk main loop
+        """
+        ts, tt, ma = result
+        self.form.update_actual_value((tt, ts, ma))
+        self.form.put_output()
+
+    def button_clear(self):
+        """
+        Clears the form with default values
+        """
+        self.form.clear_entries()
+
+
+class TabStaticPressure(Frame):
+    """
+    Class for each Tab
+    """
+
+    def __init__(self, nb, status_bar_class):
+        Frame.__init__(self, nb)
+        self.status_bar_class = status_bar_class
+        self.parent = nb
+        self.form = TabForm(self, self.status_bar_class)
+
+        # Property name, default type,
+        property_list = (("Total Pressure", "pressure"), ("Static Pressure", "pressure"), (
+            "Mach Number", "constant"))
+        self.form.add_all_properties(property_list)
+        self.equation = "static_pressure"
+        self.form.open_log(self.equation)
+
+        button_accept = Button(self, text="Calculate", command=self.button_calculate)
+        button_clear = Button(self, text="Clear", command=self.button_clear)
+        button_clear_table = Button(self, text="Clear Table", command=self.button_clear_table)
+        button_accept.grid(row=len(property_list) + 1, column=0)
+        button_clear.grid(row=len(property_list) + 1, column=1)
+        button_clear_table.grid(row=len(property_list) + 1, column=2)
+
+    def button_clear_table(self):
+        """
+        Clear Table
+        """
+        self.form.clear_table()
+
+    def button_calculate(self):
+        """
+        performs sanity check of the input
+        Solves the Equation
+        """
+        self.form.read_form()
+        pt, ps, ma = self.form.return_actual_value()
+        try:
+            self.form.sanity_check((pt, ps, ma))
+        except GasDynamicsCalculatorError as error:
+            error = str(error)
+            messagebox.showerror("Error", message=error)
+            return
+        self.status_bar_class.submit(self.status_bar_class.solve, "static_pressure", (pt, ps, ma),
+                                     description="Static Pressure", on_done=self.show_result)
+
+    def show_result(self, result):
+        """
+        Shows a solved point, runs in the Tk main loop
+        """
+        ps, pt, ma = result
+        self.form.update_actual_value((pt, ps, ma))
+        self.form.put_output()
+
+    def button_clear(self):
+        """
+        Clears the form with default values
+        """
+        self.form.clear_entries()
+
+
+class TabObliqueShock(Frame):
+    """
+    Class for each Tab
+    """
+
+    def __init__(self, nb, status_bar_class):
+        Frame.__init__(self, nb)
+        self.status_bar_class = status_bar_class
+        self.parent = nb
+        self.form = TabForm(self, self.status_bar_class)
+
+        # Property name, default type,
+        property_list = ("Mach 1", "constant"), ("Deflection", "angle"), ("Shock Angle", "angle"), (
+            "Mach 2", "constant"), ("p2/p1", "constant"), ("T2/T1", "constant"), ("pt2/pt1", "constant")
+        self.form.add_all_properties(property_list)
+        self.equation = "oblique_shock"
+        self.form.open_log(self.equation)
+
+        button_accept = Button(self, text="Calculate", command=self.button_calculate)
+        button_clear = Button(self, text="Clear", command=self.button_clear)
+        button_clear_table = Button(self, text="Clear Table", command=self.button_clear_table)
+        button_accept.grid(row=len(property_list) + 1, column=0)
+        button_clear.grid(row=len(property_list) + 1, column=1)
+        button_clear_table.grid(row=len(property_list) + 1, column=2)
+
+    def button_clear_table(self):
+        """
+        Clear Table
+        """
+        self.form.clear_table()
+
+    def button_calculate(self):
+        """
+        performs sanity check of the input
+        Solves the Equation, a blank deflection gives the normal shock
+        """
+        self.form.read_form()
+        m1, theta = self.form.return_actual_value()[:2]
+        if m1 <= 1:
+            messagebox.showerror("Error", message="Mach 1 must be supersonic")
+            return
+        self.status_bar_class.submit(self.status_bar_class.solve, "oblique_shock", (m1, theta, 0, 0, 0, 0, 0),
+                                     description="Oblique Shock", on_done=self.show_result)
+
+    def show_result(self, result):
+        """
+        Shows a solved point, runs in the Tk main loop
+        """
+        self.form.update_actual_value(result)
+        self.form.put_output()
+
+    def button_clear(self):
+        """
+        Clears the form with default values
+        """
+        self.form.clear_entries()
+
+
+class TabFlatPlate(Frame):
+    """
+    Class for each Tab, the inputs accept ranges and every combination is solved
+    """
+
+    def __init__(self, nb, status_bar_class):
+        Frame.__init__(self, nb)
+        self.status_bar_class = status_bar_class
+        self.parent = nb
+        self.form = TabForm(self, self.status_bar_class)
+
+        # Property name, default type,
+        property_list = ("Mach", "constant"), ("Edge Temperature", "temperature"), ("Edge Pressure", "pressure"), (
+            "Length", "length"), ("Wall Temperature", "temperature"), ("Reynolds", "constant"), (
+            "Skin Friction Cf", "constant"), ("Stanton", "constant"), ("Wall Heat Flux", "heat_flux")
+        self.form.add_all_properties(property_list)
+        self.equation = "flat_plate"
+        self.form.open_log(self.equation)
+        # NUMBER OF INPUT FIELDS, THE OTHERS ARE OUTPUTS
+        self.input_count = 5
+
+        regime_label = Label(self.form.frame, text="Regime")
+        regime_label.grid(row=len(property_list) + 1, column=0)
+        self.regime = Combobox(self.form.frame, width=12, values=flat_plate_regimes, state="readonly")
+        self.regime.grid(row=len(property_list) + 1, column=1)
+        self.regime.current(0)
+        hint = Label(self.form.frame, text="Ranges: start:stop:count or a, b, c - blank wall is adiabatic")
+        hint.grid(row=len(property_list) + 2, column=0, columnspan=4)
+
+        button_accept = Button(self, text="Calculate", command=self.button_calculate)
+        button_clear = Button(self, text="Clear", command=self.button_clear)
+        button_clear_table = Button(self, text="Clear Table", command=self.button_clear_table)
+        button_accept.grid(row=len(property_list) + 1, column=0)
+        button_clear.grid(row=len(property_list) + 1, column=1)
+        button_clear_table.grid(row=len(property_list) + 1, column=2)
+
+    def button_clear_table(self):
+        """
+        Clear Table
+        """
+        self.form.clear_table()
+
+    def session_settings(self):
+        """
+        Tab settings beyond the form saved in a session
+        """
+        return {'regime': self.regime.get()}
+
+    def restore_settings(self, settings):
+        """
+        Restore the settings of session_settings
+        """
+        if settings.get('regime') in flat_plate_regimes:
+            self.regime.set(settings['regime'])
+
+    def read_ranges(self):
+        """
+        SI values of each input field, a list per field
+        """
+        axes = []
+        for i, item in enumerate(self.form.property_list):
+            unit = self.form.unit_list[i].get() if self.form.unit_list[i] is not None else 1
+            item.unit_input = unit
+            if i >= self.input_count:
+                continue
+            try:
+                values = parse_range(self.form.field_list[i].get())
+                unit_id = item.quantity.unit_id(unit)
+            except ValueError:
+                raise GasDynamicsCalculatorError("Check values in " + str(item)) from None
+            if not values:
+                if i != self.input_count - 1:
+                    raise GasDynamicsCalculatorError(str(item) + " must be given")
+                # ADIABATIC WALL
+                axes.append([0.0])
+                continue
+            axes.append([item.quantity.to_si(value, unit_id) for value in values])
+        return axes
+
+    def button_calculate(self):
+        """
+        performs sanity check of the input
+        Solves every combination of the input values in the background
+        """
+        try:
+            axes = self.read_ranges()
+        except GasDynamicsCalculatorError as error:
+            messagebox.showerror("Error", message=str(error))
+            return
+        count = 1
+        for axis in axes:
+            count *= len(axis)
+        if count > max_range_points:
+            messagebox.showerror("Error", message="%d points, at most %d can be solved at once" % (
+                count, max_range_points))
+            return
+        from .boundary_layer import solve_grid
+        properties = self.status_bar_class.properties_air_dict
+        self.status_bar_class.submit(solve_grid, axes, self.regime.get(), False, properties['n'], properties['Cp'],
+                                     properties['fluid'] or "air", description="Flat Plate", on_done=self.show_result)
+
+    def show_result(self, rows):
+        """
+        Shows one solved point in the form, a grid of points in the table
+        """
+        if len(rows) == 1:
+            self.form.update_actual_value(rows[0])
+            self.form.put_output()
+            return
+        self.form.add_points(rows)
+
+    def button_clear(self):
+        """
+        Clears the form with default values
+        """
+        self.form.clear_entries()
+
+
+class GasDynamicsCalculator(Frame):
+    """
+    Main Window Class
+    """
+
+    def __init__(self, isapp=True, name='gas_dynamics_calculator'):
+        Frame.__init__(self, name=name)
+        self.pack(expand=Y, fill=BOTH)
+
+        self.master.title('Gas Dynamics Calculator')
+        self.master.iconbitmap('images//paper_airplane16X16.ico')
+        self.isapp = isapp
+        self.solver_cache = shared_cache
+        self.result_logs = {}
+
+        # INITIALIZE
+        self.static_temperature = None
+        self.ideal_compression_work = None
+        self.static_pressure = None
+        self.oblique_shock = None
+        self.flat_plate = None
+        self.status = None
+        self.option1_field = None
+        self.option2_field = None
+        self.option3_field = None
+
+        # PROPERTIES OF AIR
+        self.properties_air_dict = {
+            'n': default_n,
+            'Cp': default_cp,
+            # NAME OF A VARIABLE PROPERTY FLUID (fluids.compositions), NONE FOR CONSTANT n AND Cp
+            'fluid': None
+        }
+
+        # CREATE WIDGETS
+        self.create_panels()
+        self.create_menu_panels()
+
+        # ESC closes the widget.
+        self.winfo_toplevel().bind('<Escape>', lambda x: self.master.destroy())
+        # self.winfo_toplevel().bind('<Escape>', lambda x: self.exit_app())
+
+        # DISABLE RESIZING
+        self.winfo_toplevel().resizable(0, 0)
+
+        # STATUS BAR
+        self.status_bar = Label(self,
+                                text='Ctrl+Tab- Next Tab, Shift+Ctrl+Tab - Previous Tab',
+                                borderwidth=1, font='Helv 10', anchor=W)
+        self.status_bar.pack(side="left", fill=X)
+
+        # BACKGROUND JOBS, SHOWN ON THE RIGHT OF THE STATUS BAR
+        self.job_cancel_button = Button(self, text="Cancel", command=self.cancel_jobs, state=DISABLED)
+        self.job_cancel_button.pack(side="right")
+        self.job_status = Label(self, text='', borderwidth=1, font='Helv 10', anchor=E)
+        self.job_status.pack(side="right")
+        self.executor = JobExecutor(self, on_status=self.update_job_status)
+        self.bind("<Destroy>", lambda event: self.executor.shutdown() if event.widget is self else None)
+
+        # # DELETE
+        # self.flag_1 = False
+        # self.flag_2 = False
+
+    def create_panels(self):
+        """
+        Create Cascading Panels
+        """
+        # create the notebook
+        nb = Notebook(self)
+        # noinspection PyAttributeOutsideInit
+        self.notebook = nb
+
+        # extend bindings to top level window allowing
+        #   CTRL+TAB - cycles through tabs
+        #   SHIFT+CTRL+TAB - previous tab
+        #   ALT+K - select tab using mnemonic (K = underlined letter)
+        nb.enable_traversal()
+
+        self.ideal_compression_work = TabIdealCompression(nb, status_bar_class=self)
+        nb.add(self.ideal_compression_work, text="Ideal Compression", underline=0, padding=2)
+        self.ideal_compression_work.bind("<Enter>",
+                                         lambda a: self.status_bar.configure(text="Isentropic Compression"))
+        self.ideal_compression_work.bind("<Leave>", lambda a: self.status_bar.configure(text=" "))
+
+        self.static_temperature = TabStaticTemperature(nb, status_bar_class=self)
+        nb.add(self.static_temperature, text="Static Temperature", underline=7, padding=2)
+        self.static_temperature.bind("<Enter>",
+                                     lambda a: self.status_bar.configure(text="Static Temperature"))
+        self.static_temperature.bind("<Leave>", lambda a: self.status_bar.configure(text=" "))
+
+        self.static_pressure = TabStaticPressure(nb, status_bar_class=self)
+        nb.add(self.static_pressure, text="Static Pressure", underline=7, padding=2)
+        self.static_pressure.bind("<Enter>",
+                                  lambda a: self.status_bar.configure(text="Static Pressure"))
+        self.static_pressure.bind("<Leave>", lambda a: self.status_bar.configure(text=" "))
+
+        self.oblique_shock = TabObliqueShock(nb, status_bar_class=self)
+        nb.add(self.oblique_shock, text="Oblique Shock", underline=8, padding=2)
+        self.oblique_shock.bind("<Enter>",
+                                lambda a: self.status_bar.configure(text="Oblique and Normal Shock"))
+        self.oblique_shock.bind("<Leave>", lambda a: self.status_bar.configure(text=" "))
+
+        self.flat_plate = TabFlatPlate(nb, status_bar_class=self)
+        nb.add(self.flat_plate, text="Flat Plate", underline=0, padding=2)
+        self.flat_plate.bind("<Enter>",
+                             lambda a: self.status_bar.configure(text="Flat Plate Skin Friction and Heat Transfer"))
+        self.flat_plate.bind("<Leave>", lambda a: self.status_bar.configure(text=" "))
+
+        nb.pack(fill=BOTH, expand=Y, padx=2, pady=3)
+
+    def create_menu_panels(self):
+        """
+        Function creating menu panels
+        """
+        # create the main menu (only displays if child of the 'root' window)
+        self.master.option_add('*tearOff', False)  # disable all tear off's
+        # noinspection PyAttributeOutsideInit
+        self.menu = Menu(self.master, name='menu')
+        self.add_options_menu()
+        self.add_help_menu()
+
+        self.master.config(menu=self.menu)
+        # set up standard bindings for the Menu class
+        # (essentially to capture mouse enter/leave events)
+        self.menu.bind_class('Menu', '<<MenuSelect>>', self.update_status)
+
+    def add_options_menu(self):
+        """
+        Adding Options Menu
+        """
+        options_menu = Menu(self.menu, name='options_menu')
+        self.menu.add_cascade(label='Options', menu=options_menu, underline=0)
+        options_menu.add_command(label='Properties of Fluid', command=self.properties_of_air)
+        # noinspection PyAttributeOutsideInit
+        self.cache_enabled = BooleanVar(self, value=self.solver_cache.enabled)
+        options_menu.add_checkbutton(label='Cache Results', variable=self.cache_enabled, command=self.toggle_cache)
+        options_menu.add_command(label='Cache Statistics', command=self.show_cache_statistics)
+        # noinspection PyAttributeOutsideInit
+        self.live_enabled = BooleanVar(self, value=False)
+        options_menu.add_checkbutton(label='Live Recalculation', variable=self.live_enabled)
+        options_menu.add_command(label='Import Points', command=self.import_points)
+        options_menu.add_command(label='Export Results', command=self.export_results)
+        options_menu.add_command(label='Save Session', command=self.save_session)
+        options_menu.add_command(label='Open Session', command=self.open_session)
+        options_menu.add_command(label='Diagnostics', command=self.diagnostics)
+
+        # self.add_sub_menu(options_menu)  # check buttons
+        options_menu.add_separator()
+        options_menu.add_command(label='Exit', command=self.exit_app)
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Run a calculation in the background, see JobExecutor.submit
+        """
+        kwargs.setdefault('on_error', self.show_job_error)
+        return self.executor.submit(function, *args, **kwargs)
+
+    @staticmethod
+    def show_job_error(error):
+        """
+        Report a failed background calculation
+        """
+        messagebox.showerror("Error", message="Calculation failed " + str(error))
+
+    def cancel_jobs(self):
+        """
+        Cancel every queued and running calculation
+        """
+        self.executor.cancel_all()
+
+    def update_job_status(self, queued, running, progress):
+        """
+        Show queued and running jobs in the status bar
+        """
+        if queued == 0 and running == 0:
+            self.job_status.configure(text='')
+            self.job_cancel_button.configure(state=DISABLED)
+            return
+        text = "Jobs: %d running, %d queued" % (running, queued)
+        if progress is not None:
+            text += " (%d%%)" % (100 * progress)
+        self.job_status.configure(text=text)
+        self.job_cancel_button.configure(state=NORMAL)
+
+    def model_equation(self, equation):
+        """
+        Equation solved for a tab equation, its real gas version when a fluid model is selected
+        """
+        if self.properties_air_dict['fluid'] is None:
+            return equation
+        return equations.real_gas_equations.get(equation, equation)
+
+    def solve(self, equation, inputs, unknown=None):
+        """
+        Solve an equation of equations.equation_table with the current fluid properties,
+        through the shared result cache. unknown is the position of the unknown, the
+        single zero input by default
+        """
+        return self.solver_cache.solve(self.model_equation(equation), inputs, self.properties_air_dict, unknown)
+
+    def result_log(self, equation):
+        """
+        Persistent result log of an equation, opened once and shared by the tabs.
+        None if the log can not be opened.
+        """
+        if equation not in self.result_logs:
+            try:
+                self.result_logs[equation] = ResultLog(log_path(equation), equation, self.properties_air_dict)
+            except (OSError, ValueError) as error:
+                messagebox.showerror("Error", message="Result log not available " + str(error))
+                self.result_logs[equation] = None
+        return self.result_logs[equation]
+
+    def import_points(self):
+        """
+        Solve a CSV or JSON Lines file of points (SI units, blank unknown) for the
+        selected tab in the background
+        """
+        tab = self.nametowidget(self.notebook.select())
+        path = filedialog.askopenfilename(title="Import Points",
+                                          filetypes=(("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("All", "*.*")))
+        if not path:
+            return
+        equation = self.model_equation(tab.equation)
+        gas_property = self.properties_air_dict[equations.equation_table[equation].gas_property]
+        self.submit(import_file, path, equation, gas_property, description="Import " + os.path.basename(path),
+                    pass_job=True, on_done=tab.form.add_points)
+
+    def export_results(self):
+        """
+        Export every result log to a CSV file in a chosen directory
+        """
+        directory = filedialog.askdirectory(title="Export Results")
+        if not directory:
+            return
+        for equation, log in self.result_logs.items():
+            if log is None:
+                continue
+            with open(os.path.join(directory, equation + ".csv"), "w", newline="", encoding="utf-8") as stream:
+                log.export_csv(stream)
+        messagebox.showinfo(title="Export Results", message="Results exported to " + directory)
+
+    def tabs(self):
+        """
+        Every equation tab
+        """
+        return [self.ideal_compression_work, self.static_temperature, self.static_pressure, self.oblique_shock,
+                self.flat_plate]
+
+    def save_session(self, path=None):
+        """
+        Save every tab, the unit choices, the fluid properties and the result tables to a session file
+        """
+        from .session import file_extension, write_session
+        path = path or filedialog.asksaveasfilename(title="Save Session", defaultextension=file_extension,
+                                                    filetypes=(("Session", "*" + file_extension), ("All", "*.*")))
+        if not path:
+            return
+        tabs = []
+        for tab in self.tabs():
+            state = tab.form.session_state()
+            state['equation'] = tab.equation
+            if hasattr(tab, 'session_settings'):
+                state['settings'] = tab.session_settings()
+            tabs.append(state)
+        try:
+            write_session(path, self.properties_air_dict, tabs)
+        except OSError as error:
+            messagebox.showerror("Error", message="Session could not be saved " + str(error))
+
+    def open_session(self, path=None):
+        """
+        Restore a session file saved with save_session
+        """
+        from .session import file_extension, read_session
+        path = path or filedialog.askopenfilename(title="Open Session",
+                                                  filetypes=(("Session", "*" + file_extension), ("All", "*.*")))
+        if not path:
+            return
+        try:
+            header, states = read_session(path)
+            properties = {name: value for name, value in header['properties'].items()
+                          if name in ('n', 'Cp', 'fluid')}
+            # A HAND EDITED OR FOREIGN FILE MUST NOT LEAVE PROPERTIES THE SOLVERS FAIL ON
+            for name, value in properties.items():
+                if name == 'fluid':
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 < value < float('inf'):
+                    raise ValueError("%s must be a positive number, got %r" % (name, value))
+            fluid = properties.get('fluid')
+            if fluid is not None and (not isinstance(fluid, str) or fluid not in compositions):
+                raise ValueError("unknown fluid %r" % (fluid,))
+            # EVERY TAB IS CHECKED BEFORE ANY IS TOUCHED, A BAD FILE LEAVES THE WINDOW AS IT WAS
+            tabs = {tab.equation: tab for tab in self.tabs()}
+            states = [(tabs[state['equation']], state) for state in states if state.get('equation') in tabs]
+            for tab, state in states:
+                tab.form.check_state(state)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+            messagebox.showerror("Error", message="Session could not be opened " + str(error))
+            return
+        for name, value in properties.items():
+            self.properties_air_dict[name] = float(value) if name != 'fluid' else value
+        self.solver_cache.invalidate()
+        for tab, state in states:
+            tab.form.restore_state(state)
+            if hasattr(tab, 'restore_settings'):
+                tab.restore_settings(state.get('settings', {}))
+
+    def toggle_cache(self):
+        """
+        Switch the shared result cache on or off
+        """
+        self.solver_cache.enabled = self.cache_enabled.get()
+        if not self.solver_cache.enabled:
+            self.solver_cache.invalidate()
+
+    def show_cache_statistics(self):
+        """
+        Display hit and miss counters of the result cache
+        """
+        stats = self.solver_cache.stats()
+        message = "\n".join("%s: %s" % (key.replace('_', ' ').capitalize(), value) for key, value in stats.items())
+        messagebox.showinfo(title="Cache Statistics", message=message)
+
+    def diagnostics(self):
+        """
+        Window with the instrumentation timers and counters of the hot paths
+        """
+        window = Toplevel(self)
+        window.title("Diagnostics")
+        enabled = BooleanVar(window, value=instruments.enabled)
+
+        def toggle():
+            if enabled.get():
+                instruments.enable()
+            else:
+                instruments.disable()
+
+        Checkbutton(window, text="Enable Instrumentation", variable=enabled, command=toggle).grid(row=0, column=0,
+                                                                                             sticky=W)
+        columns = ("Calls", "Total [ms]", "Mean [us]", "Max [us]")
+        tree = Treeview(window, height=12, columns=columns)
+        tree.heading("#0", text="Stage")
+        tree.column("#0", width=200)
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, anchor='e', width=90)
+        tree.grid(row=1, column=0, columnspan=3)
+
+        def refresh(repeat=False):
+            try:
+                if not window.winfo_exists():
+                    return
+            except TclError:
+                return
+            report = instruments.report()
+            tree.delete(*tree.get_children())
+            for name, stage in report['stages'].items():
+                tree.insert('', END, text=name, values=(stage['calls'], "%.3f" % (1e3 * stage['total_seconds']),
+                                                        "%.1f" % (1e6 * stage['mean_seconds']),
+                                                        "%.1f" % (1e6 * stage['max_seconds'])))
+            for name, value in report['counters'].items():
+                tree.insert('', END, text=name, values=(value, "", "", ""))
+            if repeat:
+                window.after(diagnostics_refresh_interval, refresh, True)
+
+        Button(window, text="Refresh", command=refresh).grid(row=2, column=0)
+        Button(window, text="Reset", command=lambda: (instruments.reset(), refresh())).grid(row=2, column=1)
+        Button(window, text="Close", command=window.destroy).grid(row=2, column=2)
+        window.bind('<Escape>', lambda x: window.destroy())
+        refresh(True)
+
+    def esc_exit_app(self, event):
+        """
+        Escape closes the Widget
+        """
+        if event:
+            self.exit_app()
+
+    def exit_app(self):
+        """
+        Are you sure prompt before exiting the Widget
+        """
+        response = messagebox.askyesno(title="Exit", message="Are you sure you wish to Quit?")
+        if response:
+            self.master.destroy()
+
+    def add_help_menu(self):
+        """
+        Adding Options Menu
+        """
+        disclaimer_msg = "THE AUTHORS DOES NOT WARRANT THE CORRECTNESS OF ANY RESULTS OBTAINED WITH THIS TOOL." \
+                         + "IN NO EVENT WILL THE AUTHORS OR ANY OF ITS EMPLOYEES BE LIABLE TO YOU FOR DAMAGES," \
+                         + "INCLUDING ANY GENERAL, SPECIAL, INCIDENTAL OR CONSEQUENTIAL DAMAGES ARISING OUT OF THE" \
+                         + "USE OR INABILITY TO USE THE SOFTWARE(INCLUDING BUT NOT LIMITED TO LOSS OF DATA OR DATA" \
+                         + "BEING RENDERED INACCURATE OR LOSSES SUSTAINED BY YOU OR THIRD PARTIES)."
+        help_menu = Menu(self.menu, name='help_menu')
+        self.menu.add_cascade(label='Help', menu=help_menu, underline=0)
+
+        help_menu.add_command(label='Info',
+                              command=self.show_help_menu_info_msg)
+
+        help_menu.add_command(label='Disclaimer',
+                              command=lambda: messagebox.showwarning(title="Disclaimer", message=disclaimer_msg))
+        help_menu.entryconfig(0, bitmap="questhead", compound=LEFT)
+
+    def show_help_menu_info_msg(self):
+        """
+        Display Info Message
+        """
+        # copyright_symbol = u"\u00A9"
+        window = Toplevel(self)
+
+        info_msg = "A simple tool to calculate essential Gas Dynamic parameters " \
+                   + "All Rights Reserved" + "\n"
+        info_msg += "Compiled using Python v3.7.5" + "\n"
+
+        panel = Label(window, text=info_msg)
+        panel.grid(row=1, column=0)
+
+        ok_button = Button(window, text='Ok', command=window.destroy, width=10)
+        ok_button.grid(row=2, column=0)
+        ok_button.focus()
+
+        # ESC closes the widget.
+        window.winfo_toplevel().bind('<Escape>', lambda x: window.destroy())
+
+    def properties_of_air(self):
+        """
+        Menu to add or edit properties of Air
+        """
+        window_network_options = Toplevel(self)
+        window_network_options.title("Properties fo Air-")
+        window_network_options.iconbitmap('images//paper_airplane16X16.ico')
+        self.properties_of_air_form(window_network_options)
+
+    def properties_of_air_form(self, window):
+        """
+        Form of global air porperties
+        """
+        option1 = Label(window, text="Enter Isentropic Compression -")
+        option2 = Label(window, text="Enter Specific Heat of Fluid [J/kg.K]-")
+        option3 = Label(window, text="Fluid Model-")
+
+        # FIELD
+        self.option1_field = Entry(window)
+        self.option2_field = Entry(window)
+        self.option3_field = Combobox(window, values=fluid_models, state="readonly")
+
+        button_accept = Button(window, text="Accept", command=lambda: self.properties_of_air_accept(window))
+        button_cancel = Button(window, text="Cancel", command=lambda: window.destroy())
+        button_reset_default = Button(window, text="Reset Default", command=self.properties_of_air_default)
+
+        # PLACEMENT
+        option1.grid(row=1, column=0)
+        option2.grid(row=2, column=0)
+        option3.grid(row=3, column=0)
+
+        self.option1_field.grid(row=1, column=1, ipadx="50")
+        self.option2_field.grid(row=2, column=1, ipadx="50")
+        self.option3_field.grid(row=3, column=1, ipadx="42")
+
+        button_accept.grid(row=4, column=0)
+        button_cancel.grid(row=4, column=1)
+        button_reset_default.grid(row=4, column=3)
+        # button_reset_default.grid(row=3, column=2)
+
+        self.option1_field.bind("<Return>", lambda a: self.option2_field.focus_set())
+        self.option2_field.bind("<Return>", lambda a: button_accept.focus_set())
+
+        self.option1_field.insert(0, str(self.properties_air_dict['n']))
+        self.option2_field.insert(0, str(self.properties_air_dict['Cp']))
+        self.option3_field.set(self.properties_air_dict['fluid'] or constant_fluid_model)
+
+    def properties_of_air_accept(self, tab):
+        """
+        Change global air properties
+        """
+        self.properties_air_dict['n'] = float(self.option1_field.get())
+        self.properties_air_dict['Cp'] = float(self.option2_field.get())
+        fluid = self.option3_field.get()
+        self.properties_air_dict['fluid'] = None if fluid == constant_fluid_model else fluid
+        self.solver_cache.invalidate()
+        tab.destroy()
+
+    def properties_of_air_default(self):
+        """
+        Reset it to default air properties
+        """
+        self.option1_field.delete(0, END)
+        self.option1_field.insert(0, str(default_n))
+        self.option2_field.delete(0, END)
+        self.option2_field.insert(0, str(default_cp))
+        self.option3_field.set(constant_fluid_model)
+
+    def update_status(self, evt):
+        """
+        Function to update the Status
+        :param evt: Mouse Enter event
+        """
+        try:
+            # triggered on mouse entry if a menu item has focus
+            # (focus occurs when user clicks on a top level menu item)
+
+            item = self.tk.eval('%s entrycget active -label' % evt.widget)
+            self.status_bar.configure(foreground='black',
+                                      text=item)
+        except TclError:
+            # no label available, ignore
+            pass
+
+
+# HOT PATHS TIMED WHILE INSTRUMENTATION IS ENABLED
+instruments.register(TabForm, "read_form", "form.read_form")
+instruments.register(EntryProperty, "convert_to_si", "units.convert_to_si")
+instruments.register(GasDynamicsCalculator, "solve", "equations.solve")
+instruments.register(EntryProperty, "convert_from_si", "units.convert_from_si")
+instruments.register(TabForm, "put_output", "form.put_output")
+instruments.register(TabForm, "tree_insert_value", "tree.insert_value")
+instruments.register(TabForm, "tree_render", "tree.render")
+instruments.register(TabForm, "log_result", "log.append")
+
+
+if __name__ == '__main__':
+    GasDynamicsCalculator().mainloop()
@@ -0,0 +1,285 @@
+"""
+Compact columnar store of solved points for the result tables
+
+Each column is an array('d') buffer, 8 bytes per value, so a tab can keep
+millions of rows. Sorting and filtering work on the buffers (through NumPy
+when it is installed) and produce a view, an ordering of row numbers; the
+Treeview only ever renders the rows of the view that are on screen. Rows
+added to a sorted or filtered history are inserted into the view with a
+binary search, so a live stream does not sort the whole history again.
+"""
+from array import array
+from bisect import bisect_right
+
+_numpy = []
+
+
+def numpy():
+    """
+    NumPy module or None, imported on the first sort, filter or bulk insert
+    so that opening the GUI does not pay for it
+    """
+    if not _numpy:
+        try:
+            import numpy as np
+        except ImportError:  # SORT AND FILTER IN PURE PYTHON
+            np = None
+        _numpy.append(np)
+    return _numpy[0]
+
+
+def _sort_key(value):
+    """
+    Sort key of a value, NaN after every number as in np.argsort
+    """
+    return (1, 0.0) if value != value else (0, value)
+
+
+class _SortKeys:
+    """
+    Sort keys of the rows of a view in ascending order, a sequence for bisect
+    """
+
+    def __init__(self, view, column, descending):
+        self.view = view
+        self.column = column
+        self.descending = descending
+
+    def __len__(self):
+        return len(self.view)
+
+    def __getitem__(self, position):
+        if self.descending:
+            position = len(self.view) - 1 - position
+        return _sort_key(self.column[self.view[position]])
+
+
+class ResultHistory:
+    """
+    Columnar buffer of rows of floats with a sortable, filterable view
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._data = [array('d') for _ in self.columns]
+        self.sort_column = None
+        self.sort_descending = False
+        self.filters = {}
+        self._view = None
+        self._dirty = False
+
+    def __len__(self):
+        """
+        Number of rows in the view
+        """
+        if self._view is None:
+            return len(self._data[0]) if self._data else 0
+        self._refresh()
+        return len(self._view)
+
+    @property
+    def total(self):
+        """
+        Number of stored rows, ignoring filters
+        """
+        return len(self._data[0]) if self._data else 0
+
+    def append(self, values):
+        """
+        Add one row
+        """
+        for column, value in zip(self._data, values):
+            column.append(value)
+        if self._view is not None and not self._dirty:
+            self._insert(self.total - 1)
+
+    def extend(self, columns):
+        """
+        Add many rows given as one sequence (or array) per column
+        """
+        np = numpy()
+        start = self.total
+        for column, values in zip(self._data, columns):
+            if np is not None and isinstance(values, np.ndarray):
+                column.frombytes(np.ascontiguousarray(values, dtype=float).tobytes())
+            else:
+                column.extend(values)
+        if self._view is not None and not self._dirty:
+            # A FEW ROWS ARE INSERTED, A LARGE BLOCK IS CHEAPER TO SORT WITH THE REST ON THE NEXT READ
+            if (self.total - start) * 16 <= len(self._view):
+                for index in range(start, self.total):
+                    self._insert(index)
+            else:
+                self._dirty = True
+
+    def clear(self):
+        """
+        Drop every row, the sort and the filters
+        """
+        self._data = [array('d') for _ in self.columns]
+        self.sort_column = None
+        self.filters = {}
+        self._view = None
+        self._dirty = False
+
+    def buffers(self):
+        """
+        The array('d') buffer of every stored column, e.g. to save them without a copy
+        """
+        return self._data
+
+    def check_load(self, buffers, sort_column=None, filters=None):
+        """
+        Raise ValueError if load() would fail on these buffers, sort column or filters
+        """
+        if len(buffers) != len(self.columns) or len(set(len(buffer) for buffer in buffers)) > 1:
+            raise ValueError("Expected %d columns of equal length" % len(self.columns))
+        if sort_column is not None and sort_column not in self.columns:
+            raise ValueError("Unknown sort column %r" % (sort_column,))
+        for name, (low, high) in (filters or {}).items():
+            if name not in self.columns:
+                raise ValueError("Unknown filter column %r" % (name,))
+            for bound in (low, high):
+                if bound is not None and (isinstance(bound, bool) or not isinstance(bound, (int, float))):
+                    raise ValueError("Filter bound of %s must be a number, got %r" % (name, bound))
+
+    def load(self, buffers, sort_column=None, descending=False, filters=None):
+        """
+        Replace every row by array('d') buffers, one per column, and restore the
+        sort and filters. Nothing changes when they are invalid (see check_load)
+        """
+        self.check_load(buffers, sort_column, filters)
+        self._data = list(buffers)
+        self.sort_column = sort_column
+        self.sort_descending = descending
+        self.filters = dict(filters or {})
+        self._update_view()
+
+    def column(self, name):
+        """
+        Copy of a stored column, a NumPy array when NumPy is installed
+        """
+        data = self._data[self.columns.index(name)]
+        if numpy() is not None:
+            return self._values(data).copy()
+        return array('d', data)
+
+    @staticmethod
+    def _values(data):
+        """
+        NumPy view on a buffer, must not outlive the call using it since a
+        buffer cannot grow while it is viewed
+        """
+        np = numpy()
+        return np.frombuffer(data, dtype=float) if len(data) else np.zeros(0)
+
+    def row(self, position):
+        """
+        (row number, values) of the row at position in the view
+        """
+        index = position
+        if self._view is not None:
+            self._refresh()
+            index = int(self._view[position])
+        return index, tuple(column[index] for column in self._data)
+
+    def rows(self, start, stop):
+        """
+        (row number, values) of the view rows in [start, stop)
+        """
+        stop = min(stop, len(self))
+        return [self.row(position) for position in range(max(start, 0), stop)]
+
+    def sort(self, name, descending=False):
+        """
+        Order the view by a column, None restores insertion order
+        """
+        self.sort_column = name
+        self.sort_descending = descending
+        self._update_view()
+
+    def filter(self, name, low=None, high=None):
+        """
+        Keep rows whose column lies in [low, high], both bounds None removes the filter
+        """
+        if low is None and high is None:
+            self.filters.pop(name, None)
+        else:
+            self.filters[name] = (low, high)
+        self._update_view()
+
+    def clear_filters(self):
+        """
+        Show every row again, keeping the sort
+        """
+        self.filters = {}
+        self._update_view()
+
+    def _update_view(self):
+        """
+        Rebuild the view after a sort or filter change
+        """
+        if self.sort_column is None and not self.filters:
+            self._view = None
+        else:
+            self._view = self._build_view()
+        self._dirty = False
+
+    def _refresh(self):
+        """
+        Rebuild the view lazily after rows were added to a sorted or filtered history
+        """
+        if self._dirty:
+            self._update_view()
+
+    def _insert(self, index):
+        """
+        Add a new row number to the view at its sorted place, if it passes the filters
+        """
+        for name, (low, high) in self.filters.items():
+            value = self._data[self.columns.index(name)][index]
+            if (low is not None and not value >= low) or (high is not None and not value <= high):
+                return
+        if not isinstance(self._view, list):
+            self._view = self._view.tolist()
+        if self.sort_column is None:
+            self._view.append(index)
+            return
+        column = self._data[self.columns.index(self.sort_column)]
+        # AFTER THE EQUAL KEYS IN ASCENDING ORDER (STABLE SORT), BEFORE THEM ONCE REVERSED
+        position = bisect_right(_SortKeys(self._view, column, self.sort_descending), _sort_key(column[index]))
+        self._view.insert(len(self._view) - position if self.sort_descending else position, index)
+
+    def _build_view(self):
+        """
+        Row numbers passing the filters, in sort order
+        """
+        np = numpy()
+        if np is not None:
+            keep = np.ones(self.total, dtype=bool)
+            for name, (low, high) in self.filters.items():
+                values = self._values(self._data[self.columns.index(name)])
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+            index = np.flatnonzero(keep)
+            if self.sort_column is not None:
+                values = self._values(self._data[self.columns.index(self.sort_column)])
+                index = index[np.argsort(values[index], kind='stable')]
+                if self.sort_descending:
+                    index = index[::-1]
+            return index
+
+        index = range(self.total)
+        for name, (low, high) in self.filters.items():
+            values = self._data[self.columns.index(name)]
+            index = [i for i in index if (low is None or values[i] >= low) and (high is None or values[i] <= high)]
+        index = list(index)
+        if self.sort_column is not None:
+            values = self._data[self.columns.index(self.sort_column)]
+            # SAME ORDER AS THE NUMPY VIEW: STABLE ASCENDING SORT, REVERSED WHEN DESCENDING
+            index.sort(key=lambda i: _sort_key(values[i]))
+            if self.sort_descending:
+                index.reverse()
+        return index
@@ -0,0 +1,209 @@
+"""
+Switchable timers and counters for the hot paths, and a cProfile helper
+
+Hot path functions are registered once with Instrumentation.register(owner,
+attribute). While instrumentation is off nothing is wrapped, the registered
+functions are the original ones and cost nothing extra. enable() replaces each
+of them on its class or module by a wrapper that counts the calls and times
+them, disable() puts the originals back. stage() times an arbitrary block and
+count() bumps a named counter, both return immediately while disabled.
+
+    from gas_dynamics.instrumentation import instruments
+    instruments.enable()
+    ...
+    print(instruments.report())
+
+profile() is a context manager running a workload under cProfile and writing
+the pstats report to a stream or file.
+"""
+import cProfile
+import io
+import pstats
+import sys
+from contextlib import contextmanager
+from functools import wraps
+from inspect import getattr_static
+from threading import Lock
+from time import perf_counter
+
+
+class _NullStage:
+    """
+    Context manager doing nothing, returned by stage() while disabled
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_null_stage = _NullStage()
+
+
+class _Stage:
+    """
+    Context manager timing one block into a stage
+    """
+    __slots__ = ("instrumentation", "name", "start")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.name, perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """
+    Registry of instrumented functions with per stage timers and named counters
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.targets = []
+        # NAME: [CALLS, TOTAL SECONDS, MAX SECONDS]
+        self.timers = {}
+        self.counters = {}
+        self._lock = Lock()
+
+    def register(self, owner, attribute, name=None):
+        """
+        Time owner.attribute (a class or module function) under name while enabled
+        """
+        name = name or "%s.%s" % (getattr(owner, "__name__", owner), attribute)
+        target = [owner, attribute, name, getattr_static(owner, attribute), None]
+        self.targets.append(target)
+        if self.enabled:
+            self._install(target)
+
+    def _install(self, target):
+        owner, attribute, name, original, _ = target
+        function = original.__func__ if isinstance(original, (staticmethod, classmethod)) else original
+        record = self.record
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+
+        wrapper = type(original)(timed) if isinstance(original, (staticmethod, classmethod)) else timed
+        setattr(owner, attribute, wrapper)
+        target[4] = wrapper
+
+    @staticmethod
+    def _uninstall(target):
+        owner, attribute, _, original, wrapper = target
+        if wrapper is not None and getattr_static(owner, attribute) is wrapper:
+            setattr(owner, attribute, original)
+        target[4] = None
+
+    def enable(self):
+        """
+        Start timing the registered functions
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        for target in self.targets:
+            self._install(target)
+
+    def disable(self):
+        """
+        Stop timing, the original functions are restored. Recorded values are kept
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        for target in self.targets:
+            self._uninstall(target)
+
+    def record(self, name, seconds):
+        """
+        Add one timed call to a stage
+        """
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    def stage(self, name):
+        """
+        Context manager timing a block under name, free while disabled
+        """
+        if not self.enabled:
+            return _null_stage
+        return _Stage(self, name)
+
+    def count(self, name, amount=1):
+        """
+        Increase a named counter while enabled
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """
+        Zero every timer and counter
+        """
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def report(self):
+        """
+        Dictionary of the stage timers and counters
+        """
+        with self._lock:
+            stages = {name: {'calls': calls, 'total_seconds': total, 'mean_seconds': total / calls,
+                             'max_seconds': largest}
+                      for name, (calls, total, largest) in sorted(self.timers.items())}
+            counters = dict(sorted(self.counters.items()))
+        return {'enabled': self.enabled, 'stages': stages, 'counters': counters}
+
+
+# ONE REGISTRY SHARED BY THE GUI AND THE HEADLESS TOOLS, OFF UNTIL ENABLED
+instruments = Instrumentation()
+
+
+@contextmanager
+def profile(output=None, sort="cumulative", limit=30):
+    """
+    Run the body under cProfile. output is a stream for the text report
+    (stderr by default) or a file name, a name ending in .prof gets the raw
+    pstats data for snakeviz/pstats instead.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if isinstance(output, str) and output.endswith(".prof"):
+            profiler.dump_stats(output)
+        else:
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats(sort).print_stats(limit)
+            if isinstance(output, str):
+                with open(output, "w", encoding="utf-8") as stream:
+                    stream.write(text.getvalue())
+            else:
+                (output or sys.stderr).write(text.getvalue())
@@ -0,0 +1,199 @@
+"""
+Precomputed isentropic flow tables with interpolated lookup
+
+A table holds T/Tt, P/Pt, rho/rhot and A/A* for one gamma on a monotone Mach
+grid. Forward lookups (Mach -> ratio) and inverse lookups (ratio -> Mach) are a
+binary search plus a linear interpolation, so solving for Mach costs O(log n)
+instead of an iterative root finding per point. The grid is refined when the
+table is built until every lookup is within the requested tolerance. Inputs
+outside the table (M < 0 or above mach_max, a ratio no Mach number of the
+table gives, A/A* < 1) have no solution and return NaN instead of the
+nearest end of the table.
+
+Tables are cached per (gamma, mach_max, tolerance), use get_table() to share them.
+"""
+import numpy as np
+
+ratio_names = ("temperature_ratio", "pressure_ratio", "density_ratio", "area_ratio")
+
+default_mach_max = 10.0
+default_tolerance = 1e-6
+max_points = 2 ** 22
+
+_table_cache = {}
+
+
+def temperature_ratio(mach, g):
+    """
+    T/Tt
+    """
+    return 1 / (1 + (g - 1) / 2 * np.power(mach, 2))
+
+
+def pressure_ratio(mach, g):
+    """
+    P/Pt
+    """
+    return np.power(temperature_ratio(mach, g), g / (g - 1))
+
+
+def density_ratio(mach, g):
+    """
+    rho/rhot
+    """
+    return np.power(temperature_ratio(mach, g), 1 / (g - 1))
+
+
+def area_ratio(mach, g):
+    """
+    A/A*
+    """
+    with np.errstate(divide='ignore'):
+        return np.power(2 / (g + 1) / temperature_ratio(mach, g), (g + 1) / (2 * (g - 1))) / mach
+
+
+def _sonic_coordinate(area_ratio_value, supersonic):
+    """
+    Monotone coordinate through the sonic point, -1 at M=0, 0 at M=1 and
+    approaching 1 as M grows. Removes the infinite slope of M(A/A*) at M=1
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.sqrt(np.clip(1 - 1 / np.asarray(area_ratio_value, dtype=float), 0, None))
+    return np.where(supersonic, s, -s)
+
+
+class IsentropicTable:
+    """
+    Dense isentropic table for one gamma
+    """
+
+    def __init__(self, g, mach_max=default_mach_max, tolerance=default_tolerance):
+        self.g = float(g)
+        self.mach_max = float(mach_max)
+        self.tolerance = float(tolerance)
+
+        points = 1025
+        while True:
+            self._build(points)
+            error = self.max_error()
+            if error <= self.tolerance:
+                break
+            if points * 2 > max_points:
+                raise ValueError("Tolerance %g not reachable for gamma %g, best was %g" % (tolerance, g, error))
+            points = points * 2 - 1
+        self.error = error
+
+    def _build(self, points):
+        """
+        Fill the columns on a uniform Mach grid
+        """
+        g = self.g
+        self.mach = np.linspace(0, self.mach_max, points)
+        # T, P AND RHO DEPEND ON M^2 ONLY, THE INVERSE IS INTERPOLATED IN M^2 SO IT STAYS SMOOTH AT M=0
+        self.mach_squared = self.mach ** 2
+        self.columns = {
+            "temperature_ratio": temperature_ratio(self.mach, g),
+            "pressure_ratio": pressure_ratio(self.mach, g),
+            "density_ratio": density_ratio(self.mach, g),
+        }
+        # A/A* IS INFINITE AT M=0, STORE A*/A WHICH IS SMOOTH AND BOUNDED
+        self.inverse_area = np.zeros(points)
+        self.inverse_area[1:] = 1 / area_ratio(self.mach[1:], g)
+        self.sonic = _sonic_coordinate(1 / np.where(self.inverse_area > 0, self.inverse_area, np.nan),
+                                       self.mach >= 1)
+        self.sonic[0] = -1.0
+
+        # INCREASING COPIES FOR BINARY SEARCH ON THE DECREASING RATIOS
+        self._reversed = {name: column[::-1] for name, column in self.columns.items()}
+        self._reversed_mach_squared = self.mach_squared[::-1]
+
+    def max_error(self):
+        """
+        Largest forward (ratio) or inverse (Mach) interpolation error at the grid midpoints
+        """
+        g = self.g
+        mid = (self.mach[1:] + self.mach[:-1]) / 2
+        error = 0.0
+        for name, exact in (("temperature_ratio", temperature_ratio), ("pressure_ratio", pressure_ratio),
+                            ("density_ratio", density_ratio)):
+            values = exact(mid, g)
+            error = max(error, np.max(np.abs(self.lookup(name, mid) - values)))
+            error = max(error, np.max(np.abs(self.mach_from(name, values) - mid)))
+        values = area_ratio(mid, g)
+        error = max(error, np.max(np.abs(1 / self.lookup("area_ratio", mid) - 1 / values)))
+        error = max(error, np.max(np.abs(self.mach_from("area_ratio", values, supersonic=mid >= 1) - mid)))
+        return error
+
+    def lookup(self, name, mach):
+        """
+        Interpolated ratio at the given Mach numbers, NaN outside [0, mach_max]
+        """
+        mach = np.asarray(mach, dtype=float)
+        if name == "area_ratio":
+            with np.errstate(divide='ignore'):
+                return 1 / np.interp(mach, self.mach, self.inverse_area, left=np.nan, right=np.nan)
+        return np.interp(mach, self.mach, self.columns[name], left=np.nan, right=np.nan)
+
+    def mach_from(self, name, ratio, supersonic=False):
+        """
+        Interpolated Mach number for the given ratios, NaN for a ratio outside the table.
+        For the area ratio, supersonic (bool or array) selects the branch.
+        """
+        ratio = np.asarray(ratio, dtype=float)
+        if name == "area_ratio":
+            # BELOW 1 THE SONIC COORDINATE WOULD CLIP TO THE THROAT, M=1
+            with np.errstate(invalid='ignore'):
+                coordinate = np.where(ratio >= 1, _sonic_coordinate(ratio, supersonic), np.nan)
+            return np.interp(coordinate, self.sonic, self.mach, left=np.nan, right=np.nan)
+        mach_squared = np.interp(ratio, self._reversed[name], self._reversed_mach_squared, left=np.nan, right=np.nan)
+        return np.sqrt(mach_squared)
+
+    def __repr__(self):
+        return "IsentropicTable(g=%g, points=%d, error=%.2g)" % (self.g, len(self.mach), self.error)
+
+
+def get_table(g, mach_max=default_mach_max, tolerance=default_tolerance):
+    """
+    Cached table for gamma g
+    """
+    key = (float(g), float(mach_max), float(tolerance))
+    table = _table_cache.get(key)
+    if table is None:
+        table = IsentropicTable(g, mach_max, tolerance)
+        _table_cache[key] = table
+    return table
+
+
+def clear_cache():
+    """
+    Drop every cached table
+    """
+    _table_cache.clear()
+
+
+def mach_from_temperature_ratio(ratio, g, tolerance=default_tolerance):
+    """
+    Mach number from T/Tt
+    """
+    return get_table(g, tolerance=tolerance).mach_from("temperature_ratio", ratio)
+
+
+def mach_from_pressure_ratio(ratio, g, tolerance=default_tolerance):
+    """
+    Mach number from P/Pt
+    """
+    return get_table(g, tolerance=tolerance).mach_from("pressure_ratio", ratio)
+
+
+def mach_from_density_ratio(ratio, g, tolerance=default_tolerance):
+    """
+    Mach number from rho/rhot
+    """
+    return get_table(g, tolerance=tolerance).mach_from("density_ratio", ratio)
+
+
+def mach_from_area_ratio(ratio, g, supersonic=False, tolerance=default_tolerance):
+    """
+    Mach number from A/A*, subsonic branch unless supersonic is set
+    """
+    return get_table(g, tolerance=tolerance).mach_from("area_ratio", ratio, supersonic)
@@ -0,0 +1,103 @@
+"""
+Min/max per pixel decimation of large (x, y) data sets for plotting
+
+A DecimatedSeries sorts the points by x once. Drawing a window of the data
+on a canvas w pixels wide then needs only w columns: the points of each pixel
+column are found with a binary search of its edges and reduced to their
+minimum and maximum y with np.minimum.reduceat / np.maximum.reduceat, one
+vertical segment per column. That draws exactly what plotting every point
+would, at a cost that depends on the points in view and not on the canvas.
+
+For fast previews while zooming and panning the series also keeps coarser
+levels of detail, the min/max of consecutive blocks of points. columns()
+with exact=False reads the coarsest level that still has a few blocks per
+pixel, so the first redraw is instant and the exact one can follow when the
+view stops changing.
+"""
+import numpy as np
+
+# POINTS PER BLOCK OF THE COARSER LEVELS OF DETAIL
+default_block_sizes = (64, 4096)
+# BLOCKS PER PIXEL COLUMN A PREVIEW LEVEL MUST KEEP
+preview_blocks_per_pixel = 4
+
+
+class DecimatedSeries:
+    """
+    (x, y) points sorted by x with min/max levels of detail
+    """
+
+    def __init__(self, x, y, block_sizes=default_block_sizes):
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float).reshape(-1), np.asarray(y, dtype=float).reshape(-1))
+        finite = np.isfinite(x) & np.isfinite(y)
+        if not finite.all():
+            x, y = x[finite], y[finite]
+        if len(x) > 1 and not np.all(x[1:] >= x[:-1]):
+            order = np.argsort(x)
+            x, y = x[order], y[order]
+        self.x = np.array(x)
+        self.y = np.array(y)
+        # LEVEL: (X OF THE FIRST POINT OF EACH BLOCK, BLOCK MIN Y, BLOCK MAX Y), LEVEL 0 IS THE POINTS
+        self.levels = [(self.x, self.y, self.y)]
+        for size in block_sizes:
+            if len(self.x) <= size * preview_blocks_per_pixel:
+                break
+            starts = np.arange(0, len(self.x), size)
+            self.levels.append((self.x[starts], np.minimum.reduceat(self.y, starts),
+                                np.maximum.reduceat(self.y, starts)))
+
+    @classmethod
+    def from_chunks(cls, chunks, x, y, block_sizes=default_block_sizes):
+        """
+        Series of the columns x and y of chunk dicts, e.g. the (start, chunk)
+        pairs of sweep.sweep() or the results of its reduce function
+        """
+        xs, ys = [], []
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                chunk = chunk[1]
+            xs.append(np.asarray(chunk[x], dtype=float))
+            ys.append(np.asarray(chunk[y], dtype=float))
+        if not xs:
+            return cls(np.zeros(0), np.zeros(0), block_sizes)
+        return cls(np.concatenate(xs), np.concatenate(ys), block_sizes)
+
+    def __len__(self):
+        return len(self.x)
+
+    def bounds(self):
+        """
+        (x_low, x_high, y_low, y_high) of the data, None when empty
+        """
+        if not len(self.x):
+            return None
+        _, low, high = self.levels[-1]
+        return self.x[0], self.x[-1], low.min(), high.max()
+
+    def columns(self, x_low, x_high, pixels, exact=True):
+        """
+        (pixel column, y min, y max) arrays of the non empty columns when
+        [x_low, x_high] is drawn over pixels columns, and the level of detail
+        used (0 for exact)
+        """
+        level = 0
+        if not exact:
+            for level in range(len(self.levels) - 1, -1, -1):
+                block_x = self.levels[level][0]
+                count = np.searchsorted(block_x, x_high, side='right') - np.searchsorted(block_x, x_low)
+                if count >= pixels * preview_blocks_per_pixel:
+                    break
+        block_x, low, high = self.levels[level]
+        first = np.searchsorted(block_x, x_low)
+        last = np.searchsorted(block_x, x_high, side='right')
+        if last <= first or x_high <= x_low:
+            empty = np.zeros(0)
+            return empty.astype(np.intp), empty, empty, level
+        # FIRST POINT OF EVERY PIXEL COLUMN, EMPTY COLUMNS START WHERE THE NEXT ONE DOES
+        edges = x_low + (x_high - x_low) * np.arange(1, pixels) / pixels
+        starts = np.concatenate([[0], np.searchsorted(block_x[first:last], edges)])
+        counts = np.diff(np.append(starts, last - first))
+        column = np.flatnonzero(counts)
+        index = starts[column]
+        return (column, np.minimum.reduceat(low[first:last], index), np.maximum.reduceat(high[first:last], index),
+                level)
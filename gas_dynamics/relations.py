@@ -0,0 +1,185 @@
+"""
+Declarative equations solved through a per-unknown dispatch table
+
+A Relation is declared once with its variables and one closed form solution
+per variable. Each solution is a function whose parameters name the other
+variables it needs, followed by the gas property and a math namespace:
+
+    Relation("shaft_work", ("w", "t1", "t2"), {
+        "w": lambda t1, t2, cp, m: cp * (t1 - t2),
+        "t1": lambda w, t2, cp, m: w / cp + t2,
+        "t2": lambda w, t1, cp, m: t1 - w / cp,
+    })
+
+The parameter names are resolved to argument positions when the relation is
+built. The scalar solvers are then generated once per relation as plain
+functions, an if-chain on the zero inputs and one solver per explicit
+unknown (the way collections.namedtuple builds its class), so solving a
+point costs what the hand written if-chains did: a few comparisons and one call.
+The same solutions run on floats (m is scalar_math, math.pow etc.) and on
+NumPy arrays (m is array_math, np.power etc.), so the scalar solvers of
+equations.py and the batch solvers of batch.py share one definition.
+
+The unknown is given explicitly by name or position, so a real zero can be
+solved for or given as input. Without it the `== 0` convention of
+equations.py applies: the single zero is the unknown, and with no zero or more
+than one zero the values are returned unchanged.
+"""
+import math
+from inspect import signature
+from types import SimpleNamespace
+
+# MATH USED BY THE SOLUTIONS ON FLOATS, FLUID PROPERTIES FROM THE FLUID TABLES
+scalar_math = SimpleNamespace(
+    pow=math.pow, sqrt=math.sqrt, exp=math.exp, log=math.log,
+    enthalpy=lambda fluid, t: fluid.enthalpy(t),
+    entropy=lambda fluid, t: fluid.entropy(t),
+    temperature_from_enthalpy=lambda fluid, h: fluid.temperature_from_enthalpy(h),
+    temperature_from_entropy=lambda fluid, s: fluid.temperature_from_entropy(s),
+)
+
+_array_math = []
+
+
+def array_math():
+    """
+    Math used by the solutions on NumPy arrays, built on first use so NumPy is
+    only imported by array callers
+    """
+    if not _array_math:
+        import numpy as np
+        from .batch import fluid_interp
+        _array_math.append(SimpleNamespace(
+            pow=np.power, sqrt=np.sqrt, exp=np.exp, log=np.log,
+            enthalpy=lambda fluid, t: fluid_interp(fluid, "enthalpy")(t),
+            entropy=lambda fluid, t: fluid_interp(fluid, "entropy")(t),
+            temperature_from_enthalpy=lambda fluid, h: fluid_interp(fluid, "temperature_from_enthalpy")(h),
+            temperature_from_entropy=lambda fluid, s: fluid_interp(fluid, "temperature_from_entropy")(s),
+        ))
+    return _array_math[0]
+
+
+class Relation:
+    """
+    One equation between variables with a closed form solution for each of them
+    """
+
+    def __init__(self, name, variables, solutions, outputs=None, prepare=None):
+        """
+        variables in call order, solutions by variable name, outputs the return
+        order (call order by default), prepare converts the gas property once
+        per solve (e.g. fluids.get_fluid)
+        """
+        self.name = name
+        self.variables = tuple(variables)
+        self.outputs = tuple(outputs or variables)
+        self.prepare = prepare
+        self.index = {variable: i for i, variable in enumerate(self.variables)}
+        missing = [variable for variable in self.variables if variable not in solutions]
+        if missing:
+            raise ValueError("Relation %s has no solution for %s" % (name, ", ".join(missing)))
+        # DISPATCH TABLE: UNKNOWN POSITION -> (SOLUTION, POSITIONS OF ITS ARGUMENTS)
+        dispatch = []
+        for variable in self.variables:
+            function = solutions[variable]
+            parameters = list(signature(function).parameters)[:-2]
+            unknown = [parameter for parameter in parameters if parameter not in self.index]
+            if unknown or variable in parameters:
+                raise ValueError("Solution of %s for %s uses %s" % (name, variable, ", ".join(unknown or [variable])))
+            dispatch.append((function, tuple(self.index[parameter] for parameter in parameters)))
+        self.dispatch = tuple(dispatch)
+        self._output_positions = tuple(self.index[name] for name in self.outputs)
+        self.solve_zero, self._solvers = self._compile()
+
+    def _compile(self):
+        """
+        Generate the scalar solvers: solve_zero(*values, gas_property) with the
+        zero is unknown rule and one solver(*values, gas_property) per unknown,
+        all returning the values in output order
+        """
+        for variable in self.variables:
+            if not variable.isidentifier() or variable.startswith("_"):
+                raise ValueError("Variable %r of %s is not a plain name" % (variable, self.name))
+        namespace = {"_math": scalar_math, "_prepare": self.prepare}
+        arguments = ", ".join(self.variables)
+        result = "(%s%s)" % (", ".join(self.outputs), "," if len(self.outputs) == 1 else "")
+        prepare = ["_property = _prepare(_property)"] if self.prepare is not None else []
+
+        def call(position):
+            function, positions = self.dispatch[position]
+            namespace["_solution%d" % position] = function
+            return "_solution%d(%s_property, _math)" % (position, "".join(self.variables[i] + ", " for i in positions))
+
+        lines = ["def solve_zero(%s, _property):" % arguments]
+        for position, variable in enumerate(self.variables):
+            # A ZERO AFTER THIS ONE LEAVES THE VALUES UNCHANGED, THE ONES BEFORE ARE KNOWN TO BE NONZERO
+            lines.append("    %s %s == 0:" % ("elif" if position else "if", variable))
+            lines.append("        if %s:" % (" and ".join(other + " != 0" for other in self.variables[position + 1:])
+                                            or "True"))
+            lines.extend("            " + line for line in prepare)
+            lines.append("            %s = %s" % (variable, call(position)))
+        lines.append("    return " + result)
+        for position, variable in enumerate(self.variables):
+            lines.append("def solve_%d(%s, _property):" % (position, arguments))
+            lines.extend("    " + line for line in prepare)
+            lines.append("    %s = %s" % (variable, call(position)))
+            lines.append("    return " + result)
+        exec("\n".join(lines), namespace)
+        return namespace["solve_zero"], tuple(namespace["solve_%d" % i] for i in range(len(self.variables)))
+
+    def position(self, unknown):
+        """
+        Position of an unknown given by name or position
+        """
+        if isinstance(unknown, str):
+            try:
+                return self.index[unknown]
+            except KeyError:
+                raise ValueError("%s has no variable %r" % (self.name, unknown)) from None
+        return unknown
+
+    def solve(self, values, gas_property, unknown=None):
+        """
+        Solve one point, values in call order. Returns the values in output order
+        """
+        if unknown is None:
+            return self.solve_zero(*values, gas_property)
+        return self._solvers[self.position(unknown)](*values, gas_property)
+
+    def solve_arrays(self, values, gas_property, unknown=None):
+        """
+        Solve arrays of points, values in call order. unknown is a name or
+        position solving every row for that variable, or one boolean mask per
+        variable (see batch.unknown_masks); rows with exactly one unknown are
+        solved, each group of rows only with the solution for its unknown,
+        NaN where it has none. Returns the arrays in output order
+        """
+        import numpy as np
+        from .batch import _only_unknown, unknown_masks
+        arrays = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in values])
+        values = [np.array(array) for array in arrays]
+        if isinstance(unknown, (str, int)):
+            position = self.position(unknown)
+            masks = [np.full(values[0].shape, i == position) for i in range(len(values))]
+        else:
+            masks = unknown_masks(values, unknown)
+        if self.prepare is not None:
+            gas_property = self.prepare(gas_property)
+            rows_property = None
+        else:
+            gas_property = np.broadcast_to(np.asarray(gas_property, dtype=float), values[0].shape)
+            rows_property = gas_property
+        math_arrays = array_math()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for position, (function, arguments) in enumerate(self.dispatch):
+                rows = _only_unknown(masks, position)
+                if not rows.any():
+                    continue
+                row_property = gas_property if rows_property is None else rows_property[rows]
+                solved = function(*[values[i][rows] for i in arguments], row_property, math_arrays)
+                # AN INFINITE RESULT (E.G. A DIVISION BY A REAL ZERO INPUT) IS NO SOLUTION, AS IN solve()
+                values[position][rows] = np.where(np.isfinite(solved), solved, np.nan)
+        return tuple(values[position] for position in self._output_positions)
+
+    def __repr__(self):
+        return "Relation(%r, %s)" % (self.name, ", ".join(self.variables))
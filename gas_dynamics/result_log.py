@@ -0,0 +1,231 @@
+# !/usr/bin/env python3
+# coding: utf-8
+"""
+Append-only binary log of solved points, one file per equation
+
+Layout of a log file:
+    8 bytes   magic b"GDLOG\\x00\\x00\\x01"
+    4 bytes   little-endian uint32, offset of the first record
+    JSON      header: equation, record fields, gas properties at creation,
+              padded with spaces up to the record offset (a multiple of 64)
+    records   fixed size, no padding: time (f8), every variable in SI units (f8),
+              the unit ID shown for every variable (u1), n (f8), Cp (f8)
+
+Records can be read with numpy.memmap without any parsing, see records().
+A truncated last record (crash while writing) is ignored.
+
+Example:
+    python -m gas_dynamics.result_log export ~/.gas_dynamics_calculator/ideal_compression.gdlog > points.csv
+"""
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import time
+
+from . import equations
+from .units import default_cp, default_n, unit_registry
+
+magic = b"GDLOG\x00\x00\x01"
+header_alignment = 64
+default_directory = os.path.join(os.path.expanduser("~"), ".gas_dynamics_calculator")
+file_extension = ".gdlog"
+
+
+def log_path(equation, directory=default_directory):
+    """
+    Path of the log of an equation
+    """
+    return os.path.join(directory, equation + file_extension)
+
+
+def read_header(path):
+    """
+    (header dict, record offset) of a log file
+    """
+    with open(path, "rb") as stream:
+        start = stream.read(12)
+        if len(start) < 12 or start[:8] != magic:
+            raise ValueError("%s is not a result log" % path)
+        offset = struct.unpack("<I", start[8:])[0]
+        header = json.loads(stream.read(offset - 12).decode("utf-8"))
+    return header, offset
+
+
+class ResultLog:
+    """
+    Append-only log of one equation
+    """
+
+    def __init__(self, path, equation, properties=None):
+        self.path = path
+        self.equation = equation
+        self.variables = equations.equation_table[equation].inputs
+        self.fields = (("time", "d"),) + tuple((name, "d") for name in self.variables) \
+            + tuple((name + "_unit", "B") for name in self.variables) + (("n", "d"), ("Cp", "d"))
+        self.record_struct = struct.Struct("<" + "".join(code for _, code in self.fields))
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.header, self.offset = read_header(path)
+            if [list(field) for field in self.fields] != self.header["fields"]:
+                raise ValueError("Record layout of %s does not match %s" % (path, equation))
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            properties = properties or {'n': default_n, 'Cp': default_cp}
+            self.header = {
+                "equation": equation,
+                "fields": [list(field) for field in self.fields],
+                "record_size": self.record_struct.size,
+                "properties": {'n': properties['n'], 'Cp': properties['Cp']},
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            text = json.dumps(self.header).encode("utf-8")
+            self.offset = -(-(12 + len(text)) // header_alignment) * header_alignment
+            with open(path, "wb") as stream:
+                stream.write(magic + struct.pack("<I", self.offset) + text.ljust(self.offset - 12))
+        self._drop_partial_record()
+        self._stream = open(path, "ab")
+
+    def _drop_partial_record(self):
+        """
+        Cut a record left incomplete by an interrupted write
+        """
+        size = os.path.getsize(self.path)
+        extra = (size - self.offset) % self.record_struct.size
+        if extra:
+            with open(self.path, "r+b") as stream:
+                stream.truncate(size - extra)
+
+    def __len__(self):
+        """
+        Number of complete records
+        """
+        self._stream.flush()
+        return (os.path.getsize(self.path) - self.offset) // self.record_struct.size
+
+    def append(self, values, unit_ids, properties):
+        """
+        Log one solved point, values in SI units in equation_table input order
+        """
+        self._stream.write(self.record_struct.pack(time.time(), *values, *unit_ids,
+                                                   properties['n'], properties['Cp']))
+        self._stream.flush()
+
+    def append_rows(self, rows, unit_ids, properties):
+        """
+        Log many solved points given as rows of SI values, with one write
+        """
+        now = time.time()
+        pack = self.record_struct.pack
+        self._stream.write(b"".join(pack(now, *row, *unit_ids, properties['n'], properties['Cp']) for row in rows))
+        self._stream.flush()
+
+    def append_columns(self, columns, unit_ids, properties):
+        """
+        Log many solved points at once, columns is one SI array per variable.
+        unit_ids holds one ID (or an array) per variable.
+        """
+        import numpy as np
+        columns = [np.asarray(column, dtype=float) for column in columns]
+        records = np.zeros(len(columns[0]) if columns else 0, dtype=self.record_dtype())
+        records["time"] = time.time()
+        for name, column, unit_id in zip(self.variables, columns, unit_ids):
+            records[name] = column
+            records[name + "_unit"] = unit_id
+        records["n"] = properties['n']
+        records["Cp"] = properties['Cp']
+        self._stream.write(records.tobytes())
+        self._stream.flush()
+
+    def record_dtype(self):
+        """
+        NumPy structured dtype of a record
+        """
+        import numpy as np
+        return np.dtype([(name, "<f8" if code == "d" else "u1") for name, code in self.fields])
+
+    def records(self):
+        """
+        Read-only NumPy memmap over every record, no data is parsed or copied
+        """
+        import numpy as np
+        count = len(self)
+        if count == 0:
+            return np.zeros(0, dtype=self.record_dtype())
+        return np.memmap(self.path, dtype=self.record_dtype(), mode="r", offset=self.offset, shape=(count,))
+
+    def iter_records(self):
+        """
+        Records as tuples, without NumPy
+        """
+        self._stream.flush()
+        with open(self.path, "rb") as stream:
+            stream.seek(self.offset)
+            size = self.record_struct.size
+            while True:
+                data = stream.read(size * 4096)
+                data = data[:len(data) - len(data) % size]
+                if not data:
+                    return
+                yield from self.record_struct.iter_unpack(data)
+
+    def display_columns(self):
+        """
+        Every variable converted back to the unit it was shown in, one array per variable
+        """
+        records = self.records()
+        quantities = equations.equation_table[self.equation].quantities
+        return [unit_registry[quantity].array_from_si(records[name], records[name + "_unit"])
+                for name, quantity in zip(self.variables, quantities)]
+
+    def export_csv(self, stream):
+        """
+        Write every record as CSV, values in SI units
+        """
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow([name for name, _ in self.fields])
+        for record in self.iter_records():
+            writer.writerow(record)
+
+    def close(self):
+        """
+        Close the append stream
+        """
+        self._stream.close()
+
+
+def open_log(path):
+    """
+    Open an existing log, reading the equation from its header
+    """
+    header, _ = read_header(path)
+    return ResultLog(path, header["equation"])
+
+
+def main(argv=None):
+    """
+    Inspect or export a result log
+    """
+    parser = argparse.ArgumentParser(description="Inspect or export a result log")
+    parser.add_argument("command", choices=("info", "export"))
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    log = open_log(args.path)
+    try:
+        if args.command == "info":
+            info = dict(log.header, records=len(log))
+            print(json.dumps(info, indent=2))
+        else:
+            log.export_csv(sys.stdout)
+    finally:
+        log.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,375 @@
+# !/usr/bin/env python3
+# coding: utf-8
+"""
+Local JSON service around the solvers, line delimited JSON over TCP.
+
+Every line sent by a client is one request, every line sent back is the
+answer to one request, in the same order. A connection stays open for as
+many requests as the client wants (keep-alive) and requests may be pipelined.
+
+    {"id": 1, "equation": "ideal_compression", "inputs": {"p1": 1, "p2": 2, "t1": 300},
+     "units": {"p1": "bar", "p2": "bar"}}
+    -> {"id": 1, "result": {"p1": 1.0, "p2": 2.0, "t1": 300.0, "t2": 365.7...}}
+    -> {"id": 1, "error": "More than One Input is not defined"}
+
+A missing or null input is the unknown, "property" overrides n/Cp/fluid and
+{"op": "stats"} returns the server counters. Requests arriving within a short
+window are grouped per (equation, property) into micro-batches and solved in
+one pass of the batch solvers (row by row if NumPy is not installed).
+Backpressure: a connection stops being read while it has max_pending
+unanswered requests, and the batch queue is bounded, so a fast client is
+slowed down to the speed of the solver instead of filling memory. A request
+line longer than max_line bytes is discarded and answered with an error.
+
+The server binds to localhost by default and needs no network access:
+    python -m gas_dynamics.server --port 8765
+"""
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import time
+from threading import Thread
+
+from . import equations
+from .cli import batch_available, fill_blank_values, solve_chunk_batch, solve_chunk_scalar, solve_error
+from .fluids import compositions, default_fluid
+from .units import default_cp, default_n, unit_registry
+
+default_host = "127.0.0.1"
+default_port = 8765
+default_window = 0.002  # s
+default_max_batch = 4096
+default_max_pending = 256  # PER CONNECTION
+default_queue_size = 16384
+default_max_line = 65536  # BYTES PER REQUEST LINE
+
+
+class RequestError(Exception):
+    """
+    A request that can not be solved, its message is sent back to the client
+    """
+    pass
+
+
+def parse_request(request):
+    """
+    (equation, property, unit ids, SI row) of a request, RequestError if it is malformed
+    """
+    try:
+        info = equations.equation_table[request["equation"]]
+    except (KeyError, TypeError):
+        raise RequestError("Unknown equation %r" % (request.get("equation"),)) from None
+    inputs = request.get("inputs") or {}
+    if isinstance(inputs, list):
+        if len(inputs) != len(info.inputs):
+            raise RequestError("Expected %d inputs, got %d" % (len(info.inputs), len(inputs)))
+        inputs = dict(zip(info.inputs, inputs))
+    elif not isinstance(inputs, dict):
+        raise RequestError("inputs must be an object or a list")
+    units = request.get("units") or {}
+    if not isinstance(units, dict):
+        raise RequestError("units must be an object")
+    gas_property = request.get("property")
+    if gas_property is None:
+        gas_property = {"n": default_n, "Cp": default_cp, "fluid": default_fluid}[info.gas_property]
+    elif info.gas_property == "fluid":
+        if not isinstance(gas_property, str) or gas_property not in compositions:
+            raise RequestError("Unknown fluid %r" % (gas_property,))
+    elif isinstance(gas_property, bool) or not isinstance(gas_property, (int, float)) or not gas_property > 0:
+        raise RequestError("property must be a positive number")
+    else:
+        gas_property = float(gas_property)
+    unit_ids = []
+    row = []
+    try:
+        for name, quantity_name in zip(info.inputs, info.quantities):
+            quantity = unit_registry[quantity_name]
+            unit_id = quantity.unit_id(units.get(name, quantity.units[0]))
+            value = inputs.get(name)
+            unit_ids.append(unit_id)
+            row.append(None if value is None else quantity.to_si(float(value), unit_id))
+    except (TypeError, ValueError) as error:
+        raise RequestError(str(error)) from None
+    return request["equation"], gas_property, unit_ids, fill_blank_values(info, row)
+
+
+def format_result(info, row, unit_ids):
+    """
+    Solved SI row as a dict in the requested units
+    """
+    result = {}
+    for name, quantity_name, unit_id, value in zip(info.inputs, info.quantities, unit_ids, row):
+        result[name] = None if value is None else unit_registry[quantity_name].from_si(value, unit_id)
+    return result
+
+
+class MicroBatcher:
+    """
+    Collects requests for a short window and solves them per (equation, property) group
+    """
+
+    def __init__(self, window=default_window, max_batch=default_max_batch, queue_size=default_queue_size,
+                 batch=True):
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.batch = batch and batch_available()
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.solve_seconds = 0.0
+
+    async def submit(self, equation, gas_property, unit_ids, row):
+        """
+        Queue one parsed request and wait for its answer (result dict or error string)
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((equation, gas_property, unit_ids, row, future))
+        return await future
+
+    async def run(self):
+        """
+        Batching loop, runs until cancelled
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # TAKE WHATEVER ELSE IS ALREADY WAITING WITHOUT SLEEPING AGAIN
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            self.solve(items)
+
+    def solve(self, items):
+        """
+        Solve a list of queued requests, one solver pass per (equation, property) group
+        """
+        start = time.perf_counter()
+        groups = {}
+        for item in items:
+            try:
+                groups.setdefault((item[0], item[1]), []).append(item)
+            except TypeError:
+                if not item[4].done():
+                    item[4].set_result("Invalid property %r" % (item[1],))
+        for (equation, gas_property), group in groups.items():
+            info = equations.equation_table[equation]
+            values = [item[3] for item in group]
+            try:
+                if self.batch:
+                    solved = solve_chunk_batch(info, values, gas_property)
+                else:
+                    solved = solve_chunk_scalar(info, values, gas_property)
+                answers = [solve_error(item[3], row, info.unknowns) or format_result(info, row, item[2])
+                           for item, row in zip(group, solved)]
+            except (ValueError, ZeroDivisionError) as error:
+                answers = [str(error)] * len(group)
+            except Exception as error:
+                # ONE BROKEN GROUP MUST NOT STOP THE BATCHING LOOP FOR EVERY OTHER CLIENT
+                answers = ["Internal error: %s" % error] * len(group)
+            for item, answer in zip(group, answers):
+                if not item[4].done():
+                    item[4].set_result(answer)
+        self.requests += len(items)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(items))
+        self.solve_seconds += time.perf_counter() - start
+
+    def stats(self):
+        """
+        Dictionary of the batching counters
+        """
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch': self.requests / self.batches if self.batches else 0,
+            'largest_batch': self.largest_batch,
+            'solve_seconds': self.solve_seconds,
+            'queued': self.queue.qsize(),
+        }
+
+
+class SolverServer:
+    """
+    asyncio TCP server answering line delimited JSON requests through a MicroBatcher
+    """
+
+    def __init__(self, host=default_host, port=default_port, window=default_window, max_batch=default_max_batch,
+                 max_pending=default_max_pending, batch=True, max_line=default_max_line):
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.max_line = max_line
+        self.batcher_options = {'window': window, 'max_batch': max_batch, 'batch': batch}
+        self.batcher = None
+        self.connections = 0
+        self._server = None
+        self._batch_task = None
+
+    async def start(self):
+        """
+        Start listening, the port is updated if 0 was given
+        """
+        self.batcher = MicroBatcher(**self.batcher_options)
+        self._batch_task = asyncio.ensure_future(self.batcher.run())
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                                  limit=self.max_line)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stop listening and cancel the batching loop
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        self._batch_task.cancel()
+        try:
+            await self._batch_task
+        except asyncio.CancelledError:
+            pass
+
+    async def serve_forever(self):
+        """
+        Start and serve until cancelled
+        """
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def answer(self, line):
+        """
+        Answer dict of one request line
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return {'error': "Invalid JSON: %s" % error}
+        if not isinstance(request, dict):
+            return {'error': "A request must be a JSON object"}
+        answer = {'id': request.get('id')}
+        if request.get('op') == 'stats':
+            answer['result'] = dict(self.batcher.stats(), connections=self.connections)
+            return answer
+        try:
+            result = await self.batcher.submit(*parse_request(request))
+        except RequestError as error:
+            result = str(error)
+        if isinstance(result, str):
+            answer['error'] = result
+        else:
+            answer['result'] = result
+        return answer
+
+    async def handle_connection(self, reader, writer):
+        """
+        Read requests of one connection while writing the answers back in order
+        """
+        self.connections += 1
+        pending = asyncio.Queue(maxsize=self.max_pending)
+
+        async def write_answers():
+            while True:
+                task = await pending.get()
+                if task is None:
+                    return
+                writer.write(json.dumps(await task).encode() + b"\n")
+                if pending.empty():
+                    await writer.drain()
+
+        writer_task = asyncio.ensure_future(write_answers())
+        # TRUE WHILE THE REST OF A TOO LONG LINE IS BEING DISCARDED
+        skipping = False
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:
+                    # LAST LINE WITHOUT A NEWLINE, EMPTY AT THE END OF THE STREAM
+                    line = error.partial
+                except asyncio.LimitOverrunError as error:
+                    # DROP WHAT IS BUFFERED OF THE LINE, ITS END IS DROPPED BY THE NEXT READ
+                    await reader.readexactly(error.consumed)
+                    if not skipping:
+                        skipping = True
+                        answer = asyncio.get_running_loop().create_future()
+                        answer.set_result({'id': None, 'error': "Request longer than %d bytes" % self.max_line})
+                        await pending.put(answer)
+                    continue
+                if skipping:
+                    skipping = False
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # BLOCKS WHILE MAX_PENDING ANSWERS ARE OUTSTANDING, THE CLIENT IS NOT READ MEANWHILE
+                await pending.put(asyncio.ensure_future(self.answer(line)))
+            await pending.put(None)
+            await writer_task
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # THE WRITER NEVER OUTLIVES ITS CONNECTION, WHATEVER STOPPED THE READING
+            writer_task.cancel()
+            await asyncio.gather(writer_task, return_exceptions=True)
+            self.connections -= 1
+            writer.close()
+
+
+def solve_remote(requests, host=default_host, port=default_port, timeout=30):
+    """
+    Send request dicts over one connection, pipelined, and return the answers in
+    order. Blocking client for tools that do not run an event loop.
+    """
+    answers = []
+    with socket.create_connection((host, port), timeout=timeout) as connection:
+        payload = b"".join(json.dumps(request).encode() + b"\n" for request in requests)
+        # SEND FROM A THREAD, THE SERVER STOPS READING UNTIL ITS ANSWERS ARE READ HERE
+        sender = Thread(target=connection.sendall, args=(payload,), daemon=True)
+        sender.start()
+        stream = connection.makefile("rb")
+        for _ in requests:
+            answers.append(json.loads(stream.readline()))
+        sender.join()
+    return answers
+
+
+def main(argv=None):
+    """
+    Entry point of the solver service
+    """
+    parser = argparse.ArgumentParser(description="Serve the gas dynamics solvers as line delimited JSON over TCP")
+    parser.add_argument("--host", default=default_host, help="address to bind, localhost by default")
+    parser.add_argument("--port", type=int, default=default_port)
+    parser.add_argument("--window", type=float, default=default_window * 1000,
+                        help="micro-batch window in milliseconds")
+    parser.add_argument("--max-batch", type=int, default=default_max_batch)
+    parser.add_argument("--max-pending", type=int, default=default_max_pending,
+                        help="unanswered requests per connection before it stops being read")
+    parser.add_argument("--scalar", action="store_true", help="solve row by row even if NumPy is available")
+    args = parser.parse_args(argv)
+
+    server = SolverServer(args.host, args.port, args.window / 1000, args.max_batch, args.max_pending,
+                          batch=not args.scalar)
+    sys.stderr.write("Serving gas dynamics solvers on %s:%d\n" % (args.host, args.port))
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
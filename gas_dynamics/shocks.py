@@ -0,0 +1,260 @@
+"""
+Normal and oblique shock relations on arrays
+
+normal_shock() gives M2, p2/p1, T2/T1 and pt2/pt1 behind a normal shock.
+oblique_shock_angle() solves the theta-beta-M relation for the shock angle of
+whole arrays of (M1, theta, gamma) at once. The cubic in tan(beta) has a closed
+form solution, so there is no iteration per point: the weak and the strong root
+are picked by the branch of the trigonometric solution. Deflections above the
+maximum (detached shock) and subsonic M1 give NaN.
+
+ThetaBetaMachTable precomputes beta on a (M1, theta/theta_max) grid for one
+gamma and answers lookups by bilinear interpolation, the grid is refined until
+the lookups are within the requested tolerance. Tables are cached per
+(gamma, mach_max, tolerance), use get_table() to share them. With NumPy the
+closed form costs about as much as the table lookup, so the table is optional.
+
+Angles are in radians here, oblique_shock() takes and returns degrees like the
+GUI and equations.oblique_shock.
+"""
+import numpy as np
+
+from .batch import unknown_masks
+
+default_mach_max = 10.0
+default_tolerance = 1e-4  # RADIANS
+max_points = 2 ** 12
+
+_table_cache = {}
+
+
+def normal_shock(m1, g):
+    """
+    (M2, p2/p1, T2/T1, pt2/pt1) behind a normal shock, NaN where M1 < 1
+    """
+    m1 = np.asarray(m1, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m_sq = np.where(m1 >= 1, m1 * m1, np.nan)
+        p_ratio = 1 + 2 * g / (g + 1) * (m_sq - 1)
+        rho_ratio = (g + 1) * m_sq / ((g - 1) * m_sq + 2)
+        t_ratio = p_ratio / rho_ratio
+        m2 = np.sqrt((1 + (g - 1) / 2 * m_sq) / (g * m_sq - (g - 1) / 2))
+        pt_ratio = np.power(rho_ratio, g / (g - 1)) * np.power(1 / p_ratio, 1 / (g - 1))
+    return m2, p_ratio, t_ratio, pt_ratio
+
+
+def deflection_angle(m1, beta, g):
+    """
+    Deflection theta of a shock at angle beta, the explicit side of theta-beta-M
+    """
+    m_sq = np.power(m1, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.arctan(2 / np.tan(beta) * (m_sq * np.power(np.sin(beta), 2) - 1)
+                         / (m_sq * (g + np.cos(2 * beta)) + 2))
+
+
+def max_deflection_shock_angle(m1, g):
+    """
+    Shock angle at the maximum deflection, where the weak and strong solutions meet
+    """
+    m_sq = np.power(m1, 2)
+    with np.errstate(invalid='ignore'):
+        sin_sq = ((g + 1) * m_sq - 4 + np.sqrt((g + 1) * ((g + 1) * m_sq * m_sq + 8 * (g - 1) * m_sq + 16))) \
+            / (4 * g * m_sq)
+        return np.arcsin(np.sqrt(sin_sq))
+
+
+def max_deflection(m1, g):
+    """
+    Largest deflection for which the shock stays attached
+    """
+    return deflection_angle(m1, max_deflection_shock_angle(m1, g), g)
+
+
+def oblique_shock_angle(m1, theta, g, strong=False):
+    """
+    Shock angle for the deflection theta from the closed form solution of the
+    theta-beta-M cubic, on arrays. Weak solution unless strong is set, a zero
+    deflection gives the Mach angle (weak) or 90 degrees (strong). The weak
+    root is taken from the strong one, so it keeps full precision as theta -> 0.
+    """
+    m1, theta, g = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in (m1, theta, g)])
+    m_sq = m1 * m1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tan_theta = np.tan(theta)
+        a = 1 + (g - 1) / 2 * m_sq
+        lambda_sq = np.power(m_sq - 1, 2) - 3 * a * (1 + (g + 1) / 2 * m_sq) * np.power(tan_theta, 2)
+        # DETACHED SHOCK OR SUBSONIC FLOW HAVE NO REAL ROOT
+        lambda_ = np.sqrt(np.where((lambda_sq >= 0) & (m1 > 1), lambda_sq, np.nan))
+        chi = (np.power(m_sq - 1, 3) - 9 * a * (a + (g + 1) / 4 * m_sq * m_sq) * np.power(tan_theta, 2)) \
+            / np.power(lambda_, 3)
+        # CHI BELOW -1 IS JUST ABOVE THE MAXIMUM DEFLECTION, WHERE LAMBDA IS STILL REAL
+        chi = np.clip(np.where(chi >= -1 - 1e-12, chi, np.nan), -1, 1)
+        b = 1 + (g + 1) / 2 * m_sq
+        # STRONG ROOT OF THE CUBIC a T t^3 - (M^2 - 1) t^2 + b T t + 1 = 0 IN t = tan(beta), T = tan(theta)
+        tan_beta = (m_sq - 1 + 2 * lambda_ * np.cos(np.arccos(chi) / 3)) / (3 * a * tan_theta)
+        if not strong:
+            # THE CLOSED FORM OF THE WEAK ROOT CANCELS AS THETA -> 0, DEFLATE THE CUBIC BY THE STRONG ROOT INSTEAD:
+            # THE OTHER TWO ROOTS HAVE PRODUCT p AND SUM (b / a - p) / STRONG, BOTH FREE OF CANCELLATION
+            product = -1 / (a * tan_theta * tan_beta)
+            total = (b / a - product) / tan_beta
+            tan_beta = (total + np.sqrt(total * total - 4 * product)) / 2
+        beta = np.arctan(tan_beta)
+        zero = (theta == 0) & (m1 > 1)
+        beta = np.where(zero, np.pi / 2 if strong else np.arcsin(1 / np.where(zero, m1, 1)), beta)
+    return beta
+
+
+def oblique_shock_relations(m1, theta, beta, g):
+    """
+    (M2, p2/p1, T2/T1, pt2/pt1) behind an oblique shock at angle beta, angles in radians
+    """
+    m2_normal, p_ratio, t_ratio, pt_ratio = normal_shock(np.asarray(m1) * np.sin(beta), g)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m2 = m2_normal / np.sin(beta - theta)
+    return m2, p_ratio, t_ratio, pt_ratio
+
+
+class ThetaBetaMachTable:
+    """
+    Weak and strong shock angles for one gamma on a (M1, theta/theta_max) grid
+    """
+
+    def __init__(self, g, mach_max=default_mach_max, tolerance=default_tolerance):
+        self.g = float(g)
+        self.mach_max = float(mach_max)
+        self.tolerance = float(tolerance)
+
+        points = 65
+        while True:
+            self._build(points)
+            error = self.max_error()
+            if error <= self.tolerance:
+                break
+            if points * 2 > max_points:
+                raise ValueError("Tolerance %g not reachable for gamma %g, best was %g" % (tolerance, g, error))
+            points = points * 2 - 1
+        self.error = error
+
+    def _build(self, points):
+        """
+        Fill the weak and strong beta grids, uniform in sqrt(M1^2 - 1) and in the
+        deflection coordinate. The Mach angle has an infinite slope in M1 at M1 = 1
+        but not in sqrt(M1^2 - 1)
+        """
+        g = self.g
+        self.mach = np.sqrt(1 + np.power(np.linspace(0, np.sqrt(self.mach_max ** 2 - 1), points), 2))
+        self.fraction = np.linspace(0, 1, points)
+        mach, theta = self._grid_theta(self.mach[:, None], self.fraction[None, :])
+        self.weak = oblique_shock_angle(mach, theta, g)
+        self.strong = oblique_shock_angle(mach, theta, g, strong=True)
+        # THE ROOTS MEET AT THETA_MAX AND M1 = 1, FILL THE POINTS THE CLOSED FORM LOSES TO ROUNDING
+        beta_max = max_deflection_shock_angle(self.mach, g)
+        for column in (self.weak, self.strong):
+            column[:, -1] = beta_max
+            column[0, :] = np.pi / 2
+
+    def _grid_theta(self, mach, fraction):
+        """
+        Deflection at a grid coordinate. beta goes like sqrt(theta_max - theta) at
+        the top, so the coordinate is squared there to keep beta smooth
+        """
+        return mach, np.nan_to_num(max_deflection(mach, self.g)) * (1 - np.power(1 - fraction, 2))
+
+    def _coordinates(self, m1, theta):
+        """
+        Fractional grid indices of (M1, theta), NaN outside the table or detached
+        """
+        m1 = np.asarray(m1, dtype=float)
+        theta = np.asarray(theta, dtype=float)
+        theta_max = max_deflection(m1, self.g)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = 1 - np.sqrt(1 - theta / theta_max)
+        fraction = np.where(theta == 0, 0.0, fraction)
+        inside = (m1 >= 1) & (m1 <= self.mach_max) & (theta >= 0) & (fraction <= 1)
+        step = len(self.mach) - 1
+        with np.errstate(invalid='ignore'):
+            i = np.where(inside, np.sqrt((m1 * m1 - 1) / (self.mach_max ** 2 - 1)) * step, np.nan)
+        j = np.where(inside, fraction * step, np.nan)
+        return i, j
+
+    def lookup(self, m1, theta, strong=False):
+        """
+        Bilinear interpolated shock angle, NaN for a detached shock or M1 outside the table
+        """
+        i, j = self._coordinates(m1, theta)
+        valid = ~np.isnan(i)
+        step = len(self.mach) - 1
+        i0 = np.clip(np.floor(np.where(valid, i, 0)).astype(int), 0, step - 1)
+        j0 = np.clip(np.floor(np.where(valid, j, 0)).astype(int), 0, step - 1)
+        di = np.where(valid, i, 0) - i0
+        dj = np.where(valid, j, 0) - j0
+        column = self.strong if strong else self.weak
+        beta = (column[i0, j0] * (1 - di) * (1 - dj) + column[i0 + 1, j0] * di * (1 - dj)
+                + column[i0, j0 + 1] * (1 - di) * dj + column[i0 + 1, j0 + 1] * di * dj)
+        return np.where(valid, beta, np.nan)
+
+    def max_error(self):
+        """
+        Largest interpolation error of beta at the cell centres, on the cell
+        edges and close to theta = 0 and theta_max
+        """
+        mid_mach = np.sqrt((np.power(self.mach[1:], 2) + np.power(self.mach[:-1], 2)) / 2)
+        mid_fraction = (self.fraction[1:] + self.fraction[:-1]) / 2
+        sample_mach = np.concatenate([mid_mach, self.mach[1:]])
+        sample_fraction = np.concatenate([mid_fraction, self.fraction, [1e-9, 1e-6, 1 - 1e-6, 1 - 1e-9]])
+        mach, theta = self._grid_theta(sample_mach[:, None], sample_fraction[None, :])
+        mach = np.broadcast_to(mach, theta.shape)
+        error = 0.0
+        for strong in (False, True):
+            exact = oblique_shock_angle(mach, theta, self.g, strong)
+            error = max(error, np.nanmax(np.abs(self.lookup(mach, theta, strong) - exact)))
+        return error
+
+    def __repr__(self):
+        return "ThetaBetaMachTable(g=%g, points=%d, error=%.2g)" % (self.g, len(self.mach), self.error)
+
+
+def get_table(g, mach_max=default_mach_max, tolerance=default_tolerance):
+    """
+    Cached theta-beta-M table for gamma g
+    """
+    key = (float(g), float(mach_max), float(tolerance))
+    table = _table_cache.get(key)
+    if table is None:
+        table = ThetaBetaMachTable(g, mach_max, tolerance)
+        _table_cache[key] = table
+    return table
+
+
+def clear_cache():
+    """
+    Drop every cached table
+    """
+    _table_cache.clear()
+
+
+def oblique_shock(m1, theta, beta, m2, p_ratio, t_ratio, pt_ratio, g, unknown=None, strong=False, table=None):
+    """
+    Solve Oblique Shock on arrays, same variables as equations.oblique_shock with
+    angles in degrees. M1 and theta are the inputs, a deflection of 0 (or a
+    blank one) gives the normal shock, so only a blank M1 leaves a row unsolved.
+    Rows that are detached or subsonic are NaN. With a ThetaBetaMachTable beta
+    is interpolated instead of solved.
+    """
+    values = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in
+                                   (m1, theta, beta, m2, p_ratio, t_ratio, pt_ratio, g)])
+    values, g = [np.array(value) for value in values[:-1]], values[-1]
+    masks = unknown_masks(values, unknown)
+    solve = ~masks[0]
+    m1, theta = values[0], np.radians(np.where(masks[1], 0, values[1]))
+    if table is not None:
+        beta = table.lookup(m1, theta, strong)
+    else:
+        beta = oblique_shock_angle(m1, theta, g, strong)
+    beta = np.where(theta == 0, np.pi / 2, beta)
+    beta = np.where(m1 > 1, beta, np.nan)
+    results = (np.degrees(beta),) + oblique_shock_relations(m1, theta, beta, g)
+    for position, result in zip(range(2, 7), results):
+        values[position] = np.where(solve, result, values[position])
+    return tuple(values)
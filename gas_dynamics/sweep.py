@@ -0,0 +1,122 @@
+"""
+Parallel parameter sweeps over Cartesian grids
+
+The grid is never built in full: it is described by one 1-D array per axis and
+split into chunks of flat indices. Each chunk is expanded and solved with
+the batch solvers inside a process of a concurrent.futures pool, and chunks are
+handed back to the caller in grid order as they complete. Only a bounded number
+of chunks is in flight, so memory stays flat whatever the grid size.
+
+Example:
+    axes = {'pressure_ratio': np.linspace(1.5, 20, 200), 't1': np.linspace(250, 320, 50),
+            'gamma': [1.35, 1.4], 'efficiency': np.linspace(0.8, 0.92, 10)}
+    for start, chunk in sweep(compression_chunk, axes):
+        ...
+"""
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import batch
+from .units import default_cp
+
+default_chunk_size = 1000000
+
+
+def grid_shape(axes):
+    """
+    Shape of the Cartesian grid described by axes
+    """
+    return tuple(len(values) for values in axes.values())
+
+
+def grid_points(axes, start, stop):
+    """
+    Columns of the grid points with flat index in [start, stop)
+    """
+    shape = grid_shape(axes)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    return OrderedDict((name, np.asarray(values, dtype=float)[position])
+                       for (name, values), position in zip(axes.items(), index))
+
+
+def compression_chunk(points, cp=default_cp):
+    """
+    Real compression of one chunk: isentropic outlet temperature from the
+    pressure ratio, actual outlet temperature from the isentropic efficiency
+    and the shaft work per unit mass (negative for compression).
+    Axes: pressure_ratio, t1, gamma, efficiency
+    """
+    pressure_ratio = points['pressure_ratio']
+    t1 = points['t1']
+    unknown = (False, False, False, True)
+    _, _, _, t2_isentropic = batch.ideal_compression_p_vs_t(1.0, pressure_ratio, t1, 0.0, points['gamma'],
+                                                            unknown=unknown)
+    t2 = t1 + (t2_isentropic - t1) / points['efficiency']
+    w, _, _ = batch.shaft_work(0.0, t1, t2, cp, unknown=(True, False, False))
+    points['t2_isentropic'] = t2_isentropic
+    points['t2'] = t2
+    points['w'] = w
+    return points
+
+
+def _run_chunk(function, axes, start, stop, reduce):
+    """
+    Worker side of a sweep, solve one chunk and optionally reduce it
+    """
+    result = function(grid_points(axes, start, stop))
+    if reduce is not None:
+        result = reduce(result)
+    return result
+
+
+def sweep(function, axes, chunk_size=default_chunk_size, workers=None, max_pending=None, reduce=None):
+    """
+    Generator over (start index, chunk result) of function applied to the grid,
+    in grid order.
+
+    function and reduce must be module level functions so they can be sent to
+    the worker processes. function takes an OrderedDict of point columns and
+    returns the chunk result; reduce, if given, is applied in the worker so that
+    only a summary travels back. workers=0 solves in the calling process.
+    """
+    axes = OrderedDict((name, np.asarray(values, dtype=float)) for name, values in axes.items())
+    total = int(np.prod(grid_shape(axes)))
+    starts = range(0, total, chunk_size)
+
+    if workers == 0:
+        for start in starts:
+            yield start, _run_chunk(function, axes, start, min(start + chunk_size, total), reduce)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        starts = iter(starts)
+        for start in starts:
+            pending.append((start, executor.submit(_run_chunk, function, axes, start,
+                                                   min(start + chunk_size, total), reduce)))
+            if len(pending) >= max_pending:
+                break
+        while pending:
+            start, future = pending.popleft()
+            result = future.result()
+            following = next(starts, None)
+            if following is not None:
+                pending.append((following, executor.submit(_run_chunk, function, axes, following,
+                                                           min(following + chunk_size, total), reduce)))
+            yield start, result
+
+
+def sweep_to_arrays(function, axes, chunk_size=default_chunk_size, workers=None):
+    """
+    Run a sweep and merge all chunks into full columns, for grids that fit in memory
+    """
+    columns = OrderedDict()
+    for _, chunk in sweep(function, axes, chunk_size, workers):
+        for name, values in chunk.items():
+            columns.setdefault(name, []).append(values)
+    return OrderedDict((name, np.concatenate(values)) for name, values in columns.items())
@@ -0,0 +1,141 @@
+"""
+Multi-stage compressor and turbine trains evaluated on whole batches
+
+A Train is declared once as a list of Stage tuples (pressure ratio,
+isentropic efficiency, optional intercooling after the stage) and then
+evaluated for arrays of inlet pressures and temperatures. Every stage is a
+few array passes over all operating points, so there is no Python loop per
+point, only per stage. Stage parameters may themselves be arrays, one value
+per operating point.
+
+With the constant n/Cp default the ideal exit temperature is the ideal
+compression law of equations.py; with a fluid model (see fluids.py) it comes
+from the s0(T) table and the work from the h(T) table.
+
+Work follows the sign of equations.shaft_work, w = h(T_in) - h(T_out):
+negative for a compressor stage (work put into the gas), positive for a
+turbine stage.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .batch import fluid_interp
+from .fluids import get_fluid
+from .units import default_cp, default_n
+
+# PRESSURE RATIO (OUT/IN FOR A COMPRESSOR, IN/OUT FOR A TURBINE), ISENTROPIC EFFICIENCY,
+# TEMPERATURE AFTER THE INTERCOOLER (NONE FOR NO COOLING), RELATIVE PRESSURE LOSS OF THE INTERCOOLER
+Stage = namedtuple("Stage", ("pressure_ratio", "efficiency", "intercooler_temperature", "intercooler_pressure_loss"),
+                   defaults=(None, 0.0))
+
+# PER STAGE RESULT ARRAYS, SHAPE (STAGES, POINTS)
+result_names = ("p_in", "t_in", "p_out", "t_out_ideal", "t_out", "work", "heat")
+
+
+class Train:
+    """
+    Chain of compressor (kind="compressor") or turbine (kind="turbine") stages
+    """
+
+    def __init__(self, stages, kind="compressor", n=default_n, cp=default_cp, fluid=None):
+        if kind not in ("compressor", "turbine"):
+            raise ValueError("Train kind must be 'compressor' or 'turbine', got %r" % kind)
+        self.stages = [stage if isinstance(stage, Stage) else Stage(*stage) for stage in stages]
+        if not self.stages:
+            raise ValueError("A train needs at least one stage")
+        self.kind = kind
+        self.n = n
+        self.cp = cp
+        self.fluid = None if fluid is None else get_fluid(fluid)
+
+    @classmethod
+    def equal_split(cls, pressure_ratio, stages, efficiency, intercooler_temperature=None, **kwargs):
+        """
+        Train of equal stages sharing the overall pressure ratio, with the same
+        intercooling between stages (none after the last)
+        """
+        stage_ratio = np.power(pressure_ratio, 1.0 / stages)
+        stage_list = [Stage(stage_ratio, efficiency, intercooler_temperature if i < stages - 1 else None)
+                      for i in range(stages)]
+        return cls(stage_list, **kwargs)
+
+    def _exit(self, p_in, t_in, stage):
+        """
+        Outlet pressure, ideal and actual outlet temperature and work of one stage
+        """
+        if self.kind == "compressor":
+            p_out = p_in * stage.pressure_ratio
+        else:
+            p_out = p_in / stage.pressure_ratio
+        if self.fluid is None:
+            g = self.n
+            t_out_ideal = t_in * np.power(p_out / p_in, (g - 1) / g)
+            if self.kind == "compressor":
+                t_out = t_in + (t_out_ideal - t_in) / stage.efficiency
+            else:
+                t_out = t_in - stage.efficiency * (t_in - t_out_ideal)
+            return p_out, t_out_ideal, t_out, self.cp * (t_in - t_out)
+
+        fluid = self.fluid
+        enthalpy = fluid_interp(fluid, "enthalpy")
+        entropy = fluid_interp(fluid, "entropy")
+        t_out_ideal = fluid_interp(fluid, "temperature_from_entropy")(entropy(t_in) + fluid.r * np.log(p_out / p_in))
+        h_in = enthalpy(t_in)
+        ideal_work = h_in - enthalpy(t_out_ideal)
+        if self.kind == "compressor":
+            work = ideal_work / stage.efficiency
+        else:
+            work = ideal_work * stage.efficiency
+        t_out = fluid_interp(fluid, "temperature_from_enthalpy")(h_in - work)
+        return p_out, t_out_ideal, t_out, work
+
+    def _cool(self, p_out, t_out, stage):
+        """
+        Pressure and temperature after the intercooler of a stage, with the heat removed per kg
+        """
+        if stage.intercooler_temperature is None:
+            return p_out, t_out, np.zeros_like(t_out)
+        t_cooled = np.minimum(t_out, stage.intercooler_temperature)
+        if self.fluid is None:
+            heat = self.cp * (t_out - t_cooled)
+        else:
+            enthalpy = fluid_interp(self.fluid, "enthalpy")
+            heat = enthalpy(t_out) - enthalpy(t_cooled)
+        return p_out * (1 - stage.intercooler_pressure_loss), t_cooled, heat
+
+    def evaluate(self, p_in, t_in):
+        """
+        Run arrays of inlet pressures [Pa] and temperatures [K] through every stage.
+        Returns a dict of (stages, points) arrays named in result_names, plus
+        total_work, train_p_out and train_t_out (after the last intercooler)
+        per point.
+        """
+        p, t = np.broadcast_arrays(np.asarray(p_in, dtype=float), np.asarray(t_in, dtype=float))
+        shape = p.shape
+        for stage in self.stages:
+            shape = np.broadcast_shapes(shape, np.shape(stage.pressure_ratio), np.shape(stage.efficiency))
+        results = {name: np.empty((len(self.stages),) + shape) for name in result_names}
+        p = np.broadcast_to(p, shape)
+        t = np.broadcast_to(t, shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i, stage in enumerate(self.stages):
+                p_out, t_out_ideal, t_out, work = self._exit(p, t, stage)
+                results["p_in"][i] = p
+                results["t_in"][i] = t
+                results["p_out"][i] = p_out
+                results["t_out_ideal"][i] = t_out_ideal
+                results["t_out"][i] = t_out
+                results["work"][i] = work
+                p, t, results["heat"][i] = self._cool(p_out, t_out, stage)
+        results["total_work"] = results["work"].sum(axis=0)
+        results["train_p_out"] = p
+        results["train_t_out"] = t
+        return results
+
+    def __len__(self):
+        return len(self.stages)
+
+    def __repr__(self):
+        return "Train(%s, %d stages%s)" % (self.kind, len(self.stages),
+                                           "" if self.fluid is None else ", fluid=%r" % self.fluid.name)
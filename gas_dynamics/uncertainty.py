@@ -0,0 +1,356 @@
+"""
+Monte Carlo uncertainty propagation through the batch solvers
+
+Every input of an equation is a constant or a distribution, Normal(mean, std)
+or Uniform(low, high), in SI units. Samples are drawn and solved in chunks of
+chunk_size points with the relation of the equation (see relations.py), and
+each chunk is folded into one StreamingStats per variable and then dropped.
+Memory stays flat for any number of samples.
+
+Correlated inputs are drawn through a Gaussian copula: correlated standard
+normal scores are mapped to each distribution, so a Uniform keeps its bounds
+and the correlation is the one of the normal scores. Every chunk has its own
+generator spawned from one SeedSequence, so a run is reproducible for a given
+seed and chunk size.
+
+StreamingStats keeps the count, mean and variance (merged per chunk with
+Chan's parallel update), the extremes and a fixed number of equal histogram
+bins. When a value falls outside the covered range the bins are merged by
+pairs and the range doubles, so percentiles are read from the histogram to
+within one bin width of the data range over the bin count.
+
+Example:
+    python -m gas_dynamics.uncertainty static_pressure --unknown ps --input pt=normal:2e5:2e3 \\
+        --input m=uniform:0.5:0.52 --samples 10000000 --seed 1
+"""
+import argparse
+import json
+import sys
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from . import equations
+from .fluids import compositions, default_fluid
+from .units import default_cp, default_n, unit_registry
+
+default_chunk_size = 1000000
+default_bins = 2048
+default_percentiles = (1, 5, 25, 50, 75, 95, 99)
+
+Normal = namedtuple("Normal", ("mean", "std"))
+Uniform = namedtuple("Uniform", ("low", "high"))
+
+
+def normal_cdf(z):
+    """
+    Standard normal CDF on arrays (Abramowitz and Stegun 7.1.26, error below 1e-7)
+    """
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    polynomial = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - polynomial * np.exp(-x * x)
+    return 0.5 * (1 + np.where(z < 0, -erf, erf))
+
+
+class StreamingStats:
+    """
+    Online count, mean, variance, extremes and histogram of a stream of values
+    """
+
+    def __init__(self, bins=default_bins):
+        if bins < 2 or bins % 2:
+            raise ValueError("bins must be an even number of at least 2, got %r" % bins)
+        self.bins = bins
+        self.count = 0
+        self.invalid = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.low = None
+        self.width = None
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def update(self, values):
+        """
+        Fold an array of values in, NaN and infinite values are only counted as invalid
+        """
+        values = np.asarray(values, dtype=float).reshape(-1)
+        finite = np.isfinite(values)
+        if not finite.all():
+            self.invalid += int(len(values) - np.count_nonzero(finite))
+            values = values[finite]
+        count = len(values)
+        if not count:
+            return
+        mean = values.mean()
+        m2 = np.square(values - mean).sum()
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        low, high = values.min(), values.max()
+        self.minimum = min(self.minimum, low)
+        self.maximum = max(self.maximum, high)
+
+        if self.low is None:
+            self.low = low
+            self.width = (high - low) / self.bins or max(abs(low) * 1e-9, 1e-12)
+        self._cover(low, high)
+        index = np.minimum(((values - self.low) / self.width).astype(np.intp), self.bins - 1)
+        self.counts += np.bincount(index, minlength=self.bins)
+
+    def _cover(self, low, high):
+        """
+        Double the histogram range until it covers [low, high]
+        """
+        while low < self.low or high > self.low + self.width * self.bins:
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            self.counts = np.zeros(self.bins, dtype=np.int64)
+            if low < self.low:
+                self.counts[self.bins // 2:] = merged
+                self.low -= self.width * self.bins
+            else:
+                self.counts[:self.bins // 2] = merged
+            self.width *= 2
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def percentile(self, q):
+        """
+        Percentiles q (0 to 100) interpolated linearly inside the histogram bins
+        """
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        cumulative = np.cumsum(self.counts)
+        target = q / 100 * self.count
+        index = np.minimum(np.searchsorted(cumulative, target), self.bins - 1)
+        before = cumulative[index] - self.counts[index]
+        fraction = np.clip((target - before) / np.maximum(self.counts[index], 1), 0, 1)
+        return np.clip(self.low + (index + fraction) * self.width, self.minimum, self.maximum)
+
+    def histogram(self, bins=None):
+        """
+        (edges, counts) of the occupied part of the histogram, bins merged to at most bins
+        """
+        occupied = np.flatnonzero(self.counts)
+        if not len(occupied):
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        first, last = occupied[0], occupied[-1] + 1
+        group = 1 if bins is None else max(1, -(-(last - first) // bins))
+        last = first + -(-(last - first) // group) * group
+        counts = np.zeros(last - first, dtype=np.int64)
+        counts[:min(last, self.bins) - first] = self.counts[first:last]
+        counts = counts.reshape(-1, group).sum(axis=1)
+        edges = self.low + self.width * (first + group * np.arange(len(counts) + 1))
+        return edges, counts
+
+    def summary(self, percentiles=default_percentiles, histogram_bins=None, convert=None):
+        """
+        Dict of the statistics, values passed through convert (e.g. SI to a
+        display unit) when given. The histogram is left out without histogram_bins
+        """
+        convert = convert or (lambda value: value)
+        result = OrderedDict([
+            ('count', self.count),
+            ('invalid', self.invalid),
+            ('mean', float(convert(self.mean))),
+            ('std', float(abs(convert(self.mean + self.std) - convert(self.mean)))),
+            ('min', float(convert(self.minimum))),
+            ('max', float(convert(self.maximum))),
+            ('percentiles', OrderedDict(("%g" % q, float(convert(value))) for q, value in
+                                        zip(percentiles, self.percentile(percentiles)))),
+        ])
+        if histogram_bins:
+            edges, counts = self.histogram(histogram_bins)
+            result['histogram'] = {'edges': [float(convert(edge)) for edge in edges], 'counts': counts.tolist()}
+        return result
+
+
+def correlation_matrix(names, correlation):
+    """
+    Correlation matrix of the random inputs names from {(name_a, name_b): rho}
+    """
+    matrix = np.eye(len(names))
+    position = {name: i for i, name in enumerate(names)}
+    for (first, second), rho in (correlation or {}).items():
+        if first not in position or second not in position:
+            raise ValueError("Correlation %s-%s needs two random inputs" % (first, second))
+        if first == second or not -1 < rho < 1:
+            raise ValueError("Correlation %s-%s must be between -1 and 1, got %r" % (first, second, rho))
+        matrix[position[first], position[second]] = matrix[position[second], position[first]] = rho
+    return matrix
+
+
+def _sample(distributions, count, rng, cholesky):
+    """
+    One column of count samples per distribution
+    """
+    if cholesky is None:
+        return [rng.normal(d.mean, d.std, count) if isinstance(d, Normal) else rng.uniform(d.low, d.high, count)
+                for d in distributions]
+    scores = cholesky @ rng.standard_normal((len(distributions), count))
+    return [d.mean + d.std * z if isinstance(d, Normal) else d.low + (d.high - d.low) * normal_cdf(z)
+            for d, z in zip(distributions, scores)]
+
+
+def propagate(equation, inputs, unknown, gas_property=None, samples=default_chunk_size,
+              chunk_size=default_chunk_size, seed=0, correlation=None, bins=default_bins):
+    """
+    Push samples of the inputs through an equation of equations.equation_table.
+    inputs maps each variable except unknown to a constant, Normal or Uniform
+    in SI units, correlation maps (name_a, name_b) pairs of random inputs to a
+    correlation coefficient. Returns an OrderedDict of StreamingStats per
+    variable in equation input order.
+    """
+    info = equations.equation_table[equation]
+    if info.relation is None:
+        raise ValueError("Uncertainty propagation needs an equation with a relation, %s has none" % equation)
+    if unknown not in info.inputs:
+        raise ValueError("%s has no variable %r" % (equation, unknown))
+    missing = [name for name in info.inputs if name != unknown and name not in inputs]
+    if missing:
+        raise ValueError("No value or distribution for %s" % ", ".join(missing))
+    if gas_property is None:
+        gas_property = {"n": default_n, "Cp": default_cp, "fluid": default_fluid}[info.gas_property]
+    random = [name for name in info.relation.variables if isinstance(inputs.get(name), (Normal, Uniform))]
+    distributions = [inputs[name] for name in random]
+    cholesky = None
+    if correlation:
+        try:
+            cholesky = np.linalg.cholesky(correlation_matrix(random, correlation))
+        except np.linalg.LinAlgError:
+            raise ValueError("The correlation matrix is not positive definite") from None
+
+    stats = OrderedDict((name, StreamingStats(bins)) for name in info.inputs)
+    generators = np.random.SeedSequence(seed).spawn(-(-int(samples) // chunk_size))
+    for start, seed_sequence in zip(range(0, int(samples), chunk_size), generators):
+        count = min(chunk_size, int(samples) - start)
+        drawn = dict(zip(random, _sample(distributions, count, np.random.default_rng(seed_sequence), cholesky)))
+        values = [drawn.get(name, 0.0 if name == unknown else inputs[name]) for name in info.relation.variables]
+        result = info.relation.solve_arrays(values, gas_property, unknown)
+        for name, column in zip(info.outputs, result):
+            stats[name].update(np.broadcast_to(column, (count,)))
+    return stats
+
+
+def parse_input(text):
+    """
+    Turns "pt=normal:2e5:2e3", "m=uniform:0.5:0.52" or "t1=288" into (name, value)
+    """
+    name, _, spec = text.partition("=")
+    kind, _, parameters = spec.partition(":")
+    try:
+        if not parameters:
+            return name.strip(), float(spec)
+        first, second = [float(value) for value in parameters.split(":")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Inputs must be NAME=VALUE, NAME=normal:MEAN:STD or NAME=uniform:LOW:HIGH, "
+                                         "got %r" % text) from None
+    kind = kind.strip().lower()
+    if kind == "normal":
+        return name.strip(), Normal(first, second)
+    if kind == "uniform":
+        return name.strip(), Uniform(first, second)
+    raise argparse.ArgumentTypeError("Unknown distribution %r, expected normal or uniform" % kind)
+
+
+def parse_correlation(text):
+    """
+    Turns "pt,m=0.5" into ((name_a, name_b), rho)
+    """
+    pair, _, rho = text.partition("=")
+    names = [name.strip() for name in pair.split(",")]
+    try:
+        if len(names) != 2:
+            raise ValueError
+        return tuple(names), float(rho)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Correlations must be NAME_A,NAME_B=RHO, got %r" % text) from None
+
+
+def to_si(value, quantity, unit_id):
+    """
+    Constant or distribution converted to SI, the spread of a Normal through the unit slope
+    """
+    if isinstance(value, Normal):
+        mean = quantity.to_si(value.mean, unit_id)
+        return Normal(mean, abs(quantity.to_si(value.mean + value.std, unit_id) - mean))
+    if isinstance(value, Uniform):
+        low, high = sorted((quantity.to_si(value.low, unit_id), quantity.to_si(value.high, unit_id)))
+        return Uniform(low, high)
+    return quantity.to_si(value, unit_id)
+
+
+def build_parser():
+    """
+    Command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Propagate input uncertainty through a gas dynamics equation")
+    parser.add_argument("equation", choices=sorted(name for name, info in equations.equation_table.items()
+                                                   if info.relation is not None))
+    parser.add_argument("--unknown", required=True, help="variable to solve for")
+    parser.add_argument("--input", action="append", type=parse_input, default=[], metavar="NAME=SPEC",
+                        help="VALUE, normal:MEAN:STD or uniform:LOW:HIGH, once per known variable")
+    parser.add_argument("--correlation", action="append", type=parse_correlation, default=[],
+                        metavar="NAME_A,NAME_B=RHO", help="correlation of two random inputs")
+    parser.add_argument("--unit", action="append", metavar="VARIABLE=UNIT",
+                        help="unit of a variable for input and output, SI if not given")
+    parser.add_argument("--property", type=float, dest="gas_property",
+                        help="isentropic exponent n, or Cp for shaft_work")
+    parser.add_argument("--fluid", choices=sorted(compositions),
+                        help="variable property fluid of the *_real equations (default %s)" % default_fluid)
+    parser.add_argument("--samples", type=float, default=default_chunk_size)
+    parser.add_argument("--chunk-size", type=int, default=default_chunk_size)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--percentile", type=float, action="append", dest="percentiles",
+                        help="percentile to report, repeatable (default %s)" %
+                             ", ".join(str(q) for q in default_percentiles))
+    parser.add_argument("--histogram", type=int, metavar="BINS", help="add a histogram of at most BINS bins")
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point, prints the statistics of every variable as JSON
+    """
+    from .cli import parse_units
+    args = build_parser().parse_args(argv)
+    info = equations.equation_table[args.equation]
+    try:
+        units = parse_units(args.unit)
+        quantities = {name: unit_registry[quantity] for name, quantity in zip(info.inputs, info.quantities)}
+        unit_ids = {name: quantity.unit_id(units.get(name, quantity.units[0])) for name, quantity in
+                    quantities.items()}
+        inputs = {name: to_si(value, quantities[name], unit_ids[name]) for name, value in args.input
+                  if name in quantities}
+        unknown_inputs = [name for name, _ in args.input if name not in quantities]
+        if unknown_inputs:
+            raise ValueError("%s has no variable %s" % (args.equation, ", ".join(unknown_inputs)))
+        gas_property = args.fluid if info.gas_property == "fluid" else args.gas_property
+        stats = propagate(args.equation, inputs, args.unknown, gas_property, int(args.samples), args.chunk_size,
+                          args.seed, dict(args.correlation), default_bins)
+    except (ValueError, KeyError, argparse.ArgumentTypeError) as error:
+        sys.stderr.write("Error: %s\n" % error)
+        return 1
+    percentiles = tuple(args.percentiles or default_percentiles)
+    report = OrderedDict()
+    for name, variable in stats.items():
+        quantity, unit_id = quantities[name], unit_ids[name]
+        report[name] = variable.summary(percentiles, args.histogram,
+                                        lambda value, q=quantity, u=unit_id: q.from_si(value, u))
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
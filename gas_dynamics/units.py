@@ -0,0 +1,161 @@
+"""
+Fluid property defaults and unit tables shared by the GUI and the headless tools.
+Kept free of tkinter so that it imports instantly without a display.
+"""
+
+# PROPERTIES OF AIR CONSTANT FOR NOW
+default_n = 1.4  # -
+default_cp = 1005  # UNIT J/Kg K
+
+# UNIT CONVERSION LIST
+# FIRST IS SI UNIT, CONVERSION TO SI FROM CORRESPONDING POSITION FORMAT y= mx +c
+# STORED AS (m,c)
+# FOR EXAMPLE K -> C +273.15 -> 1,273.15
+unit_list_pressure = ["Pa", "bar", "PSi"]
+unit_pressure_conversion = [(1, 0), (100000, 0), (6894.757, 0)]
+unit_list_temperature = ("K", "°C", "°F")
+unit_temperature_conversion = [(1, 0), (1, 273.15),
+                               (0.55555555555555555555555555555556, 255.37222222222222222222222222222)]
+unit_list_mass_flow = ("kg/s", "kg/h", "lb/s", "lb/min")
+unit_mass_flow_conversion = [(1, 0), (1 / 3600, 0), (0.45359237, 0), (0.45359237 / 60, 0)]
+unit_list_power = ("W", "kW", "hp", "BTU/h")
+unit_power_conversion = [(1, 0), (1000, 0), (745.69987158227022, 0), (0.29307107017222, 0)]
+unit_list_specific_work = ("J/kg", "kJ/kg", "BTU/lb")
+unit_specific_work_conversion = [(1, 0), (1000, 0), (2326, 0)]
+# ANGLES ARE KEPT IN DEGREES
+unit_list_angle = ("deg", "rad")
+unit_angle_conversion = [(1, 0), (57.295779513082321, 0)]
+unit_list_length = ("m", "mm", "cm", "in", "ft")
+unit_length_conversion = [(1, 0), (0.001, 0), (0.01, 0), (0.0254, 0), (0.3048, 0)]
+unit_list_heat_flux = ("W/m²", "kW/m²", "BTU/h ft²")
+unit_heat_flux_conversion = [(1, 0), (1000, 0), (3.1545907, 0)]
+
+# QUANTITY: (UNIT NAMES, CONVERSION FACTORS)
+unit_table = {
+    "pressure": (unit_list_pressure, unit_pressure_conversion),
+    "temperature": (unit_list_temperature, unit_temperature_conversion),
+    "mass_flow": (unit_list_mass_flow, unit_mass_flow_conversion),
+    "power": (unit_list_power, unit_power_conversion),
+    "specific_work": (unit_list_specific_work, unit_specific_work_conversion),
+    "angle": (unit_list_angle, unit_angle_conversion),
+    "length": (unit_list_length, unit_length_conversion),
+    "heat_flux": (unit_list_heat_flux, unit_heat_flux_conversion),
+    "constant": ([1], [(1, 0)]),
+}
+
+
+class Quantity:
+    """
+    Units of one quantity compiled to integer IDs and contiguous (scale, offset) arrays.
+    Unit ID 0 is the SI unit.
+    """
+    __slots__ = ("name", "units", "ids", "scale", "offset", "_arrays")
+
+    def __init__(self, name, units, conversion):
+        self.name = name
+        self.units = tuple(units)
+        self.ids = {unit: i for i, unit in enumerate(self.units)}
+        self.scale = tuple(m for m, _ in conversion)
+        self.offset = tuple(c for _, c in conversion)
+        self._arrays = None
+
+    def unit_id(self, unit):
+        """
+        Integer ID of a unit name
+        """
+        try:
+            return self.ids[unit]
+        except KeyError:
+            raise ValueError("Unknown %s unit %r, expected one of %s" % (
+                self.name, unit, ", ".join(map(str, self.units)))) from None
+
+    def arrays(self):
+        """
+        (scale, offset) as NumPy arrays, built on first use so NumPy is only
+        imported by callers converting arrays
+        """
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = (np.array(self.scale, dtype=float), np.array(self.offset, dtype=float))
+        return self._arrays
+
+    def to_si(self, value, unit_id):
+        """
+        Convert a value in unit_id to SI
+        """
+        if unit_id == 0:
+            return value
+        return value * self.scale[unit_id] + self.offset[unit_id]
+
+    def from_si(self, value, unit_id):
+        """
+        Convert an SI value to unit_id
+        """
+        if unit_id == 0:
+            return value
+        return (value - self.offset[unit_id]) / self.scale[unit_id]
+
+    def array_to_si(self, values, unit_ids):
+        """
+        Convert an array of values to SI in one affine operation.
+        unit_ids is one ID or an array with the ID of every element.
+        """
+        scale, offset = self.arrays()
+        return values * scale[unit_ids] + offset[unit_ids]
+
+    def array_from_si(self, values, unit_ids):
+        """
+        Convert an array of SI values, unit_ids is one ID or one ID per element
+        """
+        scale, offset = self.arrays()
+        return (values - offset[unit_ids]) / scale[unit_ids]
+
+
+class UnitRegistry:
+    """
+    All quantities by name, shared by the GUI comboboxes and the batch tools
+    """
+
+    def __init__(self, table):
+        self.quantities = {name: Quantity(name, units, conversion) for name, (units, conversion) in table.items()}
+
+    def __getitem__(self, quantity):
+        return self.quantities[quantity]
+
+    def units(self, quantity):
+        """
+        Unit names of a quantity, SI unit first
+        """
+        return self.quantities[quantity].units
+
+    def unit_id(self, quantity, unit):
+        """
+        Integer ID of a unit of quantity
+        """
+        return self.quantities[quantity].unit_id(unit)
+
+
+unit_registry = UnitRegistry(unit_table)
+
+
+def unit_index(quantity, unit):
+    """
+    Position of a unit in the list of its quantity, SI unit is 0
+    """
+    return unit_registry.unit_id(quantity, unit)
+
+
+def convert_to_si(value, quantity, unit):
+    """
+    Convert a value (or a NumPy array) given in unit to the SI unit of quantity
+    """
+    quantity = unit_registry[quantity]
+    return quantity.to_si(value, quantity.unit_id(unit))
+
+
+def convert_from_si(value, quantity, unit):
+    """
+    Convert a value (or a NumPy array) in SI units to unit
+    """
+    quantity = unit_registry[quantity]
+    return quantity.from_si(value, quantity.unit_id(unit))
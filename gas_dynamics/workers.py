@@ -0,0 +1,183 @@
+"""
+Background execution of calculations for the GUI
+
+Jobs run in a thread (or process) pool so the Tk main loop never waits on a
+solve, sweep, table build or file import. Tk widgets must only be touched from
+the main thread, so finished jobs are collected by polling with after() and
+their callbacks run there. Thread jobs can report progress and be cancelled
+cooperatively through the Job object passed to them.
+"""
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import count
+from threading import Event
+
+default_workers = 2
+default_poll_interval = 50  # ms
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job that noticed its cancellation
+    """
+    pass
+
+
+class Job:
+    """
+    One submitted calculation
+    """
+
+    def __init__(self, job_id, description, on_done, on_error):
+        self.id = job_id
+        self.description = description
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self.progress = None
+        self.started = False
+        self._cancel_event = Event()
+
+    @property
+    def cancelled(self):
+        """
+        True once cancel() was requested
+        """
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        Ask the job to stop, a queued job never starts
+        """
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check_cancelled(self):
+        """
+        Raise JobCancelled if cancel() was requested, for use inside long jobs
+        """
+        if self.cancelled:
+            raise JobCancelled(self.description)
+
+    def set_progress(self, fraction):
+        """
+        Report progress between 0 and 1 from inside the job
+        """
+        self.progress = fraction
+
+    @property
+    def running(self):
+        """
+        Started and not finished
+        """
+        return self.started and not self.future.done()
+
+
+def _run_thread_job(job, function, args, kwargs):
+    """
+    Thread side of a job, marks it started and skips it if it was cancelled while queued
+    """
+    job.started = True
+    job.check_cancelled()
+    return function(*args, **kwargs)
+
+
+class JobExecutor:
+    """
+    Pool of workers whose results are delivered to the Tk main loop
+    """
+
+    def __init__(self, widget, workers=default_workers, kind="thread", poll_interval=default_poll_interval,
+                 on_status=None):
+        self.widget = widget
+        self.kind = kind
+        self.poll_interval = poll_interval
+        self.on_status = on_status
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gas_dynamics")
+        self.jobs = []
+        self._ids = count(1)
+        self._polling = None
+
+    def submit(self, function, *args, description="", on_done=None, on_error=None, pass_job=False, **kwargs):
+        """
+        Run function(*args, **kwargs) in the pool. on_done(result) or
+        on_error(exception) run later in the Tk main loop. With pass_job the
+        Job is given as first argument so the function can report progress
+        and check for cancellation (thread pools only).
+        """
+        job = Job(next(self._ids), description, on_done, on_error)
+        if pass_job:
+            args = (job,) + args
+        if self.kind == "process":
+            job.future = self._executor.submit(function, *args, **kwargs)
+            job.started = True
+        else:
+            job.future = self._executor.submit(_run_thread_job, job, function, args, kwargs)
+        self.jobs.append(job)
+        self._schedule_poll()
+        self._report()
+        return job
+
+    def cancel_all(self):
+        """
+        Cancel every queued and running job
+        """
+        for job in self.jobs:
+            job.cancel()
+        self._report()
+
+    def counts(self):
+        """
+        (queued, running) number of jobs
+        """
+        running = sum(1 for job in self.jobs if job.running)
+        return len(self.jobs) - running, running
+
+    def _schedule_poll(self):
+        if self._polling is None:
+            self._polling = self.widget.after(self.poll_interval, self.poll)
+
+    def poll(self):
+        """
+        Deliver finished jobs to their callbacks, keeps polling while jobs are pending
+        """
+        self._polling = None
+        pending = []
+        for job in self.jobs:
+            if not job.future.done():
+                pending.append(job)
+                continue
+            try:
+                result = job.future.result()
+            except (CancelledError, JobCancelled):
+                continue
+            except Exception as error:
+                if job.on_error is not None:
+                    job.on_error(error)
+                continue
+            if job.on_done is not None:
+                job.on_done(result)
+        self.jobs = pending
+        self._report()
+        if self.jobs:
+            self._schedule_poll()
+
+    def _report(self):
+        """
+        Tell the status listener how many jobs are queued and running
+        """
+        if self.on_status is None:
+            return
+        queued, running = self.counts()
+        progress = [job.progress for job in self.jobs if job.running and job.progress is not None]
+        self.on_status(queued, running, min(progress) if progress else None)
+
+    def shutdown(self):
+        """
+        Cancel pending work and stop the pool without waiting
+        """
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,71 @@
+"""
+Regression tests of the batch solvers against the scalar ones: every unknown
+of every relation agrees to within a few units in the last place (NumPy's
+vectorized pow, exp and log round differently from the C library behind
+math), and the masks solve the same rows as the `== 0` convention
+"""
+import unittest
+
+import numpy as np
+
+from gas_dynamics import batch, equations
+
+# RELATIVE DIFFERENCE ALLOWED BETWEEN THE ARRAY AND THE SCALAR PATH
+tolerance = 1e-13
+
+# EQUATION: (GAS PROPERTY, VARIABLE SOLVED TO BUILD CONSISTENT POINTS, RANGES OF THE OTHER VARIABLES)
+cases = {
+    "ideal_compression": (1.4, "t2", {"p1": (1e5, 2e5), "p2": (2e5, 4e6), "t1": (250, 320)}),
+    "static_temperature": (1.4, "ts", {"tt": (250, 2000), "m": (0.05, 5)}),
+    "static_pressure": (1.4, "ps", {"pt": (1e4, 1e7), "m": (0.05, 5)}),
+    "shaft_work": (1004.5, "w", {"t1": (250, 1500), "t2": (250, 1500)}),
+    "compressor_efficiency": (1.4, "t2", {"pr": (1.1, 30), "t1": (250, 320), "eta": (0.6, 0.95)}),
+    "ideal_compression_real": ("air", "t2", {"p1": (1e5, 2e5), "p2": (2e5, 4e6), "t1": (250, 320)}),
+    "shaft_work_real": ("air", "w", {"t1": (250, 1500), "t2": (250, 1500)}),
+}
+
+
+def points(relation, gas_property, solved, ranges, count=2000):
+    """
+    Arrays of consistent points in call order, the solved variable from the others
+    """
+    rng = np.random.default_rng(8)
+    values = [np.zeros(count) if name == solved else rng.uniform(*ranges[name], count)
+              for name in relation.variables]
+    return dict(zip(relation.outputs, relation.solve_arrays(values, gas_property, solved)))
+
+
+class ScalarAgreementTest(unittest.TestCase):
+
+    def test_every_unknown_agrees_with_the_scalar_path(self):
+        for equation, (gas_property, solved, ranges) in cases.items():
+            relation = equations.equation_table[equation].relation
+            point = points(relation, gas_property, solved, ranges)
+            for unknown in relation.variables:
+                values = [np.zeros_like(point[name]) if name == unknown else point[name] for name in relation.variables]
+                result = dict(zip(relation.outputs, relation.solve_arrays(values, gas_property, unknown)))[unknown]
+                for i in range(len(result)):
+                    scalar = relation.solve([float(value[i]) for value in values], gas_property, unknown)
+                    expected = dict(zip(relation.outputs, scalar))[unknown]
+                    self.assertLessEqual(abs(result[i] - expected), tolerance * abs(expected),
+                                         "%s %s: %r vs %r" % (equation, unknown, result[i], expected))
+
+    def test_zero_convention_matches_the_scalar_functions(self):
+        rows = [(1e5, 2e5, 300.0, 0.0), (0.0, 2e5, 300.0, 365.0), (1e5, 2e5, 300.0, 365.0), (0.0, 0.0, 300.0, 365.0)]
+        p1, p2, t1, t2 = [np.array(column) for column in zip(*rows)]
+        solved = batch.ideal_compression_p_vs_t(p1, p2, t1, t2, 1.4)
+        for i, row in enumerate(rows):
+            expected = equations.ideal_compression_p_vs_t(*row, 1.4)
+            np.testing.assert_allclose([column[i] for column in solved], expected, rtol=tolerance)
+
+    def test_masks_solve_a_real_zero(self):
+        _, _, m = batch.static_pressure(np.array([2e5]), np.array([2e5]), np.array([0.0]), 1.4,
+                                        unknown=[[False], [False], [True]])
+        self.assertEqual(m[0], 0.0)
+        ps, _, _ = batch.static_pressure(np.array([2e5]), np.array([0.0]), np.array([0.0]), 1.4,
+                                         unknown=[[False], [True], [False]])
+        self.assertEqual(ps[0], 2e5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Regression tests of the flat plate correlations: the closed forms and their
+averages, the incompressible limit of the reference temperature method, one
+regime for the recovery factor and the skin friction, and the scalar and
+batch flat_plate solvers agreeing on what they solve
+"""
+import unittest
+
+import numpy as np
+
+from gas_dynamics import boundary_layer, equations
+
+
+class CorrelationTest(unittest.TestCase):
+
+    def test_local_laws(self):
+        self.assertAlmostEqual(float(boundary_layer.skin_friction(1e4, "laminar")), 0.664 / 100)
+        self.assertAlmostEqual(float(boundary_layer.skin_friction(1e7, "turbulent")), 0.0592 * 1e7 ** -0.2)
+        cf = boundary_layer.skin_friction([4e5, 6e5])
+        np.testing.assert_allclose(cf, [0.664 / np.sqrt(4e5), 0.0592 * 6e5 ** -0.2])
+
+    def test_average_is_the_integral_of_the_local_value(self):
+        # AVERAGE Cf(Re_L) = 1 / Re_L * INTEGRAL OF Cf(Re) dRe FROM 0 TO Re_L
+        for regime, re_length in (("laminar", 2e5), ("turbulent", 5e6), ("transitional", 5e6)):
+            re = np.concatenate([np.geomspace(1e-6, 5e5, 200001), np.geomspace(5e5, re_length, 200001)[1:]])
+            re = re[re <= re_length]
+            local = boundary_layer.skin_friction(re, regime)
+            integral = np.sum((local[1:] + local[:-1]) / 2 * np.diff(re)) / re_length
+            average = float(boundary_layer.skin_friction(re_length, regime, average=True))
+            self.assertAlmostEqual(average / integral, 1, delta=1e-3, msg=regime)
+
+    def test_reynolds_analogy(self):
+        self.assertAlmostEqual(float(boundary_layer.stanton(0.004, 0.72)), 0.002 * 0.72 ** (-2 / 3))
+        self.assertAlmostEqual(float(boundary_layer.nusselt(1e4, 1.0, "laminar")), 0.332 * 100)
+
+    def test_turbulent_override(self):
+        cf = boundary_layer.skin_friction([4e5, 6e5], turbulent=[True, False])
+        np.testing.assert_allclose(cf, [0.0592 * 4e5 ** -0.2, 0.664 / np.sqrt(6e5)])
+
+    def test_unknown_regime(self):
+        with self.assertRaises(ValueError):
+            boundary_layer.skin_friction(1e5, "creeping")
+
+
+class FlatPlateTest(unittest.TestCase):
+
+    def test_incompressible_limit(self):
+        result = boundary_layer.flat_plate(1e-3, 300.0, 1e5, [0.01, 0.1], regime="laminar")
+        np.testing.assert_allclose(result["t_ref"], 300.0, rtol=1e-6)
+        np.testing.assert_allclose(result["cf"], 0.664 / np.sqrt(result["re"]), rtol=1e-6)
+        np.testing.assert_allclose(result["q_wall"], 0.0, atol=1e-12)
+
+    def test_adiabatic_wall_has_no_heat_flux(self):
+        result = boundary_layer.flat_plate([0.5, 2.0, 5.0], 220.0, 2e4, 1.0)
+        np.testing.assert_allclose(result["q_wall"], 0.0, atol=1e-9)
+        self.assertTrue(np.all(result["t_aw"] > 220.0))
+
+    def test_one_regime_for_recovery_and_skin_friction(self):
+        # HOT REFERENCE STATE: TURBULENT AT THE EDGE REYNOLDS NUMBER, BELOW THE TRANSITION AT THE REFERENCE ONE
+        result = boundary_layer.flat_plate(6.0, 220.0, 1e3, 1.0)
+        self.assertTrue(result["turbulent"])
+        self.assertLess(result["re_ref"], 5e5)
+        cf_ref = result["cf"] * result["t_ref"] / 220.0
+        self.assertAlmostEqual(float(cf_ref / (0.0592 * result["re_ref"] ** -0.2)), 1, places=12)
+
+    def test_outputs_are_not_inputs(self):
+        with self.assertRaises(ValueError):
+            equations.flat_plate(2.0, 220.0, 2e4, 0.5, 0, 0, 0.003, 0, 0, 1.4)
+        with self.assertRaises(ValueError):
+            equations.flat_plate(0, 220.0, 2e4, 0.5, 0, 0, 0, 0, 0, 1.4)
+        solved = boundary_layer.flat_plate_solve([2.0, 2.0], 220.0, 2e4, 0.5, 0, 0, [0, 0.003], 0, 0, 1.4)
+        self.assertGreater(solved[5][0], 0)
+        self.assertEqual(solved[6][1], 0.003)
+        self.assertTrue(np.isnan([solved[5][1], solved[7][1], solved[8][1]]).all())
+
+    def test_scalar_and_batch_agree(self):
+        rows = [(0.3, 288.0, 1e5, 0.05, 0.0), (2.0, 220.0, 2e4, 0.5, 300.0), (6.0, 220.0, 1e3, 2.0, 0.0),
+                (0.8, 250.0, 5e4, 3.0, 400.0)]
+        mach, t_edge, p_edge, length, t_wall = [np.array(column) for column in zip(*rows)]
+        zeros = np.zeros(len(rows))
+        solved = boundary_layer.flat_plate_solve(mach, t_edge, p_edge, length, t_wall, zeros, zeros, zeros, zeros,
+                                                 1.4, unknown=[0, 0, 0, 0, t_wall == 0, 1, 1, 1, 1])
+        for i, row in enumerate(rows):
+            expected = equations.flat_plate(*row, 0, 0, 0, 0, 1.4)
+            np.testing.assert_allclose([column[i] for column in solved], expected, rtol=1e-9, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Regression tests of the solver cache: inputs that round to a stored point get
+their own inputs back, and concurrent lookups do not corrupt the LRU order
+"""
+from threading import Thread
+import unittest
+
+from gas_dynamics import equations
+from gas_dynamics.cache import SolverCache
+
+properties = {'n': 1.4, 'Cp': 1004.5}
+
+
+class EchoTest(unittest.TestCase):
+
+    def test_rounded_hit_echoes_the_callers_inputs(self):
+        cache = SolverCache(digits=6)
+        first = cache.solve("static_temperature", (300.0, 0, 0.5), properties)
+        second = cache.solve("static_temperature", (300.0000001, 0, 0.5), properties)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(second[0], first[0])
+        self.assertEqual(second[1], 300.0000001)
+        # THE EXACT ALIAS OF EACH CALL KEEPS ITS OWN INPUTS
+        self.assertEqual(cache.solve("static_temperature", (300.0, 0, 0.5), properties), first)
+        self.assertEqual(cache.solve("static_temperature", (300.0000001, 0, 0.5), properties), second)
+        self.assertEqual(cache.hits, 3)
+
+    def test_explicit_unknown_is_not_replaced(self):
+        cache = SolverCache(digits=6)
+        first = cache.solve("shaft_work", (5e4, 300.0, 0.0), properties, unknown="t2")
+        second = cache.solve("shaft_work", (5.00000001e4, 300.0, 0.0), properties, unknown="t2")
+        self.assertEqual(second[0], 5.00000001e4)
+        self.assertEqual(second[2], first[2])
+
+
+class ThreadTest(unittest.TestCase):
+
+    def test_concurrent_lookups_with_eviction(self):
+        cache = SolverCache(max_size=8)
+        errors = []
+
+        def run(offset):
+            try:
+                for i in range(2000):
+                    t1 = 300.0 + (i + offset) % 16
+                    result = cache.solve("shaft_work", (0, t1, t1 + 100), properties)
+                    self.assertEqual(result[1], t1)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [Thread(target=run, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(cache.hits + cache.misses, 8000)
+        self.assertLessEqual(len(cache), 8)
+        self.assertAlmostEqual(cache.solve("shaft_work", (0, 300.0, 400.0), properties)[0],
+                               equations.shaft_work(0, 300.0, 400.0, 1004.5)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Regression tests of the command line mode: a JSON line that does not parse
+is reported in its row and the rows after it are still solved, a blank
+deflection of the oblique shock gives the normal shock
+"""
+import io
+import unittest
+
+from gas_dynamics.cli import read_jsonl_rows, solve_rows
+
+
+class JsonLinesTest(unittest.TestCase):
+
+    def test_bad_line_is_an_error_row(self):
+        stream = io.StringIO('{"m": 0.5, "tt": 300}\n{"m": 0.5,\n\n[0.5, 300]\n{"m": 0.5, "tt": 400}\n')
+        for batch in (True, False):
+            results = list(solve_rows(read_jsonl_rows(stream), "static_temperature", batch=batch))
+            stream.seek(0)
+            self.assertEqual([result["error"] for result in results],
+                             ["", "Check JSON on line 2", "Check JSON object on line 4", ""])
+            self.assertAlmostEqual(results[3]["ts"], 400 / 1.05)
+
+
+class ObliqueShockTest(unittest.TestCase):
+
+    def test_blank_deflection_is_the_normal_shock(self):
+        for batch in (True, False):
+            normal, = solve_rows([{"m1": "2", "theta": ""}], "oblique_shock", batch=batch)
+            self.assertEqual(normal["error"], "")
+            self.assertEqual(normal["beta"], 90.0)
+            self.assertAlmostEqual(normal["p_ratio"], 4.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
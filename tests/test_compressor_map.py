@@ -0,0 +1,110 @@
+"""
+Regression tests of the compressor maps: interpolation is exact for a map
+linear in the (flow, pressure ratio) plane, the spatial index finds the same
+triangle as a brute force search, points outside the map are NaN, and the
+shaft work agrees with the scalar solvers
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gas_dynamics import compressor_map, equations
+from gas_dynamics.compressor_map import CompressorMap, TriangleIndex
+from gas_dynamics.units import default_cp, default_n
+
+
+def linear_map(beta_points=compressor_map.default_beta_points):
+    """
+    Map whose speed, beta and efficiency are linear in (flow, pressure ratio):
+    flow = s + 0.3 b, pressure ratio = 1 + 2 s - 0.5 b
+    """
+    speed = np.repeat(np.linspace(0.5, 1.0, 6), 7)
+    beta = np.tile(np.linspace(0, 1, 7), 6)
+    flow = speed + 0.3 * beta
+    pressure_ratio = 1 + 2 * speed - 0.5 * beta
+    return CompressorMap(speed, flow, pressure_ratio, 0.9 - 0.1 * flow + 0.05 * pressure_ratio, beta_points)
+
+
+def map_point(speed, beta):
+    return speed + 0.3 * beta, 1 + 2 * speed - 0.5 * beta
+
+
+class CompressorMapTest(unittest.TestCase):
+
+    def test_linear_map_is_interpolated_exactly(self):
+        rng = np.random.default_rng(6)
+        speed, beta = rng.uniform(0.5, 1.0, 5000), rng.uniform(0, 1, 5000)
+        flow, pressure_ratio = map_point(speed, beta)
+        result = linear_map().interpolate(flow, pressure_ratio)
+        self.assertTrue(result["inside"].all())
+        np.testing.assert_allclose(result["speed"], speed, rtol=1e-12)
+        np.testing.assert_allclose(result["beta"], beta, atol=1e-9)
+        np.testing.assert_allclose(result["efficiency"], 0.9 - 0.1 * flow + 0.05 * pressure_ratio, rtol=1e-12)
+
+    def test_outside_is_nan(self):
+        flow, pressure_ratio = map_point(np.array([0.4, 1.1, 0.7, np.nan]), np.array([0.5, 0.5, 1.2, 0.5]))
+        result = linear_map().interpolate(flow, pressure_ratio)
+        self.assertFalse(result["inside"].any())
+        self.assertTrue(np.isnan(result["efficiency"]).all())
+
+    def test_surge_margin_is_zero_on_the_surge_line(self):
+        speed = np.linspace(0.5, 1.0, 11)
+        result = linear_map().interpolate(*map_point(speed, 0.0))
+        np.testing.assert_allclose(result["surge_margin"], 0.0, atol=1e-12)
+
+    def test_shaft_work_matches_the_scalar_solvers(self):
+        flow, pressure_ratio = map_point(np.array([0.6, 0.8, 0.95]), np.array([0.2, 0.5, 0.9]))
+        result = linear_map().shaft_work(flow, pressure_ratio, 288.15)
+        for i in range(3):
+            t2 = equations.compressor_efficiency(pressure_ratio[i], 288.15, 0, result["efficiency"][i], default_n)[2]
+            self.assertAlmostEqual(result["t2"][i], t2, places=9)
+            self.assertAlmostEqual(result["work"][i], equations.shaft_work(0, 288.15, t2, default_cp)[0], places=6)
+        real = linear_map().shaft_work(flow, pressure_ratio, 288.15, fluid="air")
+        np.testing.assert_allclose(real["t2"], result["t2"], rtol=2e-3)
+
+    def test_read_map(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "map.csv")
+            with open(path, "w", encoding="utf-8") as stream:
+                stream.write("speed,flow,pressure_ratio,efficiency\n")
+                for speed in (0.5, 1.0):
+                    for beta in (0.0, 0.5, 1.0):
+                        stream.write("%r,%r,%r,0.8\n" % ((speed,) + map_point(speed, beta)))
+            loaded = compressor_map.get_map(path)
+            self.assertIs(compressor_map.get_map(path), loaded)
+            self.assertAlmostEqual(float(loaded.interpolate(*map_point(0.75, 0.5))["efficiency"]), 0.8)
+            with open(path, "w", encoding="utf-8") as stream:
+                stream.write("speed,flow\n1,2\n")
+            with self.assertRaises(ValueError):
+                compressor_map.read_map(path)
+        compressor_map.clear_cache()
+
+
+class TriangleIndexTest(unittest.TestCase):
+
+    def test_same_triangle_as_a_brute_force_search(self):
+        rng = np.random.default_rng(7)
+        vertices = rng.uniform(0, 1, (200, 2))
+        triangles = np.array([rng.choice(200, 3, replace=False) for _ in range(300)])
+        index = TriangleIndex(vertices, triangles)
+        points = rng.uniform(-0.1, 1.1, (3000, 2))
+        found, weights = index.locate(points)
+        for point, triangle, weight in zip(points, found, weights):
+            a, b, c = vertices[index.triangles].transpose(1, 0, 2)
+            matrix = np.stack([b - a, c - a], axis=2)
+            l12 = np.linalg.solve(matrix, (point - a)[..., None])[..., 0]
+            inside = np.flatnonzero((l12 >= -1e-9).all(axis=1) & (l12.sum(axis=1) <= 1 + 1e-9))
+            if not len(inside):
+                self.assertEqual(triangle, -1)
+                self.assertTrue(np.isnan(weight).all())
+                continue
+            self.assertIn(triangle, inside)
+            corners = vertices[index.triangles[triangle]]
+            np.testing.assert_allclose(weight @ corners, point, atol=1e-12)
+            self.assertAlmostEqual(weight.sum(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Regression tests of the analytic Jacobians: every column of every unknown
+matches a central difference of the scalar solver to 1e-10 (relative,
+Richardson extrapolated), on arrays and for the gas property
+"""
+import unittest
+
+import numpy as np
+
+from gas_dynamics import derivatives, equations
+
+# EQUATION: (A SOLVED POINT IN CALL ORDER, GAS PROPERTY), THE REAL GAS POINTS KEEP THE DIFFERENCE STEPS
+# INSIDE ONE CELL OF THE 1 K FLUID TABLES, WHICH ARE DIFFERENTIATED AS THE PIECEWISE LINEAR FUNCTIONS THEY ARE
+points = {
+    "ideal_compression": ((1.1e5, 3.3e5, 290.0, 397.0), 1.4),
+    "static_temperature": ((310.0, 290.0, 0.6), 1.4),
+    "static_pressure": ((2.2e5, 1.3e5, 0.9), 1.4),
+    "shaft_work": ((-1.2e5, 300.0, 420.0), 1004.5),
+    "compressor_efficiency": ((3.0, 290.0, 430.0, 0.85), 1.4),
+    "ideal_compression_real": ((1.1e5, 3.3e5, 290.5, 397.3), "air"),
+    "shaft_work_real": ((-1.2e5, 300.5, 420.5), "air"),
+}
+tolerance = 1e-10
+
+
+def solve(relation, values, position, gas_property):
+    """
+    Scalar solution of the unknown at position
+    """
+    return dict(zip(relation.outputs, relation.solve(list(values), gas_property, position)))[
+        relation.variables[position]]
+
+
+def central_difference(function, x, step=1e-4):
+    """
+    Central difference with a relative step, Richardson extrapolated to fourth order
+    """
+    def difference(h):
+        return (function(x + h) - function(x - h)) / (2 * h)
+    h = step * abs(x)
+    return (4 * difference(h / 2) - difference(h)) / 3
+
+
+class JacobianTest(unittest.TestCase):
+
+    def test_every_column_matches_central_differences(self):
+        for equation, (point, gas_property) in points.items():
+            relation = equations.equation_table[equation].relation
+            for position, unknown in enumerate(relation.variables):
+                values = list(point)
+                values[position] = 0.0
+                result = derivatives.jacobian(equation, values, unknown, gas_property)
+                for column, name in enumerate(result.names):
+                    i = relation.variables.index(name)
+
+                    def function(x):
+                        changed = list(values)
+                        changed[i] = x
+                        return solve(relation, changed, position, gas_property)
+                    expected = central_difference(function, point[i])
+                    self.assertAlmostEqual(float(result.matrix[column]) / expected, 1, delta=tolerance,
+                                           msg="%s: d %s / d %s" % (equation, unknown, name))
+
+    def test_property_column(self):
+        for equation in ("ideal_compression", "static_pressure", "shaft_work", "compressor_efficiency"):
+            point, gas_property = points[equation]
+            relation = equations.equation_table[equation].relation
+            position = len(point) - 1
+            values = list(point[:-1]) + [0.0]
+            result = derivatives.jacobian(equation, values, relation.variables[position], gas_property,
+                                          property_derivative=True)
+            expected = central_difference(lambda g: solve(relation, values, position, g), gas_property)
+            self.assertAlmostEqual(float(result.matrix[-1]) / expected, 1, delta=tolerance, msg=equation)
+
+    def test_arrays_match_points(self):
+        mach = np.linspace(0.1, 2.5, 25)
+        result = derivatives.jacobian("static_pressure", (2e5, 0, mach), "ps")
+        self.assertEqual(result.matrix.shape, (25, 2))
+        for i, m in enumerate(mach):
+            point = derivatives.jacobian("static_pressure", (2e5, 0, m), "ps")
+            np.testing.assert_allclose(result.matrix[i], point.matrix, rtol=1e-15)
+            self.assertAlmostEqual(result.value[i], equations.static_pressure(2e5, 0, m, 1.4)[0])
+
+    def test_sensitivity_of_a_power_law(self):
+        # t2 = t1 (p2 / p1) ** ((n - 1) / n): EXPONENTS 1, (n - 1) / n AND -(n - 1) / n
+        result = derivatives.sensitivity("ideal_compression", (1e5, 3e5, 300.0, 0), "t2", 1.4)
+        self.assertAlmostEqual(float(result["t1"]), 1, places=12)
+        self.assertAlmostEqual(float(result["p2"]), 0.4 / 1.4, places=12)
+        self.assertAlmostEqual(float(result["p1"]), -0.4 / 1.4, places=12)
+
+
+if __name__ == '__main__':
+    unittest.main()
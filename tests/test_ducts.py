@@ -0,0 +1,100 @@
+"""
+Regression tests of the duct flow solvers: the reference tables within
+their tolerance, the table and scalar solvers agreeing on the same inputs
+down to the shared subsonic Mach limit, and marching consistent with the
+reference functions
+"""
+import math
+import unittest
+
+import numpy as np
+
+from gas_dynamics import ducts, equations
+
+
+class ReferenceTableTest(unittest.TestCase):
+
+    def test_lookups_within_tolerance(self):
+        rng = np.random.default_rng(1)
+        branches = {False: np.exp(rng.uniform(math.log(ducts.default_mach_min), 0, 20000)),
+                    True: rng.uniform(1, ducts.default_mach_max, 20000)}
+        for flow, (functions, names) in ducts.flows.items():
+            table = ducts.get_table(flow, 1.4)
+            self.assertLessEqual(table.error, ducts.default_tolerance)
+            for supersonic, mach in branches.items():
+                for name, value in zip(names, functions(mach, 1.4)):
+                    if not table.invertible(name, supersonic):
+                        continue
+                    found = table.mach(name, value, supersonic)
+                    self.assertLessEqual(np.max(np.abs(found - mach) / mach), ducts.default_tolerance,
+                                         (flow, name, supersonic))
+
+    def test_outside_the_table_is_nan(self):
+        table = ducts.get_table("fanno", 1.4)
+        fld, _, _, _ = ducts.fanno_functions(ducts.default_mach_min / 2, 1.4)
+        self.assertTrue(np.isnan(table.mach("fld", fld)))
+        self.assertTrue(np.isnan(table.mach("fld", -1.0)))
+
+
+class ScalarAgreementTest(unittest.TestCase):
+
+    def test_fanno_and_rayleigh(self):
+        cases = (("fanno", equations.fanno_flow, equations.fanno_reference, ducts.fanno_flow),
+                 ("rayleigh", equations.rayleigh_flow, equations.rayleigh_reference, ducts.rayleigh_flow))
+        for flow, scalar, reference, array in cases:
+            for m in (2e-4, 0.01, 0.3, 0.9, 1.5, 4.0):
+                values = (m,) + tuple(reference(m, 1.4))
+                for position in range(1, len(values)):
+                    row = [0.0] * len(values)
+                    row[position] = values[position]
+                    solved = array(*row, 1.4, unknown=[value == 0 for value in row])
+                    try:
+                        expected = scalar(*row, 1.4)
+                    except ValueError:
+                        # E.G. A LOW SUBSONIC T/T* OF RAYLEIGH FLOW, NO SUPERSONIC SOLUTION EITHER
+                        self.assertTrue(np.isnan(solved[0]), (flow, m, position))
+                        continue
+                    for variable, (want, got) in enumerate(zip(expected, solved)):
+                        self.assertTrue(math.isclose(float(got), want, rel_tol=1e-5),
+                                        (flow, m, position, variable, want, float(got)))
+
+    def test_subsonic_mach_limit(self):
+        # BOTH PATHS SOLVE DOWN TO reference_mach_min AND NEITHER BELOW IT
+        self.assertEqual(ducts.default_mach_min, equations.reference_mach_min)
+        fld_low = equations.fanno_reference(equations.reference_mach_min * 1.01, 1.4)[0]
+        self.assertAlmostEqual(equations.fanno_flow(0, fld_low, 0, 0, 0, 1.4)[0] / equations.reference_mach_min,
+                               1.01, places=5)
+        self.assertAlmostEqual(float(ducts.fanno_flow(0, fld_low, 0, 0, 0, 1.4, unknown=[1, 0, 1, 1, 1])[0])
+                               / equations.reference_mach_min, 1.01, places=5)
+        fld_below = equations.fanno_reference(equations.reference_mach_min / 2, 1.4)[0]
+        with self.assertRaises(ValueError):
+            equations.fanno_flow(0, fld_below, 0, 0, 0, 1.4)
+        self.assertTrue(np.isnan(ducts.fanno_flow(0, fld_below, 0, 0, 0, 1.4, unknown=[1, 0, 1, 1, 1])[0]))
+
+
+class MarchTest(unittest.TestCase):
+
+    def test_fanno_march_follows_the_reference_function(self):
+        m1 = np.array([0.2, 0.5, 2.0])
+        lengths = np.full(50, 0.1)
+        result = ducts.fanno_march(m1, 1e5, 300, lengths, 0.003, 0.1, 1.4)
+        fld1 = ducts.fanno_functions(m1, 1.4)[0]
+        expected = fld1 - 4 * 0.003 * np.cumsum(lengths)[:, None] / 0.1
+        fld = ducts.fanno_functions(result["mach"][1:], 1.4)[0]
+        passed = ~np.isnan(fld)
+        np.testing.assert_allclose(fld[passed], expected[passed], rtol=1e-4, atol=1e-7)
+        # THE SUPERSONIC INLET CHOKES WHERE 4fL*/D OF THE INLET IS USED UP
+        self.assertEqual(list(result["choked"]), [False, False, True])
+        np.testing.assert_allclose(result["choke_length"][2:], fld1[2:] * 0.1 / (4 * 0.003))
+
+    def test_rayleigh_heating_chokes_at_the_reference_total_temperature(self):
+        m1 = np.array([0.3])
+        cp = 1004.5
+        result = ducts.rayleigh_march(m1, 1e5, 300, np.full(150, 5000.0), cp, 1.4)
+        tt1 = 300 * (1 + 0.2 * 0.09)
+        tt_ratio1 = ducts.rayleigh_functions(m1, 1.4)[2]
+        np.testing.assert_allclose(result["choke_heat"], cp * tt1 * (1 / tt_ratio1 - 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
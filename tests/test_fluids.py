@@ -0,0 +1,73 @@
+"""
+Regression tests of the fluid model: every fluid covers the default table
+range, the interpolated tables stay within 1e-3 K of the exact integrals,
+the polynomials are never extrapolated and the scalar and batch real gas
+solvers agree
+"""
+import unittest
+
+import numpy as np
+
+from gas_dynamics import batch, equations, fluids
+
+
+class FluidTableTest(unittest.TestCase):
+
+    def test_every_fluid_covers_the_default_range(self):
+        for name in fluids.compositions:
+            fluid = fluids.get_fluid(name)
+            self.assertLessEqual(fluid.t_low, fluids.default_t_min, name)
+            self.assertGreaterEqual(fluid.t_high, fluids.default_t_max, name)
+
+    def test_inverse_lookups_within_a_millikelvin(self):
+        temperatures = np.random.default_rng(0).uniform(fluids.default_t_min, fluids.default_t_max, 500)
+        for name in fluids.compositions:
+            fluid = fluids.get_fluid(name)
+            for t in temperatures:
+                self.assertAlmostEqual(fluid.temperature_from_enthalpy(fluid.exact_enthalpy(t)), t, delta=1e-3)
+                self.assertAlmostEqual(fluid.temperature_from_entropy(fluid.exact_entropy(t)), t, delta=1e-3)
+
+    def test_cp_is_continuous_between_the_polynomial_ranges(self):
+        for name in fluids.compositions:
+            fluid = fluids.get_fluid(name)
+            for item in fluid.composition:
+                t_mid = fluids.species[item][2]
+                self.assertAlmostEqual(fluid.cp(t_mid * (1 - 1e-12)) / fluid.cp(t_mid), 1, places=6)
+
+    def test_air_at_room_temperature(self):
+        air = fluids.get_fluid("air")
+        self.assertAlmostEqual(air.cp(300), 1005, delta=2)
+        self.assertAlmostEqual(air.gamma(300), 1.4, places=2)
+
+    def test_no_extrapolation(self):
+        air = fluids.get_fluid("air")
+        for function in (air.cp, air.exact_enthalpy, air.enthalpy):
+            for t in (fluids.default_t_min - 1, air.t_high + 1):
+                with self.assertRaises(ValueError):
+                    function(t)
+        with self.assertRaises(ValueError):
+            fluids.Fluid("air", fluids.compositions["air"], t_min=100)
+        with self.assertRaises(ValueError):
+            fluids.get_fluid("kryptonite")
+
+
+class RealGasSolverTest(unittest.TestCase):
+
+    def test_scalar_and_batch_agree(self):
+        rng = np.random.default_rng(2)
+        p1, p2, t1 = rng.uniform(1e5, 2e5, 50), rng.uniform(2e5, 8e5, 50), rng.uniform(250, 600, 50)
+        for name in fluids.compositions:
+            _, _, _, t2 = batch.ideal_compression_real(p1, p2, t1, np.zeros(50), name)
+            w, _, _ = batch.shaft_work_real(np.zeros(50), t1, t2, name)
+            for i in range(50):
+                expected = equations.ideal_compression_real(p1[i], p2[i], t1[i], 0, name)[3]
+                self.assertAlmostEqual(t2[i] / expected, 1, places=12)
+                self.assertAlmostEqual(w[i] / equations.shaft_work_real(0, t1[i], t2[i], name)[0], 1, places=12)
+
+    def test_close_to_constant_cp_at_low_temperature(self):
+        t2 = equations.ideal_compression_real(1e5, 1.2e5, 280, 0, "air")[3]
+        self.assertAlmostEqual(t2, equations.ideal_compression_p_vs_t(1e5, 1.2e5, 280, 0, 1.4)[3], delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Regression tests of the result history: rows added to a sorted or filtered
+history are inserted into the view in the order a full rebuild gives, with
+and without NumPy
+"""
+import random
+import unittest
+
+from gas_dynamics import history
+from gas_dynamics.history import ResultHistory
+
+
+class InsertTest(unittest.TestCase):
+
+    def setUp(self):
+        self.numpy = list(history._numpy)
+
+    def tearDown(self):
+        history._numpy[:] = self.numpy
+
+    def check(self, sort_column, descending, filters):
+        generator = random.Random(0)
+
+        def row():
+            # FEW DISTINCT VALUES FOR TIES, SOME NAN
+            return [generator.choice([1.0, 2.0, 3.0, float("nan")]) for _ in range(3)]
+
+        table = ResultHistory(("a", "b", "c"))
+        table.extend(list(zip(*[row() for _ in range(200)])))
+        for name, (low, high) in filters.items():
+            table.filter(name, low, high)
+        table.sort(sort_column, descending)
+        for _ in range(50):
+            table.append(row())
+        table.extend(list(zip(*[row() for _ in range(5)])))
+        self.assertFalse(table._dirty)
+        self.assertEqual(list(table._view), list(table._build_view()))
+
+    def test_inserted_rows_match_a_rebuild(self):
+        for pure_python in (False, True):
+            if pure_python:
+                history._numpy[:] = [None]
+            for sort_column in (None, "a"):
+                for descending in (False, True):
+                    for filters in ({}, {"b": (2.0, None)}, {"c": (None, 2.0)}):
+                        if sort_column is None and not filters:
+                            continue
+                        with self.subTest(pure_python=pure_python, sort=sort_column, descending=descending,
+                                          filters=filters):
+                            self.check(sort_column, descending, filters)
+
+    def test_large_block_rebuilds_lazily(self):
+        table = ResultHistory(("a",))
+        table.extend([[3.0, 1.0, 2.0]])
+        table.sort("a")
+        table.extend([[0.5, 2.5, 1.5]])
+        self.assertTrue(table._dirty)
+        self.assertEqual([table.row(position)[1][0] for position in range(len(table))],
+                         [0.5, 1.0, 1.5, 2.0, 2.5, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
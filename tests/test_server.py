@@ -0,0 +1,93 @@
+"""
+Regression tests of the solver service: malformed requests are answered with
+an error and do not stop the server for the requests that follow
+"""
+import asyncio
+import unittest
+
+from gas_dynamics.server import MicroBatcher, RequestError, SolverServer, parse_request, solve_remote
+
+
+class ParseRequestTest(unittest.TestCase):
+
+    def test_malformed_requests_are_request_errors(self):
+        for request in ({"equation": "ideal_compression", "inputs": "abc"},
+                        {"equation": "ideal_compression", "inputs": {"p1": 1}, "units": "bar"},
+                        {"equation": "ideal_compression", "inputs": {"p1": 1}, "property": [1.4]},
+                        {"equation": "ideal_compression", "inputs": {"p1": 1}, "property": "air"},
+                        {"equation": ["ideal_compression"]}):
+            with self.assertRaises(RequestError):
+                parse_request(request)
+
+
+class MicroBatcherTest(unittest.TestCase):
+
+    def test_unhashable_property_does_not_stop_the_loop(self):
+        async def run():
+            batcher = MicroBatcher(window=0)
+            task = asyncio.ensure_future(batcher.run())
+            loop = asyncio.get_running_loop()
+            bad = loop.create_future()
+            batcher.solve([("ideal_compression", [1.4], [0, 0, 0, 0], [1e5, 2e5, 300.0, None], bad)])
+            good = await batcher.submit(*parse_request(
+                {"equation": "ideal_compression", "inputs": {"p1": 1, "p2": 2, "t1": 300},
+                 "units": {"p1": "bar", "p2": "bar"}}))
+            task.cancel()
+            return bad.result(), good
+
+        bad, good = asyncio.run(run())
+        self.assertIsInstance(bad, str)
+        self.assertAlmostEqual(good["t2"], 365.7, places=0)
+
+
+class SolverServerTest(unittest.TestCase):
+
+    def test_malformed_requests_are_answered(self):
+        async def run():
+            server = SolverServer(port=0, window=0)
+            await server.start()
+            requests = [
+                {"id": 1, "equation": "ideal_compression", "inputs": {"p1": 1, "p2": 2, "t1": 300}, "property": [1.4]},
+                {"id": 2, "equation": "ideal_compression", "inputs": "abc"},
+                {"id": 3, "equation": "ideal_compression", "inputs": {"p1": 1, "p2": 2, "t1": 300},
+                 "units": {"p1": "bar", "p2": "bar"}},
+            ]
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: solve_remote(requests, port=server.port, timeout=10))
+            finally:
+                await server.stop()
+
+        answers = asyncio.run(run())
+        self.assertEqual([answer["id"] for answer in answers], [1, 2, 3])
+        self.assertIn("error", answers[0])
+        self.assertIn("error", answers[1])
+        self.assertAlmostEqual(answers[2]["result"]["t2"], 365.7, places=0)
+
+    def test_too_long_line_is_answered(self):
+        async def run():
+            server = SolverServer(port=0, window=0, max_line=256)
+            await server.start()
+            requests = [
+                {"id": 1, "equation": "static_temperature", "inputs": {"tt": 300, "m": 0.5}},
+                {"id": 2, "equation": "static_temperature", "inputs": {"tt": 300, "m": 0.5}, "pad": "x" * 1000},
+                {"id": 3, "equation": "static_temperature", "inputs": {"tt": 400, "m": 0.5}},
+            ]
+            try:
+                answers = await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: solve_remote(requests, port=server.port, timeout=10))
+                # THE SERVER STILL ANSWERS NEW CONNECTIONS
+                return answers, await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: solve_remote(requests[:1], port=server.port, timeout=10))
+            finally:
+                await server.stop()
+
+        answers, again = asyncio.run(run())
+        self.assertEqual([answer["id"] for answer in answers], [1, None, 3])
+        self.assertIn("256 bytes", answers[1]["error"])
+        self.assertAlmostEqual(answers[2]["result"]["ts"], 400 / 1.05)
+        self.assertEqual(again[0]["id"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Regression tests of session files: a corrupt file is rejected with a
+ValueError before anything is allocated or replaced
+"""
+import json
+import os
+import struct
+import tempfile
+import unittest
+from array import array
+
+from gas_dynamics import session
+from gas_dynamics.history import ResultHistory
+
+
+class SessionFileTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "test" + session.file_extension)
+        history = ResultHistory(("a", "b"))
+        history.extend([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+        session.write_session(self.path, {"n": 1.4}, [{"equation": "test", "history": history}])
+
+    def rewrite(self, rows):
+        header, offset = session.read_header(self.path)
+        header["tabs"][0]["history"]["rows"] = rows
+        with open(self.path, "rb") as stream:
+            data = stream.read()[offset:]
+        text = json.dumps(header).encode("utf-8")
+        offset = -(-(12 + len(text)) // session.header_alignment) * session.header_alignment
+        with open(self.path, "wb") as stream:
+            stream.write(session.magic + struct.pack("<I", offset) + text.ljust(offset - 12) + data)
+
+    def test_round_trip(self):
+        _, tabs = session.read_session(self.path)
+        self.assertEqual(tabs[0]["buffers"], [array('d', [1.0, 2.0, 3.0]), array('d', [4.0, 5.0, 6.0])])
+
+    def test_corrupt_row_count(self):
+        for rows in (4, 2 ** 62, -1, 1.5, "3"):
+            self.rewrite(rows)
+            with self.assertRaises(ValueError):
+                session.read_session(self.path)
+
+
+class HistoryLoadTest(unittest.TestCase):
+
+    def test_invalid_state_changes_nothing(self):
+        history = ResultHistory(("a", "b"))
+        history.extend([[1.0, 2.0], [3.0, 4.0]])
+        buffers = [array('d', [5.0]), array('d', [6.0])]
+        for sort_column, filters in (("c", None), (None, {"c": (0, 1)}), (None, {"a": ("0", 1)})):
+            with self.assertRaises(ValueError):
+                history.load(buffers, sort_column, False, filters)
+            self.assertEqual(history.total, 2)
+            self.assertIsNone(history.sort_column)
+        history.load(buffers, "b", True, {"a": (0, 10)})
+        self.assertEqual(history.rows(0, 5), [(0, (5.0, 6.0))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Regression tests of the theta-beta-M solutions: full precision as the
+deflection goes to 0, the weak and strong roots meeting at the maximum
+deflection and the interpolation table within its tolerance
+"""
+import math
+import unittest
+
+import numpy as np
+
+from gas_dynamics import equations, shocks
+
+
+class ObliqueShockAngleTest(unittest.TestCase):
+
+    def test_small_deflection_gives_the_mach_angle(self):
+        for m1 in (1.2, 2.0, 6.0, 6.04):
+            mach_angle = math.asin(1 / m1)
+            for theta in (1e-14, 1e-10, 1e-8, 1e-6):
+                self.assertAlmostEqual(equations.oblique_shock_angle(m1, theta, 1.4), mach_angle, places=5)
+                self.assertAlmostEqual(float(shocks.oblique_shock_angle(m1, theta, 1.4)), mach_angle, places=5)
+
+    def test_small_deflection_is_a_weak_wave(self):
+        for theta in (1e-7, 1e-6, 1e-5):
+            _, _, beta, m2, p_ratio, t_ratio, _ = equations.oblique_shock(6.0, theta, 0, 0, 0, 0, 0, 1.4)
+            self.assertAlmostEqual(beta, 9.594, places=2)
+            self.assertAlmostEqual(p_ratio, 1.0, places=3)
+            self.assertAlmostEqual(t_ratio, 1.0, places=3)
+            self.assertGreater(m2, 5.99)
+
+    def test_roots_solve_the_relation(self):
+        m1 = np.repeat([1.5, 3.0, 6.0], 50)
+        theta = shocks.max_deflection(m1, 1.4) * np.tile(np.linspace(0.01, 0.99, 50), 3)
+        for strong in (False, True):
+            beta = shocks.oblique_shock_angle(m1, theta, 1.4, strong)
+            np.testing.assert_allclose(shocks.deflection_angle(m1, beta, 1.4), theta, rtol=1e-9, atol=1e-12)
+            scalar = [equations.oblique_shock_angle(m, t, 1.4, strong) for m, t in zip(m1, theta)]
+            np.testing.assert_allclose(beta, scalar, rtol=1e-12)
+
+    def test_strong_root(self):
+        self.assertAlmostEqual(float(shocks.oblique_shock_angle(3.0, 1e-8, 1.4, strong=True)), math.pi / 2, places=6)
+        beta = shocks.oblique_shock_angle(3.0, math.radians(20), 1.4, strong=True)
+        self.assertAlmostEqual(math.degrees(float(beta)), 82.15, places=1)
+
+    def test_roots_meet_at_the_maximum_deflection(self):
+        for m1 in (1.5, 3.0, 6.0):
+            theta_max = float(shocks.max_deflection(m1, 1.4))
+            beta_max = float(shocks.max_deflection_shock_angle(m1, 1.4))
+            for fraction in (1 - 1e-9, 1.0):
+                weak = float(shocks.oblique_shock_angle(m1, theta_max * fraction, 1.4))
+                strong = float(shocks.oblique_shock_angle(m1, theta_max * fraction, 1.4, strong=True))
+                self.assertLess(weak, strong + 1e-6)
+                self.assertAlmostEqual(weak, beta_max, places=4)
+                self.assertAlmostEqual(strong, beta_max, places=4)
+            self.assertTrue(np.isnan(shocks.oblique_shock_angle(m1, theta_max * 1.001, 1.4)))
+            with self.assertRaises(ValueError):
+                equations.oblique_shock_angle(m1, theta_max * 1.001, 1.4)
+
+
+class ObliqueShockTest(unittest.TestCase):
+
+    def test_scalar_and_batch_agree(self):
+        m1 = np.repeat([1.2, 2.0, 4.0, 8.0], 6)
+        theta = np.degrees(shocks.max_deflection(m1, 1.4)) * np.tile([0, 1e-9, 0.1, 0.5, 0.9, 0.999], 4)
+        zeros = np.zeros(len(m1))
+        solved = shocks.oblique_shock(m1, theta, zeros, zeros, zeros, zeros, zeros, 1.4,
+                                      unknown=[0, 0, 1, 1, 1, 1, 1])
+        for i in range(len(m1)):
+            expected = equations.oblique_shock(m1[i], theta[i], 0, 0, 0, 0, 0, 1.4)
+            np.testing.assert_allclose([column[i] for column in solved], expected, rtol=1e-10)
+
+    def test_zero_deflection_is_the_normal_shock(self):
+        m1 = np.array([1.5, 2.0, 5.0])
+        _, _, beta, m2, p_ratio, t_ratio, pt_ratio = shocks.oblique_shock(m1, 0, 0, 0, 0, 0, 0, 1.4,
+                                                                          unknown=[0, 1, 1, 1, 1, 1, 1])
+        np.testing.assert_array_equal(beta, 90.0)
+        np.testing.assert_allclose(np.stack([m2, p_ratio, t_ratio, pt_ratio]),
+                                   np.stack(shocks.normal_shock(m1, 1.4)), rtol=1e-14)
+        self.assertTrue(np.isnan(shocks.normal_shock(0.8, 1.4)[0]))
+
+
+class ThetaBetaMachTableTest(unittest.TestCase):
+
+    def test_lookup_within_tolerance(self):
+        table = shocks.get_table(1.4)
+        rng = np.random.default_rng(1)
+        m1 = rng.uniform(1.05, 10, 2000)
+        theta_max = shocks.max_deflection(m1, 1.4)
+        for fraction in (rng.uniform(0, 1, 2000), np.full(2000, 1e-9), np.full(2000, 1 - 1e-9)):
+            theta = theta_max * fraction
+            for strong in (False, True):
+                exact = shocks.oblique_shock_angle(m1, theta, 1.4, strong)
+                error = np.max(np.abs(table.lookup(m1, theta, strong) - exact))
+                self.assertLessEqual(error, table.tolerance)
+
+
+if __name__ == '__main__':
+    unittest.main()
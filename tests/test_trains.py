@@ -0,0 +1,90 @@
+"""
+Regression tests of the compressor and turbine trains: every stage agrees
+with the scalar solvers of equations.py, with constant Cp and with a fluid,
+and the energy balance of an intercooled train closes
+"""
+import unittest
+
+import numpy as np
+
+from gas_dynamics import equations
+from gas_dynamics.fluids import get_fluid
+from gas_dynamics.trains import Stage, Train
+from gas_dynamics.units import default_cp, default_n
+
+
+class TrainTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.p_in = rng.uniform(0.8e5, 1.2e5, 20)
+        self.t_in = rng.uniform(260, 320, 20)
+
+    def test_stages_match_the_scalar_solvers(self):
+        train = Train.equal_split(16, 4, 0.85, intercooler_temperature=310)
+        result = train.evaluate(self.p_in, self.t_in)
+        for i in range(len(train)):
+            for j in range(len(self.p_in)):
+                p_in, t_in, p_out = result["p_in"][i, j], result["t_in"][i, j], result["p_out"][i, j]
+                ideal = equations.ideal_compression_p_vs_t(p_in, p_out, t_in, 0, default_n)[3]
+                actual = equations.compressor_efficiency(p_out / p_in, t_in, 0, 0.85, default_n)[2]
+                work = equations.shaft_work(0, t_in, actual, default_cp)[0]
+                self.assertAlmostEqual(result["t_out_ideal"][i, j] / ideal, 1, places=12)
+                self.assertAlmostEqual(result["t_out"][i, j] / actual, 1, places=12)
+                self.assertAlmostEqual(result["work"][i, j] / work, 1, places=12)
+        np.testing.assert_allclose(result["train_p_out"], self.p_in * 16)
+
+    def test_fluid_stages_match_the_real_gas_solvers(self):
+        train = Train([Stage(3.0, 1.0), Stage(2.0, 1.0)], fluid="air")
+        result = train.evaluate(self.p_in, self.t_in)
+        for i in range(len(train)):
+            for j in range(len(self.p_in)):
+                p_in, t_in, p_out = result["p_in"][i, j], result["t_in"][i, j], result["p_out"][i, j]
+                ideal = equations.ideal_compression_real(p_in, p_out, t_in, 0, "air")[3]
+                work = equations.shaft_work_real(0, t_in, ideal, "air")[0]
+                self.assertAlmostEqual(result["t_out_ideal"][i, j] / ideal, 1, places=9)
+                self.assertAlmostEqual(result["t_out"][i, j] / ideal, 1, places=9)
+                self.assertAlmostEqual(result["work"][i, j] / work, 1, places=9)
+
+    def test_energy_balance(self):
+        for fluid in (None, "air"):
+            train = Train.equal_split(20, 3, 0.8, intercooler_temperature=300, fluid=fluid)
+            result = train.evaluate(self.p_in, self.t_in)
+            if fluid is None:
+                change = default_cp * (self.t_in - result["train_t_out"])
+            else:
+                air = get_fluid("air")
+                change = np.array([air.enthalpy(t) for t in self.t_in]) - [air.enthalpy(t) for t in
+                                                                           result["train_t_out"]]
+            np.testing.assert_allclose(result["total_work"] + result["heat"].sum(axis=0), change, rtol=1e-6)
+
+    def test_intercooling_saves_work(self):
+        cooled = Train.equal_split(16, 4, 0.85, intercooler_temperature=300).evaluate(self.p_in, self.t_in)
+        plain = Train.equal_split(16, 4, 0.85).evaluate(self.p_in, self.t_in)
+        self.assertTrue(np.all(cooled["total_work"] > plain["total_work"]))
+        self.assertTrue(np.all(plain["total_work"] < 0))
+
+    def test_turbine(self):
+        result = Train([Stage(2.0, 0.9), Stage(2.0, 0.9)], kind="turbine").evaluate(4e5, 1200.0)
+        self.assertTrue(np.all(result["work"] > 0))
+        self.assertAlmostEqual(float(result["train_p_out"]), 1e5)
+        ideal = 1200.0 * 4 ** (-0.4 / 1.4)
+        self.assertLess(float(result["train_t_out"]), 1200.0)
+        self.assertGreater(float(result["train_t_out"]), ideal)
+
+    def test_per_point_stage_parameters(self):
+        efficiency = np.array([0.7, 0.8, 0.9])
+        result = Train([Stage(2.0, efficiency)]).evaluate(1e5, 300.0)
+        for j, eta in enumerate(efficiency):
+            self.assertAlmostEqual(result["t_out"][0, j],
+                                   equations.compressor_efficiency(2.0, 300.0, 0, eta, default_n)[2])
+
+    def test_invalid_trains(self):
+        with self.assertRaises(ValueError):
+            Train([])
+        with self.assertRaises(ValueError):
+            Train([Stage(2.0, 0.9)], kind="fan")
+
+
+if __name__ == '__main__':
+    unittest.main()
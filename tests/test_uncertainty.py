@@ -0,0 +1,78 @@
+"""
+Regression tests of the Monte Carlo propagation: the streaming statistics
+match NumPy over many chunks, percentiles stay within one histogram bin, and
+a linear relation gives the analytic mean and spread, with and without
+correlation
+"""
+import math
+import unittest
+
+import numpy as np
+
+from gas_dynamics import equations
+from gas_dynamics.uncertainty import Normal, StreamingStats, Uniform, propagate
+from gas_dynamics.units import default_cp, default_n
+
+
+class StreamingStatsTest(unittest.TestCase):
+
+    def test_chunks_match_numpy(self):
+        values = np.random.default_rng(3).lognormal(2.0, 0.7, 100000)
+        stats = StreamingStats(bins=256)
+        for chunk in np.array_split(values, 37):
+            stats.update(chunk)
+        self.assertEqual(stats.count, len(values))
+        self.assertAlmostEqual(stats.mean / values.mean(), 1, places=12)
+        self.assertAlmostEqual(stats.variance / values.var(ddof=1), 1, places=10)
+        self.assertEqual((stats.minimum, stats.maximum), (values.min(), values.max()))
+        self.assertEqual(stats.counts.sum(), len(values))
+        q = np.array([1, 25, 50, 75, 99])
+        np.testing.assert_array_less(np.abs(stats.percentile(q) - np.percentile(values, q)), stats.width)
+
+    def test_invalid_values_are_only_counted(self):
+        stats = StreamingStats()
+        stats.update([1.0, np.nan, 3.0, np.inf])
+        self.assertEqual((stats.count, stats.invalid, stats.mean), (2, 2, 2.0))
+
+    def test_odd_bins_rejected(self):
+        with self.assertRaises(ValueError):
+            StreamingStats(bins=3)
+
+
+class PropagateTest(unittest.TestCase):
+
+    def test_linear_relation(self):
+        # w = Cp (t1 - t2): MEAN Cp (300 - 250), STD Cp SQRT(2^2 + (20 / SQRT(12))^2)
+        cp = default_cp
+        stats = propagate("shaft_work", {"t1": Normal(300.0, 2.0), "t2": Uniform(240.0, 260.0)}, "w",
+                          samples=400000, chunk_size=100000, seed=5)
+        self.assertAlmostEqual(stats["w"].mean / (cp * 50), 1, places=2)
+        self.assertAlmostEqual(stats["w"].std / (cp * math.sqrt(4 + 400 / 12)), 1, places=2)
+        self.assertAlmostEqual(stats["t1"].mean, 300, places=1)
+        self.assertEqual(stats["w"].invalid, 0)
+
+    def test_correlation(self):
+        cp = default_cp
+        inputs = {"t1": Normal(300.0, 2.0), "t2": Normal(250.0, 2.0)}
+        stats = propagate("shaft_work", inputs, "w", samples=400000, seed=5, correlation={("t1", "t2"): 0.8})
+        self.assertAlmostEqual(stats["w"].std / (cp * math.sqrt(2 * 4 * (1 - 0.8))), 1, places=2)
+
+    def test_reproducible_for_a_seed(self):
+        inputs = {"pt": Normal(2e5, 2e3), "m": Uniform(0.5, 0.52)}
+        first = propagate("static_pressure", inputs, "ps", samples=50000, chunk_size=20000, seed=1)
+        second = propagate("static_pressure", inputs, "ps", samples=50000, chunk_size=20000, seed=1)
+        self.assertEqual(first["ps"].mean, second["ps"].mean)
+        self.assertTrue(np.array_equal(first["ps"].counts, second["ps"].counts))
+
+    def test_matches_the_scalar_solver_for_constants(self):
+        stats = propagate("static_pressure", {"pt": 2e5, "m": 0.5}, "ps", samples=10)
+        self.assertEqual(stats["ps"].count, 10)
+        self.assertAlmostEqual(stats["ps"].mean, equations.static_pressure(2e5, 0, 0.5, default_n)[0])
+
+    def test_missing_input(self):
+        with self.assertRaises(ValueError):
+            propagate("static_pressure", {"pt": 2e5}, "ps")
+
+
+if __name__ == '__main__':
+    unittest.main()